@@ -1,73 +1,270 @@
 """API routes for code execution endpoints."""
 
+import asyncio
 import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic_core import to_json
+from starlette.concurrency import run_in_threadpool
 
-from ..schemas import CodeExecutionRequest, CodeExecutionResponse, ExecutionMode
-from ..security import require_app_auth
-from ..services.executor import run_user_code
-from ..services.task_loader import load_task_by_id
+from ..schemas import (
+    CASE_RESULTS_ADAPTER,
+    CodeExecutionBatchRequest,
+    CodeExecutionRequest,
+    CodeExecutionResponse,
+    ExecutionMode,
+    TaskCacheInvalidateRequest,
+)
+from ..security import require_admin_auth, require_app_auth
+from ..services.container_runner import concurrency_stats
+from ..services.executor import ExecutionResult, run_user_code, run_user_code_batch, stream_user_code
+from ..services.jobs import JOB_QUEUE, JobQueueFullError
+from ..services.metrics import RATE_LIMITED_TOTAL
+from ..services.rate_limit import RATE_LIMITER, RateLimitedError
+from ..services.task_loader import TaskDefinition, invalidate_task_cache, load_task_by_id, task_cache_stats
 from tests.test_tasks import get_test_task_by_id
 
 router = APIRouter()
+MAX_JOB_WAIT_SECONDS = 30
 
 
-@router.post("/execute")
-def execute_code(payload: CodeExecutionRequest, _auth: dict = Depends(require_app_auth)) -> dict:
-    """Executes user code for a given task (or ad-hoc) and returns test results."""
+async def _resolve_task(payload: CodeExecutionRequest) -> Optional[TaskDefinition]:
+    """Loads the task for task-backed modes, raising HTTP 400/404/503 like /execute does."""
+    if payload.mode == ExecutionMode.run_code:
+        return None
+    if not payload.task_id:
+        raise HTTPException(
+            status_code=400,
+            detail="task_id is required for this mode",
+        )
+    if payload.task_id.split("-")[0] == "test_task":
+        task = get_test_task_by_id(payload.task_id)
+    else:
+        try:
+            task = await run_in_threadpool(load_task_by_id, payload.task_id, payload.mode)
+        except Exception as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+    if task is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Task '{payload.task_id}' not found",
+        )
+    return task
 
-    task = None
-    entry_point = None
-    request_id = uuid.uuid4().hex
-    user_id = _auth.get("sub") if isinstance(_auth, dict) else None
-
-    if payload.mode != ExecutionMode.run_code:
-        if not payload.task_id:
-            raise HTTPException(
-                status_code=400,
-                detail="task_id is required for this mode",
-            )
-        if payload.task_id.split("-")[0] == "test_task":
-            task = get_test_task_by_id(payload.task_id)
-        else:
-            try:
-                task = load_task_by_id(payload.task_id, payload.mode)
-            except Exception as exc:
-                raise HTTPException(status_code=503, detail=str(exc)) from exc
-        if task is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Task '{payload.task_id}' not found",
-            )
-        entry_point = task.get("entry_point")
-
-    execution_results = run_user_code(
-        source=payload.source,
-        task=task or {},
-        entry_point=entry_point,
-        mode=payload.mode,
-        meta={
-            "request_id": request_id,
+
+def _run_kwargs(payload: CodeExecutionRequest, task: Optional[TaskDefinition], user_id: Optional[str]) -> dict:
+    """Keyword arguments shared by run_user_code and stream_user_code."""
+    return {
+        "source": payload.source,
+        "task": task or {},
+        "entry_point": task.get("entry_point") if task else None,
+        "mode": payload.mode,
+        "meta": {
+            "request_id": uuid.uuid4().hex,
             "user_id": user_id,
             "task_id": payload.task_id,
             "mode": payload.mode.value,
+            "fail_fast": payload.fail_fast,
         },
-    )
+        "fail_fast": payload.fail_fast,
+    }
 
-    mapped_results = [CodeExecutionResponse(**result) for result in execution_results]
 
-    if payload.mode in (ExecutionMode.full_test, ExecutionMode.run_code):
-        return {
-            "mode": payload.mode.value,
-            "results": [r.model_dump() for r in mapped_results],
+async def _execute(payload: CodeExecutionRequest, task: Optional[TaskDefinition], user_id: Optional[str]) -> dict:
+    """Runs the submission and shapes the response body for its mode."""
+    execution = await run_user_code(**_run_kwargs(payload, task, user_id))
+    return _shape_response(payload.mode, execution, payload.include_timing)
+
+
+def _shape_response(mode: ExecutionMode, execution: ExecutionResult, include_timing: bool = False) -> dict:
+    """Builds the /execute response body for `mode` from a run_user_code result.
+
+    Case results are validated once and kept as models; `_json_response` serializes them.
+    """
+    mapped_results = CASE_RESULTS_ADAPTER.validate_python(execution["results"])
+
+    if mode in (ExecutionMode.full_test, ExecutionMode.run_code):
+        body = {
+            "mode": mode.value,
+            "results": mapped_results,
+            "cached": execution["cached"],
+        }
+    else:
+        passed_count = sum(1 for r in mapped_results if r.passed)
+        failed_index = next((index for index, r in enumerate(mapped_results) if not r.passed), None)
+        body = {
+            "mode": mode.value,
+            "isTaskPassed": failed_index is None,
+            "passedCount": passed_count,
+            "failedIndex": failed_index,
+            "cached": execution["cached"],
         }
 
-    passed_count = sum(1 for r in mapped_results if r.passed)
-    is_passed = passed_count == len(mapped_results)
+    if include_timing:
+        body["timing"] = execution.get("timing")
+    return body
 
-    return {
-        "mode": payload.mode.value,
-        "isTaskPassed": is_passed,
-        "passedCount": passed_count,
-    }
+
+def _json_response(body: Any) -> Response:
+    """Encodes `body` straight to JSON bytes, skipping FastAPI's jsonable_encoder pass."""
+    return Response(content=to_json(body), media_type="application/json")
+
+
+def _user_id(auth: dict) -> Optional[str]:
+    return auth.get("sub") if isinstance(auth, dict) else None
+
+
+def _enforce_rate_limit(user_id: Optional[str], cost: float = 1) -> None:
+    """Charges the user's token bucket, raising HTTP 429 + Retry-After when it is empty."""
+    try:
+        RATE_LIMITER.consume(user_id, cost)
+    except RateLimitedError as exc:
+        RATE_LIMITED_TOTAL.inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many submissions, slow down",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+
+@router.post("/execute")
+async def execute_code(payload: CodeExecutionRequest, _auth: dict = Depends(require_app_auth)) -> Response:
+    """Executes user code for a given task (or ad-hoc) and returns test results."""
+    _enforce_rate_limit(_user_id(_auth))
+    task = await _resolve_task(payload)
+    return _json_response(await _execute(payload, task, _user_id(_auth)))
+
+
+@router.post("/execute/stream")
+async def execute_code_stream(
+    payload: CodeExecutionRequest, request: Request, _auth: dict = Depends(require_app_auth)
+) -> StreamingResponse:
+    """Streams one event per finished test case, then the /execute body as the `done` event.
+
+    Answers Server-Sent Events when the client accepts `text/event-stream`, NDJSON otherwise.
+    """
+    _enforce_rate_limit(_user_id(_auth))
+    task = await _resolve_task(payload)
+    events = stream_user_code(**_run_kwargs(payload, task, _user_id(_auth)))
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def body() -> AsyncIterator[str]:
+        index = 0
+        try:
+            async for kind, value in events:
+                if kind == "case":
+                    event = {"event": "case", "index": index, "result": CodeExecutionResponse.model_validate(value)}
+                    index += 1
+                else:
+                    event = {"event": "done", **_shape_response(payload.mode, value, payload.include_timing)}
+                data = to_json(event).decode("utf-8")
+                yield f"event: {event['event']}\ndata: {data}\n\n" if sse else data + "\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/execute/batch")
+async def execute_batch(payload: CodeExecutionBatchRequest, _auth: dict = Depends(require_app_auth)) -> Response:
+    """Executes many submissions, sharing one sandbox per task chunk; returns one body per item."""
+    user_id = _user_id(_auth)
+    if RATE_LIMITER.enabled and len(payload.items) > RATE_LIMITER.burst:
+        # A full bucket could never pay for it; split the batch instead of waiting.
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(payload.items)} items exceeds the per-user burst of {int(RATE_LIMITER.burst)}",
+        )
+    _enforce_rate_limit(user_id, len(payload.items))
+    request_id = uuid.uuid4().hex
+    responses: List[Optional[dict]] = [None] * len(payload.items)
+    runnable: List[int] = []
+    batch_items: List[Dict[str, Any]] = []
+
+    for index, item in enumerate(payload.items):
+        try:
+            task = await _resolve_task(item)
+        except HTTPException as exc:
+            responses[index] = {"index": index, "status": exc.status_code, "error": exc.detail}
+            continue
+        runnable.append(index)
+        batch_items.append(
+            {
+                "source": item.source,
+                "task": task or {},
+                "entry_point": task.get("entry_point") if task else None,
+                "mode": item.mode,
+                "task_id": item.task_id,
+                "fail_fast": item.fail_fast,
+            }
+        )
+
+    executions = await run_user_code_batch(batch_items, meta={"request_id": request_id, "user_id": user_id})
+    for index, execution in zip(runnable, executions):
+        item = payload.items[index]
+        # Submissions share sandboxes, so there is no per-item phase breakdown to report.
+        responses[index] = {"index": index, "status": 200, **_shape_response(item.mode, execution)}
+
+    return _json_response({"items": responses})
+
+
+@router.post("/jobs", status_code=202)
+async def submit_job(payload: CodeExecutionRequest, _auth: dict = Depends(require_app_auth)) -> dict:
+    """Queues an execution and returns its job id immediately (429 + Retry-After when full)."""
+    user_id = _user_id(_auth)
+    _enforce_rate_limit(user_id)
+    task = await _resolve_task(payload)
+    try:
+        job = JOB_QUEUE.submit(user_id, lambda: _execute(payload, task, user_id))
+    except JobQueueFullError as exc:
+        raise HTTPException(
+            status_code=429,
+            detail="Execution queue is full",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    return job.to_dict()
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=MAX_JOB_WAIT_SECONDS, description="Long-poll up to this many seconds"),
+    _auth: dict = Depends(require_app_auth),
+) -> Response:
+    """Returns job status and, once done, the same body /execute would have returned."""
+    job = JOB_QUEUE.get(job_id, _user_id(_auth))
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if wait and not job.done.is_set():
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+    return _json_response(job.to_dict())
+
+
+@router.get("/concurrency")
+def get_concurrency(_auth: dict = Depends(require_app_auth)) -> dict:
+    """Returns the sandbox concurrency limit, current usage and recent limit changes."""
+    return concurrency_stats()
+
+
+@router.get("/tasks/cache")
+def get_task_cache_stats(_auth: dict = Depends(require_admin_auth)) -> dict:
+    """Returns hit/miss counters of the task definition cache (admin scope only)."""
+    return task_cache_stats()
+
+
+@router.post("/tasks/cache/invalidate")
+def invalidate_task_definitions(
+    payload: TaskCacheInvalidateRequest, _auth: dict = Depends(require_admin_auth)
+) -> dict:
+    """Evicts one cached task definition (or all of them) after tasks change in the DB (admin scope only)."""
+    evicted = invalidate_task_cache(payload.task_id)
+    return {"evicted": evicted, "stats": task_cache_stats()}
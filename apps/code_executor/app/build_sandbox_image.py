@@ -0,0 +1,33 @@
+"""Build the prebuilt sandbox image: `python -m app.build_sandbox_image [--context DIR]`."""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from app.services.sandbox_image import (
+    SANDBOX_BASE_IMAGE,
+    SANDBOX_IMAGE,
+    build_image,
+    image_reference,
+    write_build_context,
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split(":")[0])
+    parser.add_argument("--repository", default=SANDBOX_IMAGE or "snakecoder-sandbox")
+    parser.add_argument("--base-image", default=SANDBOX_BASE_IMAGE)
+    parser.add_argument("--context", type=Path, help="write the build context here instead of building")
+    args = parser.parse_args(argv)
+
+    if args.context is not None:
+        write_build_context(args.context)
+        print(f"{args.context} (tag {image_reference(args.repository)})")
+        return 0
+    print(build_image(args.repository, args.base_image))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
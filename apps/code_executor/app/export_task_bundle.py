@@ -0,0 +1,26 @@
+"""Export every DB task into a task bundle: `python -m app.export_task_bundle PATH`."""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from app.services.task_bundle import TASK_BUNDLE_PATH, write_task_bundle
+from app.services.task_shapes import iter_db_task_shapes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split(":")[0])
+    parser.add_argument("path", nargs="?", type=Path, default=Path(TASK_BUNDLE_PATH) if TASK_BUNDLE_PATH else None)
+    parser.add_argument("--batch-size", type=int, default=500, help="rows fetched from the DB per round trip")
+    args = parser.parse_args(argv)
+    if args.path is None:
+        parser.error("PATH is required when EXECUTOR_TASK_BUNDLE_PATH is not set")
+
+    stats = write_task_bundle(args.path, iter_db_task_shapes(args.batch_size))
+    print(f"{stats['path']}: {stats['tasks']} tasks, {stats['bytes']} bytes, version {stats['version']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
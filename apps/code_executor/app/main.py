@@ -1,39 +1,40 @@
 """FastAPI application entrypoint for the code executor service."""
 
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from app.api import router as api_router
+import os
+from contextlib import asynccontextmanager
 
-app = FastAPI(title="User Code Executor", version="0.1.0")
-MAX_BODY_BYTES = 128 * 1024  # 128 KiB
+from fastapi import FastAPI
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from app.api import router as api_router
+from app.middleware import RequestSizeLimitMiddleware
+from app.services.container_runner import LOG_SINK, start_sandbox_backend, stop_sandbox_backend
+from app.services.jobs import JOB_QUEUE
+from app.services.metrics import CONTENT_TYPE, JOB_QUEUE_DEPTH, LOG_DROPPED_TOTAL, REGISTRY
 
 
-@app.middleware("http")
-async def limit_request_size(request: Request, call_next):
-    """Reject oversized payloads before they reach the executor."""
-    content_length = request.headers.get("content-length")
-    if content_length:
-        try:
-            if int(content_length) > MAX_BODY_BYTES:
-                return JSONResponse(
-                    status_code=413,
-                    content={"detail": "Request body too large"},
-                )
-        except ValueError:
-            pass
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start and stop background executor resources with the app."""
+    await start_sandbox_backend()
+    await JOB_QUEUE.start()
+    try:
+        yield
+    finally:
+        await JOB_QUEUE.stop()
+        await stop_sandbox_backend()
+        await run_in_threadpool(LOG_SINK.close)
 
-    body = await request.body()
-    if len(body) > MAX_BODY_BYTES:
-        return JSONResponse(
-            status_code=413,
-            content={"detail": "Request body too large"},
-        )
 
-    async def receive():
-        return {"type": "http.request", "body": body, "more_body": False}
+app = FastAPI(title="User Code Executor", version="0.1.0", lifespan=lifespan)
+MAX_BODY_BYTES = int(os.getenv("EXECUTOR_MAX_BODY_BYTES", str(128 * 1024)))  # 128 KiB
+MAX_BATCH_BODY_BYTES = int(os.getenv("EXECUTOR_MAX_BATCH_BODY_BYTES", str(4 * 1024 * 1024)))  # 4 MiB
 
-    request = Request(request.scope, receive=receive)
-    return await call_next(request)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_body_bytes=MAX_BODY_BYTES,
+    route_limits={"/api/execute/batch": MAX_BATCH_BODY_BYTES},
+)
 
 
 @app.get("/health")
@@ -42,4 +43,14 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+JOB_QUEUE_DEPTH.set_function(JOB_QUEUE.depth)
+LOG_DROPPED_TOTAL.set_function(lambda: LOG_SINK.dropped)
+
+
+@app.get("/metrics")
+def metrics() -> Response:
+    """Expose executor metrics in the Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 app.include_router(api_router, prefix="/api")
@@ -0,0 +1,111 @@
+"""Pure ASGI middleware for the executor API."""
+
+from typing import Dict, Optional
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+BODYLESS_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class RequestBodyTooLarge(HTTPException):
+    """Raised from `receive` once a request body crosses its limit."""
+
+    def __init__(self) -> None:
+        super().__init__(status_code=413, detail="Request body too large")
+
+
+class RequestSizeLimitMiddleware:
+    """Reject request bodies above a per-route byte limit while they stream in.
+
+    The body is never buffered here: `http.request` chunks are counted as the app reads
+    them and the first chunk that crosses the limit aborts the request with 413. A larger
+    Content-Length is rejected before anything is read. Bodiless methods pass straight
+    through.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int, route_limits: Optional[Dict[str, int]] = None) -> None:
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+        self.route_limits = dict(route_limits or {})
+
+    def limit_for(self, path: str) -> int:
+        return self.route_limits.get(path.rstrip("/") or "/", self.max_body_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in BODYLESS_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.limit_for(scope["path"])
+        content_length = _content_length(scope)
+        if content_length is not None and content_length > limit:
+            await _send_too_large(send)
+            return
+
+        tracked_send = _TrackedSend(send)
+        try:
+            await self.app(scope, _LimitedReceive(receive, limit), tracked_send)
+        except RequestBodyTooLarge:
+            # FastAPI routes turn the exception into a 413 themselves; this covers apps
+            # that read the body without an HTTPException handler in between.
+            if tracked_send.response_started:
+                raise
+            await _send_too_large(send)
+
+
+class _LimitedReceive:
+    """`receive` wrapper that counts body bytes and raises once they cross `limit`."""
+
+    def __init__(self, receive: Receive, limit: int) -> None:
+        self.receive = receive
+        self.limit = limit
+        self.received = 0
+
+    async def __call__(self) -> Message:
+        message = await self.receive()
+        if message["type"] == "http.request":
+            self.received += len(message.get("body", b""))
+            if self.received > self.limit:
+                raise RequestBodyTooLarge()
+        return message
+
+
+class _TrackedSend:
+    """`send` wrapper that remembers whether the response has started."""
+
+    def __init__(self, send: Send) -> None:
+        self.send = send
+        self.response_started = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.response_started = True
+        await self.send(message)
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _send_too_large(send: Send) -> None:
+    body = b'{"detail":"Request body too large"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -1,15 +1,21 @@
 """Re-export schemas used by the API."""
 
 from .execute import (
+    CASE_RESULTS_ADAPTER,
+    CodeExecutionBatchRequest,
     CodeExecutionBatchResponse,
     CodeExecutionRequest,
     CodeExecutionResponse,
     ExecutionMode,
 )
+from .tasks import TaskCacheInvalidateRequest
 
 __all__ = [
+    "CASE_RESULTS_ADAPTER",
+    "CodeExecutionBatchRequest",
     "CodeExecutionBatchResponse",
     "CodeExecutionRequest",
     "CodeExecutionResponse",
     "ExecutionMode",
+    "TaskCacheInvalidateRequest",
 ]
@@ -3,7 +3,7 @@
 from enum import Enum
 from typing import Any, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class ExecutionMode(str, Enum):
@@ -26,6 +26,25 @@ class CodeExecutionRequest(BaseModel):
         default=ExecutionMode.complete_task,
         description="Execution mode: fullTest (first 3 cases), completeTask (all cases) or runCode",
     )
+    fail_fast: bool = Field(
+        default=False,
+        description="Stop grading at the first failing test case (completeTask reports its index as failedIndex)",
+    )
+    include_timing: bool = Field(
+        default=False,
+        description="Add a per-phase timing breakdown (milliseconds) to the response as `timing`",
+    )
+
+
+class CodeExecutionBatchRequest(BaseModel):
+    """Input payload for running many submissions in one API call."""
+
+    items: List[CodeExecutionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Submissions to run; grouped by task into shared sandbox invocations",
+    )
 
 
 class CodeExecutionResponse(BaseModel):
@@ -37,6 +56,14 @@ class CodeExecutionResponse(BaseModel):
     stdout: str = ""
     stderr: str = ""
     error: Optional[str] = None
+    duration_ms: Optional[float] = Field(None, description="Time spent running this test case inside the sandbox")
+    output_dropped_bytes: int = Field(
+        0, description="Bytes of stdout/stderr cut from the middle of the captured output"
+    )
+
+
+# Built once so per-request validation of runner output skips schema construction.
+CASE_RESULTS_ADAPTER = TypeAdapter(List[CodeExecutionResponse])
 
 
 class CodeExecutionBatchResponse(BaseModel):
@@ -46,6 +73,8 @@ class CodeExecutionBatchResponse(BaseModel):
     results: Optional[List[CodeExecutionResponse]] = None
     is_task_passed: Optional[bool] = Field(None, alias="isTaskPassed")
     passed_count: Optional[int] = Field(None, alias="passedCount")
+    failed_index: Optional[int] = Field(None, alias="failedIndex")
+    cached: bool = Field(False, description="True when the result was served from the result cache")
 
     class Config:
         allow_population_by_field_name = True
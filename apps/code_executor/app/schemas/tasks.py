@@ -0,0 +1,14 @@
+"""Pydantic schemas for task definition management endpoints."""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class TaskCacheInvalidateRequest(BaseModel):
+    """Input payload for evicting cached task definitions."""
+
+    task_id: Optional[str] = Field(
+        None,
+        description="Task to evict; omit to clear the whole task definition cache",
+    )
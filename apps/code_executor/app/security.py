@@ -3,8 +3,11 @@ import hashlib
 import hmac
 import json
 import os
+import threading
 import time
-from typing import Any, Dict
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
@@ -14,6 +17,15 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 _bearer_scheme = HTTPBearer(auto_error=False)
 
+TOKEN_CACHE_SIZE = int(os.getenv("EXECUTOR_JWT_CACHE_SIZE", "4096"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("EXECUTOR_JWT_CACHE_TTL_SECONDS", "300"))
+# Scope (in the space-separated `scope` claim) required by internal/admin endpoints.
+ADMIN_SCOPE = os.getenv("EXECUTOR_ADMIN_SCOPE", "executor:admin")
+
+# sha256(token) -> (payload, cache expiry, kid, signing secret). Only successfully verified tokens are stored.
+_VERIFIED_TOKENS: "OrderedDict[bytes, Tuple[Dict[str, Any], float, Optional[str], bytes]]" = OrderedDict()
+_VERIFIED_LOCK = threading.Lock()
+
 
 def _b64url_decode(segment: str) -> bytes:
     """Decode a base64url JWT segment into raw bytes."""
@@ -30,34 +42,107 @@ def _load_json(segment: str) -> Dict[str, Any]:
         raise HTTPException(status_code=401, detail="Invalid token") from None
 
 
-def _jwt_secret() -> str:
-    """Fetch the shared JWT secret from ENV or fail fast."""
-    secret = os.getenv("EXECUTOR_JWT_SECRET") or os.getenv("NEXTAUTH_SECRET")
-    if not secret:
+@lru_cache(maxsize=8)
+def _parse_keys(default_secret: Optional[str], keyed_secrets: Optional[str]) -> Dict[Optional[str], bytes]:
+    """Build the kid -> secret table; the `None` entry serves tokens without a `kid`."""
+    keys: Dict[Optional[str], bytes] = {}
+    if default_secret:
+        keys[None] = default_secret.encode("utf-8")
+    for item in (keyed_secrets or "").split(","):
+        kid, sep, secret = item.strip().partition(":")
+        if sep and kid and secret:
+            keys[kid] = secret.encode("utf-8")
+    return keys
+
+
+def _signing_keys() -> Dict[Optional[str], bytes]:
+    return _parse_keys(
+        os.getenv("EXECUTOR_JWT_SECRET") or os.getenv("NEXTAUTH_SECRET"),
+        os.getenv("EXECUTOR_JWT_SECRETS"),
+    )
+
+
+def _jwt_secret(kid: Optional[str] = None) -> bytes:
+    """Fetch the JWT secret for `kid` from ENV or fail fast.
+
+    Tokens without `kid` use EXECUTOR_JWT_SECRET (or NEXTAUTH_SECRET); EXECUTOR_JWT_SECRETS
+    holds `kid:secret` pairs, so several secrets can be active during a rotation.
+    """
+    keys = _signing_keys()
+    if not keys:
         raise HTTPException(status_code=500, detail="Missing JWT secret")
+    secret = keys.get(kid)
+    if secret is None:
+        raise HTTPException(status_code=401, detail="Invalid token")
     return secret
 
 
+def _cached_payload(digest: bytes) -> Optional[Dict[str, Any]]:
+    """Return the payload of a verified token, unless it expired or its secret was rotated out."""
+    with _VERIFIED_LOCK:
+        hit = _VERIFIED_TOKENS.get(digest)
+        if hit is None:
+            return None
+        payload, expires_at, kid, secret = hit
+        if time.time() >= expires_at or _signing_keys().get(kid) != secret:
+            del _VERIFIED_TOKENS[digest]
+            return None
+        _VERIFIED_TOKENS.move_to_end(digest)
+        return dict(payload)
+
+
+def _remember_payload(digest: bytes, payload: Dict[str, Any], kid: Optional[str], secret: bytes) -> None:
+    if TOKEN_CACHE_SIZE <= 0:
+        return
+    expires_at = time.time() + TOKEN_CACHE_TTL_SECONDS
+    if payload.get("exp") is not None:
+        expires_at = min(expires_at, float(payload["exp"]))
+    with _VERIFIED_LOCK:
+        _VERIFIED_TOKENS[digest] = (dict(payload), expires_at, kid, secret)
+        _VERIFIED_TOKENS.move_to_end(digest)
+        while len(_VERIFIED_TOKENS) > TOKEN_CACHE_SIZE:
+            _VERIFIED_TOKENS.popitem(last=False)
+
+
 def verify_bearer_jwt(token: str) -> Dict[str, Any]:
-    """Validate HS256 JWT and return its payload."""
+    """Validate HS256 JWT and return its payload (served from a cache of verified tokens)."""
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _cached_payload(digest)
+    if cached is not None:
+        return cached
+
     try:
         header_b64, payload_b64, signature_b64 = token.split(".")
     except ValueError:
         raise HTTPException(status_code=401, detail="Invalid token") from None
+    kid, secret = _verify_signature(header_b64, payload_b64, signature_b64)
+    payload = _load_json(payload_b64)
+    _validate_claims(payload)
+    _remember_payload(digest, payload, kid, secret)
+    return payload
+
 
+def _verify_signature(header_b64: str, payload_b64: str, signature_b64: str) -> Tuple[Optional[str], bytes]:
+    """Check the header and HS256 signature; returns the token's `kid` and the secret that signed it."""
     header = _load_json(header_b64)
     if header.get("alg") != "HS256":
         raise HTTPException(status_code=401, detail="Invalid token")
+    kid = header.get("kid")
+    if kid is not None and not isinstance(kid, str):
+        raise HTTPException(status_code=401, detail="Invalid token")
 
+    secret = _jwt_secret(kid)
     signing_input = f"{header_b64}.{payload_b64}".encode("utf-8")
-    expected_sig = hmac.new(_jwt_secret().encode("utf-8"), signing_input, hashlib.sha256).digest()
+    expected_sig = hmac.new(secret, signing_input, hashlib.sha256).digest()
     provided_sig = _b64url_decode(signature_b64)
 
     if not hmac.compare_digest(expected_sig, provided_sig):
         raise HTTPException(status_code=401, detail="Invalid token")
+    return kid, secret
 
-    payload = _load_json(payload_b64)
 
+def _validate_claims(payload: Dict[str, Any]) -> None:
+    """Check issuer, subject and expiry of a payload whose signature is valid."""
     issuer = payload.get("iss")
     if issuer is not None and issuer != "snakecoder":
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -74,8 +159,6 @@ def verify_bearer_jwt(token: str) -> Dict[str, Any]:
         except ValueError:
             raise HTTPException(status_code=401, detail="Invalid token") from None
 
-    return payload
-
 
 def require_app_auth(
     credentials: HTTPAuthorizationCredentials | None = Depends(_bearer_scheme),
@@ -85,3 +168,11 @@ def require_app_auth(
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     return verify_bearer_jwt(credentials.credentials)
+
+
+def require_admin_auth(payload: Dict[str, Any] = Depends(require_app_auth)) -> Dict[str, Any]:
+    """FastAPI dependency for internal endpoints: a valid Bearer JWT whose `scope` holds ADMIN_SCOPE."""
+    scope = payload.get("scope")
+    if not isinstance(scope, str) or ADMIN_SCOPE not in scope.split():
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return payload
@@ -0,0 +1,120 @@
+"""Content-addressed test-data blobs shared read-only with every sandbox.
+
+The test cases of a task version are JSON-encoded once, hashed and written to
+`<EXECUTOR_TEST_BLOB_DIR>/<sha256>.json`. Requests then carry only the digest; the harness
+reads the blob from the directory the backend exposes to it (a read-only bind mount for
+Docker, the host directory for the forkserver). Test-case lists below
+EXECUTOR_TEST_BLOB_MIN_BYTES stay inline, where a file read would cost more than it saves.
+
+Digests are memoized per test-case list object, so a task definition held by the task
+cache is encoded and hashed only once; the same digest keys the result cache.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+TEST_BLOB_DIR = os.getenv("EXECUTOR_TEST_BLOB_DIR", "")
+TEST_BLOB_MIN_BYTES = int(os.getenv("EXECUTOR_TEST_BLOB_MIN_BYTES", "16384"))
+# Where Docker sandboxes see the blob directory.
+SANDBOX_TEST_BLOB_DIR = "/opt/snakecoder/blobs"
+
+TestCases = List[Dict[str, Any]]
+
+
+def encode_test_cases(test_cases: TestCases) -> bytes:
+    """Serialize test cases exactly as the harness reads them back (key order preserved)."""
+    return json.dumps(test_cases, separators=(",", ":")).encode("utf-8")
+
+
+class CaseBlobStore:
+    """Memoized digests of test-case lists plus the blob files written for them."""
+
+    def __init__(
+        self, directory: Optional[Path], min_bytes: int = TEST_BLOB_MIN_BYTES, memo_size: int = 1024
+    ) -> None:
+        self.directory = Path(directory).resolve() if directory else None
+        self.min_bytes = max(0, min_bytes)
+        self.memo_size = max(1, memo_size)
+        # id(list) -> (list, digest, size); holding the list keeps its id from being reused.
+        self._memo: "OrderedDict[int, Tuple[TestCases, str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.encodes = 0
+        self.writes = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        """Return True when a blob directory is configured."""
+        return self.directory is not None
+
+    def digest(self, test_cases: TestCases) -> str:
+        """Return the sha256 of the encoded test cases, encoding each list object only once."""
+        return self._prepare(test_cases)[0]
+
+    def blob_for(self, test_cases: TestCases) -> Optional[str]:
+        """Return the digest of a blob holding `test_cases`, or None to send them inline."""
+        if self.directory is None:
+            return None
+        digest, size = self._prepare(test_cases)
+        if size < self.min_bytes:
+            return None
+        if not self.path_for(digest).exists():
+            # Written on first use, or again if someone cleaned the directory up.
+            self._write(digest, encode_test_cases(test_cases))
+        return digest
+
+    def path_for(self, digest: str) -> Path:
+        """Host path of the blob with `digest`."""
+        return self.directory / f"{digest}.json"
+
+    def stats(self) -> Dict[str, Any]:
+        """Return memo size and how often test cases were encoded and blobs written."""
+        with self._lock:
+            return {"memoized": len(self._memo), "encodes": self.encodes, "writes": self.writes}
+
+    def _prepare(self, test_cases: TestCases) -> Tuple[str, int]:
+        key = id(test_cases)
+        with self._lock:
+            entry = self._memo.get(key)
+            if entry is not None and entry[0] is test_cases:
+                self._memo.move_to_end(key)
+                return entry[1], entry[2]
+        data = encode_test_cases(test_cases)
+        digest = hashlib.sha256(data).hexdigest()
+        if self.directory is not None and len(data) >= self.min_bytes and not self.path_for(digest).exists():
+            self._write(digest, data)
+        with self._lock:
+            self.encodes += 1
+            self._memo[key] = (test_cases, digest, len(data))
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return digest, len(data)
+
+    def _write(self, digest: str, data: bytes) -> None:
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{digest}.", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            # Sandboxes run as an unprivileged user; blobs are world-readable, never writable.
+            os.chmod(tmp_name, 0o444)
+            os.replace(tmp_name, self.path_for(digest))
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+        with self._lock:
+            self.writes += 1
+
+
+CASE_BLOBS = CaseBlobStore(Path(TEST_BLOB_DIR) if TEST_BLOB_DIR else None)
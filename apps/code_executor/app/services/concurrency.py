@@ -0,0 +1,229 @@
+"""Concurrency limit for sandbox runs, fixed or adaptive (AIMD).
+
+The adaptive controller watches per-run sandbox overhead (startup + teardown, which
+does not depend on what the submission does) and the host load average. While both
+stay healthy and callers are queueing, the limit grows by one slot per `limit` runs;
+when overhead exceeds `latency_tolerance` x its baseline or the load per core exceeds
+`load_threshold`, the limit is cut by `decrease_factor` (at most once per cooldown).
+
+Waiting runs are queued per user and served round-robin (deficit round robin with a
+unit cost per run), so a user with many queued runs cannot starve the others. An
+optional per-user cap bounds how many slots one user may hold at once.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+
+def _default_limit() -> int:
+    value = os.getenv("EXECUTOR_CONCURRENCY_LIMIT", "4")
+    if value == "auto":
+        return os.cpu_count() or 4
+    return int(value)
+
+
+CONCURRENCY_LIMIT = _default_limit()
+CONCURRENCY_ADAPTIVE = os.getenv("EXECUTOR_CONCURRENCY_ADAPTIVE", "0") == "1"
+CONCURRENCY_MIN = int(os.getenv("EXECUTOR_CONCURRENCY_MIN", "1"))
+CONCURRENCY_MAX = int(os.getenv("EXECUTOR_CONCURRENCY_MAX", str(max(CONCURRENCY_LIMIT, 2 * (os.cpu_count() or 2)))))
+CONCURRENCY_LATENCY_TOLERANCE = float(os.getenv("EXECUTOR_CONCURRENCY_LATENCY_TOLERANCE", "2"))
+CONCURRENCY_LOAD_THRESHOLD = float(os.getenv("EXECUTOR_CONCURRENCY_LOAD_THRESHOLD", "1.5"))
+CONCURRENCY_PER_USER = int(os.getenv("EXECUTOR_USER_MAX_CONCURRENT", "0"))
+
+_HISTORY_SIZE = 50
+_NOBODY = object()
+
+
+def _load_per_core() -> Optional[float]:
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+
+class ConcurrencyLimiter:
+    """Async semaphore whose number of slots can change while it is in use."""
+
+    def __init__(
+        self,
+        limit: int,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        latency_tolerance: float = 2.0,
+        load_threshold: float = 1.5,
+        decrease_factor: float = 0.75,
+        cooldown_seconds: float = 2.0,
+        per_user_limit: int = 0,
+    ) -> None:
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit or limit)
+        self.adaptive = adaptive
+        self.latency_tolerance = latency_tolerance
+        self.load_threshold = load_threshold
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self._limit = float(min(max(limit, self.min_limit), self.max_limit))
+        self.per_user_limit = max(0, per_user_limit)
+        self._in_flight = 0
+        self._user_in_flight: Dict[Optional[str], int] = {}
+        # One FIFO per user; the dict order is the round-robin order of users with waiters.
+        self._queues: "OrderedDict[Optional[str], Deque[asyncio.Future]]" = OrderedDict()
+        self._saturated = False
+        self._baseline: Optional[float] = None
+        self._recent: Optional[float] = None
+        self._last_decrease = 0.0
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=_HISTORY_SIZE)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, user: Optional[str] = None) -> None:
+        """Wait for a free slot; waiting users take turns, each user's runs stay FIFO."""
+        if not self._queues and self._can_start(user):
+            self._start(user)
+            return
+        if self._in_flight >= self.limit:
+            self._saturated = True
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user, deque()).append(waiter)
+        # Slots may be free while other users' waiters are held back only by the per-user cap.
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation; pass it on.
+                self.release(user)
+            else:
+                self._discard(user, waiter)
+            raise
+
+    def release(self, user: Optional[str] = None) -> None:
+        """Return a slot and wake the next eligible waiter."""
+        self._in_flight -= 1
+        remaining = self._user_in_flight.get(user, 0) - 1
+        if remaining > 0:
+            self._user_in_flight[user] = remaining
+        else:
+            self._user_in_flight.pop(user, None)
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, user: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one slot on behalf of `user` for the duration of the block."""
+        await self.acquire(user)
+        try:
+            yield
+        finally:
+            self.release(user)
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.release()
+
+    def observe(self, overhead_seconds: float) -> None:
+        """Feed one run's sandbox overhead to the adaptive controller."""
+        if not self.adaptive or overhead_seconds <= 0:
+            return
+        if self._baseline is None or overhead_seconds < self._baseline:
+            self._baseline = overhead_seconds
+        else:
+            # Let the baseline creep up slowly so one lucky sample does not pin it forever.
+            self._baseline += 0.01 * (overhead_seconds - self._baseline)
+        self._recent = overhead_seconds if self._recent is None else 0.8 * self._recent + 0.2 * overhead_seconds
+
+        load = _load_per_core()
+        if load is not None and load > self.load_threshold:
+            self._decrease("host_load", load=round(load, 2))
+        elif self._recent > self._baseline * self.latency_tolerance:
+            self._decrease("latency", overhead_ms=round(self._recent * 1000, 1))
+        elif self._saturated and self._limit < self.max_limit:
+            previous = self.limit
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            if self.limit != previous:
+                self._record(previous, "increase")
+                self._saturated = False
+                self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limit, usage and the most recent limit changes."""
+        return {
+            "adaptive": self.adaptive,
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "waiting": self.waiting,
+            "users_waiting": len(self._queues),
+            "per_user_limit": self.per_user_limit,
+            "baseline_overhead_ms": round(self._baseline * 1000, 3) if self._baseline is not None else None,
+            "recent_overhead_ms": round(self._recent * 1000, 3) if self._recent is not None else None,
+            "history": list(self.history),
+        }
+
+    def _decrease(self, reason: str, **details: Any) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds or self.limit <= self.min_limit:
+            return
+        previous = self.limit
+        self._limit = float(max(self.min_limit, math.floor(self._limit * self.decrease_factor)))
+        self._last_decrease = now
+        self._saturated = False
+        self._record(previous, reason, **details)
+
+    def _record(self, previous: int, reason: str, **details: Any) -> None:
+        self.history.append({"at": time.time(), "from": previous, "to": self.limit, "reason": reason, **details})
+
+    def _can_start(self, user: Optional[str]) -> bool:
+        if self._in_flight >= self.limit:
+            return False
+        return not self.per_user_limit or self._user_in_flight.get(user, 0) < self.per_user_limit
+
+    def _start(self, user: Optional[str]) -> None:
+        self._in_flight += 1
+        self._user_in_flight[user] = self._user_in_flight.get(user, 0) + 1
+
+    def _discard(self, user: Optional[str], waiter: asyncio.Future) -> None:
+        queue = self._queues.get(user)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        if not queue:
+            del self._queues[user]
+
+    def _wake(self) -> None:
+        while self._in_flight < self.limit:
+            user = next((candidate for candidate in self._queues if self._can_start(candidate)), _NOBODY)
+            if user is _NOBODY:
+                return
+            queue = self._queues.pop(user)
+            waiter = queue.popleft()
+            if queue:
+                # Served users go to the back of the round-robin order.
+                self._queues[user] = queue
+            if waiter.done():
+                # Cancelled while queued (client went away); its slot goes to the next waiter.
+                continue
+            self._start(user)
+            waiter.set_result(None)
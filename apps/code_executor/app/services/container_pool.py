@@ -0,0 +1,148 @@
+"""Warm pool of pre-started sandbox containers.
+
+Every pooled container is started with the same lock-down flags as a cold run and
+blocks on stdin until a payload arrives. A container is used for exactly one run
+and is then discarded; a background task keeps the pool topped up.
+"""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Deque, List, Optional
+
+
+@dataclass
+class WarmContainer:
+    """A started container process waiting for its single payload."""
+
+    name: str
+    process: asyncio.subprocess.Process
+    created_at: float = field(default_factory=time.monotonic)
+
+    def is_alive(self) -> bool:
+        """Return True while the container process has not exited."""
+        return self.process.returncode is None
+
+
+class ContainerPool:
+    """Keeps up to `size` idle containers ready and refills them in the background."""
+
+    def __init__(
+        self,
+        size: int,
+        refill_per_second: float,
+        max_idle_seconds: float,
+        spawn: Callable[[str], Awaitable[asyncio.subprocess.Process]],
+        next_name: Callable[[], str],
+        discard: Callable[[str], Awaitable[None]],
+    ) -> None:
+        self.size = max(0, size)
+        self.refill_per_second = max(0.1, refill_per_second)
+        self.max_idle_seconds = max(1.0, max_idle_seconds)
+        self._spawn = spawn
+        self._next_name = next_name
+        self._discard = discard
+        self._idle: Deque[WarmContainer] = deque()
+        self._graveyard: List[WarmContainer] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def enabled(self) -> bool:
+        """Return True when the pool is configured with a positive size."""
+        return self.size > 0
+
+    async def start(self) -> None:
+        """Start the background refill task (no-op when disabled or running)."""
+        if not self.enabled or self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop(), name="container-pool")
+
+    async def stop(self) -> None:
+        """Stop refilling and tear down every idle container."""
+        if self._task is not None:
+            # asyncio.wait_for can swallow a cancel that lands as its wait completes, so the
+            # loop also checks the flag before every round.
+            self._stopping = True
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        leftovers = list(self._idle) + self._graveyard
+        self._idle.clear()
+        self._graveyard = []
+        await asyncio.gather(*(self._retire(container) for container in leftovers))
+
+    def acquire(self) -> Optional[WarmContainer]:
+        """Pop a live, non-expired container or return None when the pool is empty."""
+        if not self.enabled:
+            return None
+        acquired = None
+        while self._idle:
+            container = self._idle.popleft()
+            if container.is_alive() and not self._is_expired(container):
+                acquired = container
+                break
+            # Retiring means `docker rm`; leave that to the refill task, not the request.
+            self._graveyard.append(container)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return acquired
+
+    def idle_count(self) -> int:
+        """Return the number of containers currently waiting in the pool."""
+        return len(self._idle)
+
+    def _is_expired(self, container: WarmContainer) -> bool:
+        return time.monotonic() - container.created_at > self.max_idle_seconds
+
+    async def _retire(self, container: WarmContainer) -> None:
+        try:
+            container.process.kill()
+        except ProcessLookupError:
+            pass
+        try:
+            await asyncio.wait_for(container.process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            pass
+        await self._discard(container.name)
+
+    async def _evict_expired(self) -> None:
+        expired = [c for c in self._idle if not c.is_alive() or self._is_expired(c)]
+        for container in expired:
+            self._idle.remove(container)
+        expired.extend(self._graveyard)
+        self._graveyard = []
+        await asyncio.gather(*(self._retire(container) for container in expired))
+
+    async def _refill_loop(self) -> None:
+        interval = 1.0 / self.refill_per_second
+        while not self._stopping:
+            await self._evict_expired()
+            if len(self._idle) >= self.size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(self.max_idle_seconds, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            name = self._next_name()
+            try:
+                process = await self._spawn(name)
+            except FileNotFoundError:
+                # Docker is not installed; keep retrying slowly so a later install is picked up.
+                await asyncio.sleep(30)
+                continue
+            except Exception:
+                await asyncio.sleep(interval)
+                continue
+
+            self._idle.append(WarmContainer(name=name, process=process))
+            await asyncio.sleep(interval)
@@ -0,0 +1,151 @@
+"""Background removal of sandbox containers, off the request path.
+
+Backends hand the name of every container they are done with (timed out, cancelled,
+broken channel) to `ContainerReaper.schedule` and return right away; the reaper removes
+queued names in batches. A periodic sweep also lists every `code_exec_*` container on
+the host and removes the ones past their deadline, so containers leaked by a crashed or
+killed service are collected too. The first sweep runs at startup.
+
+A container's deadline is its creation time, taken from its name (see
+`docker_sandbox.next_container_name`), plus `max_age_seconds`.
+"""
+
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, Set
+
+from .metrics import CONTAINERS_LEAKED_TOTAL, CONTAINERS_REAPED_TOTAL
+
+
+REAPER_INTERVAL_SECONDS = float(os.getenv("EXECUTOR_REAPER_INTERVAL_SECONDS", "60"))
+REAPER_BATCH_SIZE = int(os.getenv("EXECUTOR_REAPER_BATCH_SIZE", "50"))
+CONTAINER_MAX_AGE_SECONDS = float(os.getenv("EXECUTOR_CONTAINER_MAX_AGE_SECONDS", "900"))
+
+ListContainers = Callable[[], Awaitable[List[str]]]
+RemoveContainers = Callable[[List[str]], Awaitable[None]]
+
+
+def container_created_at(name: str, prefix: str) -> Optional[float]:
+    """Return the creation time (epoch seconds) encoded in a sandbox container name."""
+    if not name.startswith(prefix):
+        return None
+    try:
+        return int(name[len(prefix) :].rsplit("-", 1)[1]) / 1e9
+    except (IndexError, ValueError):
+        return None
+
+
+class ContainerReaper:
+    """Removes finished containers in batches and sweeps leaked ones periodically."""
+
+    def __init__(
+        self,
+        list_containers: ListContainers,
+        remove_containers: RemoveContainers,
+        prefix: str,
+        interval_seconds: float = REAPER_INTERVAL_SECONDS,
+        batch_size: int = REAPER_BATCH_SIZE,
+        max_age_seconds: float = CONTAINER_MAX_AGE_SECONDS,
+    ) -> None:
+        self.prefix = prefix
+        self.interval_seconds = max(1.0, interval_seconds)
+        self.batch_size = max(1, batch_size)
+        self.max_age_seconds = max(1.0, max_age_seconds)
+        self._list = list_containers
+        self._remove = remove_containers
+        self._pending: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._flushes: Set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of containers queued for removal."""
+        return len(self._pending)
+
+    def schedule(self, name: Optional[str]) -> None:
+        """Queue a container for removal without waiting for it."""
+        if not name:
+            return
+        self._pending.add(name)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        elif self._task is None:
+            # Not started (e.g. a backend used without `start`): remove it on its own.
+            task = asyncio.get_running_loop().create_task(self.flush())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def start(self) -> None:
+        """Sweep containers left over by a previous process, then start the background task."""
+        if self._task is not None:
+            return
+        await self.sweep()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._loop(), name="container-reaper")
+
+    async def stop(self) -> None:
+        """Stop the background task and remove whatever is still queued."""
+        if self._task is not None:
+            # Wake the loop instead of cancelling it, so a batch in flight is not abandoned.
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Remove every queued container; returns how many were removed."""
+        names = list(self._pending)
+        self._pending.difference_update(names)
+        removed = await self._remove_batches(names)
+        CONTAINERS_REAPED_TOTAL.inc(removed)
+        return removed
+
+    async def sweep(self) -> int:
+        """Remove sandbox containers past their deadline; returns how many were found."""
+        try:
+            names = await self._list()
+        except Exception:
+            # Daemon unreachable; the next sweep tries again.
+            return 0
+        now = time.time()
+        leaked = [name for name in names if name not in self._pending and self._expired(name, now)]
+        CONTAINERS_LEAKED_TOTAL.inc(len(leaked))
+        await self._remove_batches(leaked)
+        return len(leaked)
+
+    def _expired(self, name: str, now: float) -> bool:
+        created_at = container_created_at(name, self.prefix)
+        return created_at is not None and now - created_at > self.max_age_seconds
+
+    async def _remove_batches(self, names: List[str]) -> int:
+        removed = 0
+        for start in range(0, len(names), self.batch_size):
+            batch = names[start : start + self.batch_size]
+            try:
+                await self._remove(batch)
+            except Exception:
+                # Whatever is left behind is picked up again by a later sweep.
+                continue
+            removed += len(batch)
+        return removed
+
+    async def _loop(self) -> None:
+        next_sweep = time.monotonic() + self.interval_seconds
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, next_sweep - time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if not self._stopping and time.monotonic() >= next_sweep:
+                await self.sweep()
+                next_sweep = time.monotonic() + self.interval_seconds
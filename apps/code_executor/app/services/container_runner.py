@@ -1,479 +1,511 @@
-"""Docker-backed sandbox runner for user code execution."""
+"""Sandboxed runner for user code execution (Docker or forkserver backend)."""
 
-import json
+import asyncio
 import os
-import subprocess
-import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .case_blobs import CASE_BLOBS
+from .concurrency import (
+    CONCURRENCY_ADAPTIVE,
+    CONCURRENCY_LATENCY_TOLERANCE,
+    CONCURRENCY_LIMIT,
+    CONCURRENCY_LOAD_THRESHOLD,
+    CONCURRENCY_MAX,
+    CONCURRENCY_MIN,
+    CONCURRENCY_PER_USER,
+    ConcurrencyLimiter,
+)
+from .harness import OUTPUT_BUDGET_BYTES, OUTPUT_HARD_LIMIT_BYTES
+from .ipc import BATCH_ITEM, CASE, LOG, REQUEST, SUMMARY, encode_frame
+from .log_sink import (
+    LOG_BACKUPS,
+    LOG_BATCH_SIZE,
+    LOG_FLUSH_SECONDS,
+    LOG_MAX_BYTES,
+    LOG_MAX_OUTPUT_BYTES,
+    LOG_QUEUE_SIZE,
+    LOG_ROTATE_SECONDS,
+    LogSink,
+)
+from .metrics import (
+    CASES_PER_RUN,
+    CONCURRENCY_FREE_SLOTS,
+    CONCURRENCY_LIMIT_GAUGE,
+    CONCURRENCY_WAITING,
+    RUNS_IN_FLIGHT,
+    RUNS_TOTAL,
+    SANDBOX_RUN_SECONDS,
+    SANDBOX_WAIT_SECONDS,
+)
+from .sandbox import (
+    SandboxBackend,
+    SandboxProtocolError,
+    SandboxRun,
+    SandboxTimeoutError,
+    SandboxUnavailableError,
+    create_sandbox_backend,
+)
 
 
-CONTAINER_PYTHON = r"""
-import inspect
-import json
-import sys
-import io
-import contextlib
+class ContainerExecutionError(RuntimeError):
+    """Raised when code execution inside the container fails.
 
+    `partial_results` holds the results the harness delivered before the failure. `crashed` is set
+    when the sandbox ran but the harness died or sent garbage (rather than timing out or not starting).
+    """
 
-def build_env(source: str, data=None, run_as_main=False):
-    if data is None:
-        data = {}
+    def __init__(
+        self, message: str, partial_results: Optional[List[Dict[str, Any]]] = None, crashed: bool = False
+    ) -> None:
+        super().__init__(message)
+        self.partial_results = partial_results or []
+        self.crashed = crashed
 
-    env = {
-        "__builtins__": __builtins__,
-        "__name__": "__main__" if run_as_main else "user_code",
-    }
-    env.update(data)
 
-    compiled = compile(source, "<user_code>", "exec")
-    exec(compiled, env, env)
-    return env
+_CONCURRENCY_GUARD = ConcurrencyLimiter(
+    CONCURRENCY_LIMIT,
+    adaptive=CONCURRENCY_ADAPTIVE,
+    min_limit=CONCURRENCY_MIN,
+    max_limit=CONCURRENCY_MAX if CONCURRENCY_ADAPTIVE else CONCURRENCY_LIMIT,
+    latency_tolerance=CONCURRENCY_LATENCY_TOLERANCE,
+    load_threshold=CONCURRENCY_LOAD_THRESHOLD,
+    per_user_limit=CONCURRENCY_PER_USER,
+)
+_BACKEND: SandboxBackend = create_sandbox_backend()
+CONCURRENCY_LIMIT_GAUGE.set_function(lambda: _CONCURRENCY_GUARD.limit)
+CONCURRENCY_FREE_SLOTS.set_function(lambda: max(0, _CONCURRENCY_GUARD.limit - _CONCURRENCY_GUARD.in_flight))
+CONCURRENCY_WAITING.set_function(lambda: _CONCURRENCY_GUARD.waiting)
 
 
-def execute_user_code(
-    source: str,
-    data=None,
-    entry_point=None,
-    entry_args=None,
-    entry_kwargs=None,
-    run_as_main=False,
-    env=None,
-):
-    if env is None:
-        env = build_env(source, data=data, run_as_main=run_as_main)
-
-    if entry_point:
-        func = env.get(entry_point)
-        if not callable(func):
-            return f"Error: function '{entry_point}' not found"
-
-        return func(*(entry_args or []), **(entry_kwargs or {}))
-
-    if "result" in env:
-        return env["result"]
-
-    return None
-
-
-def sanitize_output(text, limit=8192):
-    if text is None:
-        return ""
-    lines = str(text).splitlines()
-    cleaned = "\n".join(line.rstrip() for line in lines).rstrip()
-    if len(cleaned) <= limit:
-        return cleaned
-    return cleaned[:limit] + f"... [truncated {len(cleaned) - limit} chars]"
-
-def parse_value(text, annotation):
-    if annotation is inspect._empty or annotation is None or annotation is str:
-        return text
-
-    raw = str(text).strip()
-
-    if annotation is int:
-        return int(raw) if raw else 0
-    if annotation is float:
-        return float(raw) if raw else 0.0
-    if annotation is bool:
-        lowered = raw.lower()
-        if lowered in {"true", "1", "yes", "y", "t"}:
-            return True
-        if lowered in {"false", "0", "no", "n", "f", ""}:
-            return False
-        return bool(int(raw)) if raw else False
-
-    origin = getattr(annotation, "__origin__", None)
-    args = getattr(annotation, "__args__", None) or ()
-    if origin in {list, tuple}:
-        inner = args[0] if args else str
-        tokens = raw.split() if raw else []
-        values = [parse_value(tok, inner) for tok in tokens]
-        return values if origin is list else tuple(values)
-
-    return text
-
-def resolve_call_args(func, env, entry_args, entry_kwargs, stdin_text_for_entry):
-    if not callable(func):
-        raise ValueError("Error: function not found")
-    if entry_args is not None or entry_kwargs is not None:
-        return entry_args or [], entry_kwargs or {}
-
-    signature = inspect.signature(func)
-    if stdin_text_for_entry is not None:
-        return build_args_from_stdin(stdin_text_for_entry, signature)
-
-    args_to_use = []
-    kwargs_to_use = {}
-    for name, param in signature.parameters.items():
-        if param.kind in (
-            inspect.Parameter.POSITIONAL_ONLY,
-            inspect.Parameter.POSITIONAL_OR_KEYWORD,
-        ):
-            if name in env:
-                args_to_use.append(env[name])
-            elif param.default is not inspect.Parameter.empty:
-                args_to_use.append(param.default)
-            else:
-                raise ValueError(f"Error: missing argument '{name}' for '{func.__name__}'")
-        elif param.kind == inspect.Parameter.KEYWORD_ONLY:
-            if name in env:
-                kwargs_to_use[name] = env[name]
-            elif param.default is not inspect.Parameter.empty:
-                kwargs_to_use[name] = param.default
-            else:
-                raise ValueError(f"Error: missing argument '{name}' for '{func.__name__}'")
-    return args_to_use, kwargs_to_use
-
-def build_args_from_stdin(stdin_text, signature):
-    params = [
-        p
-        for p in signature.parameters.values()
-        if p.kind in (
-            inspect.Parameter.POSITIONAL_ONLY,
-            inspect.Parameter.POSITIONAL_OR_KEYWORD,
-        )
-    ]
+_OUTPUT_LIMITS = {"output_budget": OUTPUT_BUDGET_BYTES, "output_hard_limit": OUTPUT_HARD_LIMIT_BYTES}
+BATCH_TIMEOUT_SECONDS = float(os.getenv("EXECUTOR_BATCH_TIMEOUT_SECONDS", "60"))
 
-    if not params:
-        return [], {}
 
-    if len(params) == 1:
-        return [parse_value(stdin_text, params[0].annotation)], {}
+def _test_case_fields(test_cases: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Test cases for the harness request: a blob digest when the sandbox can read blobs, else inline."""
+    if _BACKEND.test_blob_dir is not None:
+        digest = CASE_BLOBS.blob_for(test_cases)
+        if digest is not None:
+            return {"test_cases_blob": digest, "test_blob_dir": _BACKEND.test_blob_dir}
+    return {"test_cases": test_cases}
 
-    tokens = str(stdin_text).split()
-    args = []
-    for idx, param in enumerate(params):
-        if idx < len(tokens):
-            args.append(parse_value(tokens[idx], param.annotation))
-        elif param.default is not inspect._empty:
-            args.append(param.default)
-        else:
-            args.append(parse_value("", param.annotation))
-    return args, {}
 
-def run_single_case(source, entry_point, data, expected, stdin_text=None):
-    buf_out = io.StringIO()
-    buf_err = io.StringIO()
+def concurrency_stats() -> Dict[str, Any]:
+    """Returns the sandbox concurrency limit, its usage and recent adaptive changes."""
+    return _CONCURRENCY_GUARD.stats()
 
-    original_stdin = sys.stdin
-
-    with contextlib.redirect_stdout(buf_out), contextlib.redirect_stderr(buf_err):
-        try:
-            use_entry_from_stdin = stdin_text is not None and entry_point is not None
-
-            if stdin_text is not None and entry_point is None:
-                sys.stdin = io.StringIO(str(stdin_text))
-
-            env = build_env(source, data=data, run_as_main=stdin_text is not None and entry_point is None)
-            entry_args = None
-            entry_kwargs = None
-            if entry_point is not None:
-                func = env.get(entry_point)
-                if not callable(func):
-                    raise ValueError(f"Error: function '{entry_point}' not found")
-                entry_args, entry_kwargs = resolve_call_args(
-                    func=func,
-                    env=env,
-                    entry_args=None,
-                    entry_kwargs=None,
-                    stdin_text_for_entry=stdin_text if use_entry_from_stdin else None,
-                )
-            raw_result = execute_user_code(
-                source=source,
-                data=data,
-                entry_point=entry_point,
-                entry_args=entry_args,
-                entry_kwargs=entry_kwargs,
-                run_as_main=stdin_text is not None and entry_point is None,
-                env=env,
-            )
-            error = None
-        except Exception as exc:
-            raw_result = f"{exc.__class__.__name__}: {exc}"
-            error = f"{exc.__class__.__name__}: {exc}"
-        finally:
-            sys.stdin = original_stdin
-
-    actual_output = sanitize_output(buf_out.getvalue())
-    if stdin_text is not None:
-        expected_norm = sanitize_output(expected)
-        output_value = raw_result if entry_point is not None else actual_output
-        actual = sanitize_output(output_value)
-        passed = actual == expected_norm
-    else:
-        actual = json.loads(json.dumps(raw_result, default=str))
-        passed = actual == expected
-
-    return {
-        "expected": expected,
-        "actual": actual,
-        "passed": passed,
-        "stdout": sanitize_output(buf_out.getvalue()),
-        "stderr": sanitize_output(buf_err.getvalue()),
-        "error": error,
-    }
 
+async def start_sandbox_backend() -> None:
+    """Starts long-lived resources of the configured backend (warm pool, forkserver)."""
+    await _BACKEND.start()
 
-def main():
-    payload = json.load(sys.stdin)
-    source = payload.get("source") or ""
-    entry_point = payload.get("entry_point")
-    test_cases = payload.get("test_cases") or []
 
-    results = []
-    for case in test_cases:
-        data = case.get("data") or {}
-        expected = case.get("expected")
-        stdin_text = case.get("stdin")
-        case_result = run_single_case(source, entry_point, data, expected, stdin_text=stdin_text)
-        results.append(case_result)
+async def stop_sandbox_backend() -> None:
+    """Stops the configured backend and releases its resources."""
+    await _BACKEND.stop()
 
-    json.dump({"results": results}, sys.stdout)
 
+_LOG_DIR = Path(os.getenv("EXECUTOR_LOG_DIR", Path(__file__).resolve().parents[3] / "logs"))
+_LOG_PATH = _LOG_DIR / "executor.jsonl"
 
-if __name__ == "__main__":
-    main()
-"""
 
+LOG_SINK = LogSink(
+    path=_LOG_PATH,
+    queue_size=LOG_QUEUE_SIZE,
+    batch_size=LOG_BATCH_SIZE,
+    flush_seconds=LOG_FLUSH_SECONDS,
+    max_bytes=LOG_MAX_BYTES,
+    rotate_seconds=LOG_ROTATE_SECONDS,
+    backups=LOG_BACKUPS,
+    max_output_bytes=LOG_MAX_OUTPUT_BYTES,
+)
 
-class ContainerExecutionError(RuntimeError):
-    """Raised when code execution inside the container fails."""
-    pass
 
+def write_log(entry: Dict[str, Any]) -> None:
+    """Queue one structured entry for executor.jsonl (never blocks, never raises)."""
+    LOG_SINK.write(entry)
 
-_CONTAINER_PREFIX = "code_exec_"
-_CONCURRENCY_GUARD = threading.BoundedSemaphore(4)
 
+def _add_metrics(entry: Dict[str, Any], proc: Optional[SandboxRun], timeout_seconds: Optional[int] = None) -> None:
+    entry["channel_bytes"] = proc.channel_bytes if proc else 0
+    entry["frames"] = proc.frames if proc else 0
+    entry["stderr_bytes"] = len(proc.stderr.encode("utf-8")) if proc and proc.stderr else 0
+    entry["timeout_seconds"] = timeout_seconds
+    entry["backend"] = _BACKEND.name
+
+
+def _log_run(
+    status: str,
+    started_at: float,
+    timeout: float,
+    meta: Optional[Dict[str, Any]],
+    container_name: Optional[str] = None,
+    proc: Optional[SandboxRun] = None,
+    **extra: Any,
+) -> None:
+    """Write one `executor_run` entry with timing, sandbox and output details."""
+    finished_at = time.time()
+    entry = {
+        "event": "executor_run",
+        "status": status,
+        "started_at": datetime.fromtimestamp(started_at, tz=timezone.utc).isoformat(),
+        "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
+        "duration_ms": int((finished_at - started_at) * 1000),
+        "container_name": container_name,
+        **extra,
+    }
+    if proc is not None:
+        entry["exit_code"] = proc.returncode
+        entry["stderr"] = proc.stderr
+    entry.update(meta or {})
+    _add_metrics(entry, proc, timeout_seconds=timeout)
+    write_log(entry)
+    RUNS_TOTAL.inc(status=extra.get("error") or status, mode=str((meta or {}).get("mode") or "unknown"))
+    if "tests_total" in extra:
+        CASES_PER_RUN.observe(extra["tests_total"])
 
-def _next_container_name() -> str:
-    """Generates a unique container name with the required prefix."""
-    unique = f"{threading.get_ident()}-{time.time_ns()}"
-    return f"{_CONTAINER_PREFIX}{unique}"
 
+def _ms(seconds: float) -> float:
+    """Converts seconds to milliseconds, rounded to microseconds for logs and timing breakdowns."""
+    return round(seconds * 1000, 3)
 
-def _release_container_name(_: str) -> None:
-    """No-op for name release (kept for API symmetry)."""
-    return None
 
+def _add_harness_phases(phases: Dict[str, float], proc: SandboxRun, timing: Any) -> None:
+    """Adds the in-sandbox phases reported by the harness to the host-side ones.
 
-def _force_remove_container(name: Optional[str]) -> None:
-    """Removes a container if it was left behind or hung."""
-    if not name:
+    `startup_ms` covers sandbox start, interpreter boot and payload transfer (near zero for warm
+    sandboxes); `teardown_ms` covers output serialization, interpreter exit and sandbox removal.
+    """
+    if not isinstance(timing, dict):
         return
-    subprocess.run(
-        ["docker", "rm", "-f", name],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-
-
-_LOG_DIR = Path(os.getenv("EXECUTOR_LOG_DIR", Path(__file__).resolve().parents[3] / "logs"))
-_LOG_PATH = _LOG_DIR / "executor.jsonl"
-
-
-def _write_log(entry: Dict[str, Any]) -> None:
     try:
-        _LOG_DIR.mkdir(parents=True, exist_ok=True)
-        with _LOG_PATH.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
-    except Exception:
+        phases["startup_ms"] = max(0.0, _ms(float(timing["ready_at"]) - proc.started_at))
+        phases["compile_ms"] = float(timing["compile_ms"])
+        phases["cases_ms"] = float(timing["cases_ms"])
+        phases["teardown_ms"] = max(0.0, _ms(proc.finished_at - float(timing["finished_at"])))
+    except (KeyError, TypeError, ValueError):
         return
+    # Sandbox overhead does not depend on the submission, so it is the adaptive limiter's signal.
+    _CONCURRENCY_GUARD.observe((phases["startup_ms"] + phases["teardown_ms"]) / 1000)
+
+
+class _HarnessOutput:
+    """Collects the frames of one harness run as the backend decodes them."""
+
+    def __init__(self, item_kind: bytes, on_item: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> None:
+        self.item_kind = item_kind
+        self.on_item = on_item
+        self.items: List[Dict[str, Any]] = []
+        self.logs: List[Any] = []
+        self.summary: Optional[Dict[str, Any]] = None
+
+    def __call__(self, kind: bytes, record: Any) -> None:
+        if kind == self.item_kind and isinstance(record, dict) and isinstance(record.get("result"), dict):
+            self.items.append(record["result"])
+            if self.on_item is not None:
+                self.on_item(len(self.items) - 1, record["result"])
+        elif kind == SUMMARY and isinstance(record, dict):
+            self.summary = record
+        elif kind == LOG:
+            self.logs.append(record)
+
+    def log_fields(self) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {"items_received": len(self.items)}
+        if self.logs:
+            fields["harness_logs"] = self.logs
+        return fields
+
+
+async def _run_sandbox(
+    payload: Dict[str, Any],
+    timeout: float,
+    meta: Optional[Dict[str, Any]],
+    started_at: float,
+    phases: Dict[str, float],
+    output: _HarnessOutput,
+) -> SandboxRun:
+    """Runs the harness once and raises ContainerExecutionError unless it exits cleanly.
+
+    Frames are handed to `output` while the sandbox runs. Records `queue_wait_ms` and
+    `sandbox_ms` in `phases`.
+    """
+    waiting_since = time.perf_counter()
+    try:
+        async with _CONCURRENCY_GUARD.slot((meta or {}).get("user_id")):
+            run_started = time.perf_counter()
+            run_started_at = time.time()
+            phases["queue_wait_ms"] = _ms(run_started - waiting_since)
+            SANDBOX_WAIT_SECONDS.observe(run_started - waiting_since)
+            RUNS_IN_FLIGHT.inc()
+            try:
+                proc = await _BACKEND.run(encode_frame(REQUEST, payload), timeout, on_frame=output)
+            finally:
+                RUNS_IN_FLIGHT.dec()
+                phases["sandbox_ms"] = _ms(time.perf_counter() - run_started)
+                SANDBOX_RUN_SECONDS.observe(time.perf_counter() - run_started, backend=_BACKEND.name)
+            proc.started_at = run_started_at
+            proc.finished_at = time.time()
+            phases["parse_ms"] = _ms(proc.decode_seconds)
+    except SandboxUnavailableError as exc:
+        _log_run("error", started_at, timeout, meta, error=exc.reason, phases=phases)
+        raise ContainerExecutionError(str(exc)) from exc
+    except SandboxTimeoutError as exc:
+        _log_run(
+            "timeout",
+            started_at,
+            timeout,
+            meta,
+            container_name=exc.name,
+            warm=exc.warm,
+            phases=phases,
+            **output.log_fields(),
+        )
+        raise ContainerExecutionError(
+            f"Container execution exceeded timeout ({timeout}s).", partial_results=output.items
+        ) from exc
+    except SandboxProtocolError as exc:
+        _log_run(
+            "error",
+            started_at,
+            timeout,
+            meta,
+            container_name=exc.name,
+            error="invalid_frame",
+            phases=phases,
+            **output.log_fields(),
+        )
+        raise ContainerExecutionError(
+            f"Invalid frame from container: {exc}", partial_results=output.items, crashed=True
+        ) from exc
+
+    if proc.returncode != 0:
+        stderr = proc.stderr.strip()
+        _log_run(
+            "error",
+            started_at,
+            timeout,
+            meta,
+            container_name=proc.name,
+            proc=proc,
+            phases=phases,
+            **output.log_fields(),
+        )
+        raise ContainerExecutionError(
+            f"Container exited with code {proc.returncode}: {stderr or 'no stderr'}",
+            partial_results=output.items,
+            crashed=True,
+        )
+    return proc
 
 
-def _add_metrics(entry: Dict[str, Any], stdout: str, stderr: str, timeout_seconds: Optional[int] = None) -> None:
-    entry["stdout_bytes"] = len(stdout.encode("utf-8")) if stdout is not None else 0
-    entry["stderr_bytes"] = len(stderr.encode("utf-8")) if stderr is not None else 0
-    entry["timeout_seconds"] = timeout_seconds
+async def _run_harness(
+    payload: Dict[str, Any],
+    timeout: float,
+    meta: Optional[Dict[str, Any]],
+    phases: Dict[str, float],
+    output: _HarnessOutput,
+) -> Tuple[SandboxRun, float]:
+    """Runs the harness once and checks that it finished with a summary frame."""
+    started_at = time.time()
+    proc = await _run_sandbox(payload, timeout, meta, started_at, phases, output)
+    if output.summary is None:
+        _log_run(
+            "error",
+            started_at,
+            timeout,
+            meta,
+            container_name=proc.name,
+            proc=proc,
+            error="unexpected_payload",
+            **output.log_fields(),
+        )
+        raise ContainerExecutionError("Container returned unexpected payload", partial_results=output.items)
+    _add_harness_phases(phases, proc, output.summary.get("timing"))
+    return proc, started_at
 
 
-def run_code_in_container(
+async def run_code_in_container(
     source: str,
     test_cases: List[Dict[str, Any]],
     entry_point: Optional[str],
     timeout: int = 10,
     meta: Optional[Dict[str, Any]] = None,
+    fail_fast: bool = False,
+    phases: Optional[Dict[str, float]] = None,
 ) -> List[Dict[str, Any]]:
-    """Executes user code in a fresh container and returns test results."""
+    """Executes user code in a fresh sandbox of the configured backend and returns test results.
+
+    With `fail_fast` the harness stops after the first failing case, so the list can be shorter
+    than `test_cases`. When given, `phases` is filled with per-phase timings in milliseconds.
+    """
     payload = {
         "source": source,
         "entry_point": entry_point,
-        "test_cases": test_cases,
+        **_test_case_fields(test_cases),
+        "fail_fast": fail_fast,
+        **_OUTPUT_LIMITS,
     }
+    phases = {} if phases is None else phases
+    output = _HarnessOutput(CASE)
+    started = time.perf_counter()
+    proc, started_at = await _run_harness(payload, timeout, meta, phases, output)
+    phases["total_ms"] = _ms(time.perf_counter() - started)
 
-    command = [
-        "docker",
-        "run",
-        "--rm",
-        "-i",
-        "--user",
-        "65534:65534",
-        "--network",
-        "none",
-        "--memory",
-        "256m",
-        "--memory-swap",
-        "256m",
-        "--cpus",
-        "1",
-        "--pids-limit",
-        "128",
-        "--read-only",
-        "--tmpfs",
-        "/tmp:rw,noexec,nosuid,size=64m",
-        "--ipc",
-        "none",
-        "--cap-drop",
-        "ALL",
-        "--security-opt",
-        "no-new-privileges",
-        "--ulimit",
-        "nofile=256:256",
-    ]
-
-    container_name = None
-    proc = None
-    started_at = time.time()
-    started_at_iso = datetime.fromtimestamp(started_at, tz=timezone.utc).isoformat()
+    results = output.items
+    passed_count = sum(1 for item in results if item.get("passed") is True)
+    _log_run(
+        "ok",
+        started_at,
+        timeout,
+        meta,
+        container_name=proc.name,
+        proc=proc,
+        warm=proc.warm,
+        cached=False,
+        tests_total=len(results),
+        tests_passed=passed_count,
+        phases=phases,
+        **({"harness_logs": output.logs} if output.logs else {}),
+    )
+    return results
+
+
+async def stream_code_in_container(
+    source: str,
+    test_cases: List[Dict[str, Any]],
+    entry_point: Optional[str],
+    timeout: int = 10,
+    meta: Optional[Dict[str, Any]] = None,
+    fail_fast: bool = False,
+    phases: Optional[Dict[str, float]] = None,
+) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """Like `run_code_in_container`, but yields `(index, result)` as soon as each case finishes.
+
+    A failing run raises ContainerExecutionError after the cases that did finish were yielded.
+    """
+    payload = {
+        "source": source,
+        "entry_point": entry_point,
+        **_test_case_fields(test_cases),
+        "fail_fast": fail_fast,
+        **_OUTPUT_LIMITS,
+    }
+    finished: asyncio.Queue = asyncio.Queue()
+    output = _HarnessOutput(CASE, on_item=lambda index, result: finished.put_nowait((index, result)))
 
+    phases = {} if phases is None else phases
+    started = time.perf_counter()
+    runner = asyncio.ensure_future(_run_harness(payload, timeout, meta, phases, output))
+    runner.add_done_callback(lambda _: finished.put_nowait(None))
     try:
-        with _CONCURRENCY_GUARD:
-            container_name = _next_container_name()
-            full_command = command + [
-                "--name",
-                container_name,
-                "python:3.11-slim",
-                "python",
-                "-c",
-                CONTAINER_PYTHON,
-            ]
-            proc = subprocess.run(
-                full_command,
-                input=json.dumps(payload),
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                check=False,
-            )
-    except FileNotFoundError as exc:
-        finished_at = time.time()
-        entry = {
-            "event": "executor_run",
-            "status": "error",
-            "error": "docker_not_found",
-            "started_at": started_at_iso,
-            "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
-            "duration_ms": int((finished_at - started_at) * 1000),
-            "container_name": container_name,
-            **(meta or {}),
-        }
-        _add_metrics(entry, "", "", timeout_seconds=timeout)
-        _write_log(entry)
-        raise ContainerExecutionError("Docker not found. Ensure it is installed and on PATH.") from exc
-    except subprocess.TimeoutExpired as exc:
-        _force_remove_container(container_name)
-        finished_at = time.time()
-        entry = {
-            "event": "executor_run",
-            "status": "timeout",
-            "started_at": started_at_iso,
-            "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
-            "duration_ms": int((finished_at - started_at) * 1000),
-            "container_name": container_name,
-            **(meta or {}),
-        }
-        _add_metrics(entry, "", "", timeout_seconds=timeout)
-        _write_log(entry)
-        raise ContainerExecutionError(f"Container execution exceeded timeout ({timeout}s).") from exc
+        while True:
+            item = await finished.get()
+            if item is None:
+                break
+            yield item
+        proc, started_at = await runner
     finally:
-        if container_name:
-            _release_container_name(container_name)
+        runner.cancel()
+    phases["total_ms"] = _ms(time.perf_counter() - started)
+
+    results = output.items
+    _log_run(
+        "ok",
+        started_at,
+        timeout,
+        meta,
+        container_name=proc.name,
+        proc=proc,
+        warm=proc.warm,
+        cached=False,
+        streamed=True,
+        tests_total=len(results),
+        tests_passed=sum(1 for item in results if item.get("passed") is True),
+        phases=phases,
+        **({"harness_logs": output.logs} if output.logs else {}),
+    )
 
-    if container_name and (proc is None or proc.returncode is None):
-        _force_remove_container(container_name)
 
-    if proc.returncode != 0:
-        stderr = proc.stderr.strip()
-        finished_at = time.time()
-        entry = {
-            "event": "executor_run",
-            "status": "error",
-            "started_at": started_at_iso,
-            "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
-            "duration_ms": int((finished_at - started_at) * 1000),
-            "container_name": container_name,
-            "exit_code": proc.returncode,
-            "stdout": proc.stdout,
-            "stderr": proc.stderr,
-            **(meta or {}),
-        }
-        _add_metrics(entry, proc.stdout, proc.stderr, timeout_seconds=timeout)
-        _write_log(entry)
-        raise ContainerExecutionError(
-            f"Container exited with code {proc.returncode}: {stderr or 'no stderr'}"
-        )
+async def run_batch_in_container(
+    sources: List[str],
+    test_cases: List[Dict[str, Any]],
+    entry_point: Optional[str],
+    timeout: int = 10,
+    meta: Optional[Dict[str, Any]] = None,
+    fail_fast: bool = False,
+) -> List[Dict[str, Any]]:
+    """Runs several submissions of one task in a single sandbox, each in its own harness process.
+
+    Returns one `{"results": [...]}` or `{"error": "..."}` entry per source, in order.
+    `timeout` applies to every submission and BATCH_TIMEOUT_SECONDS to the batch as a whole;
+    submissions that do not get to run in time report an error. If a submission brings the
+    harness down, it is reported as failed and the ones after it continue in a new sandbox.
+    """
+    deadline = time.monotonic() + BATCH_TIMEOUT_SECONDS
+    outcomes: List[Dict[str, Any]] = []
+    while len(outcomes) < len(sources):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            outcomes += [{"error": "Batch time limit reached before this submission ran."}] * (
+                len(sources) - len(outcomes)
+            )
+            break
+        try:
+            outcomes += await _run_batch_once(
+                sources[len(outcomes):], test_cases, entry_point, timeout, remaining, meta, fail_fast
+            )
+        except ContainerExecutionError as exc:
+            if not exc.crashed:
+                raise ContainerExecutionError(str(exc), partial_results=outcomes + exc.partial_results) from exc
+            outcomes += exc.partial_results
+            if len(outcomes) < len(sources):
+                outcomes.append({"error": f"Submission stopped the sandbox: {exc}"})
+    return outcomes
 
-    try:
-        parsed = json.loads(proc.stdout)
-    except json.JSONDecodeError as exc:
-        finished_at = time.time()
-        entry = {
-            "event": "executor_run",
-            "status": "error",
-            "started_at": started_at_iso,
-            "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
-            "duration_ms": int((finished_at - started_at) * 1000),
-            "container_name": container_name,
-            "exit_code": proc.returncode,
-            "stdout": proc.stdout,
-            "stderr": proc.stderr,
-            "error": "invalid_json",
-            **(meta or {}),
-        }
-        _add_metrics(entry, proc.stdout, proc.stderr, timeout_seconds=timeout)
-        _write_log(entry)
-        raise ContainerExecutionError(f"Invalid JSON from container: {exc}") from exc
-
-    results = parsed.get("results")
-    if not isinstance(results, list):
-        finished_at = time.time()
-        entry = {
-            "event": "executor_run",
-            "status": "error",
-            "started_at": started_at_iso,
-            "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
-            "duration_ms": int((finished_at - started_at) * 1000),
-            "container_name": container_name,
-            "exit_code": proc.returncode,
-            "stdout": proc.stdout,
-            "stderr": proc.stderr,
-            "error": "unexpected_payload",
-            **(meta or {}),
-        }
-        _add_metrics(entry, proc.stdout, proc.stderr, timeout_seconds=timeout)
-        _write_log(entry)
-        raise ContainerExecutionError("Container returned unexpected payload")
 
-    passed_count = sum(1 for item in results if item.get("passed") is True)
-    finished_at = time.time()
-    entry = {
-        "event": "executor_run",
-        "status": "ok",
-        "started_at": started_at_iso,
-        "finished_at": datetime.fromtimestamp(finished_at, tz=timezone.utc).isoformat(),
-        "duration_ms": int((finished_at - started_at) * 1000),
-        "container_name": container_name,
-        "exit_code": proc.returncode,
-        "stdout": proc.stdout,
-        "stderr": proc.stderr,
-        "tests_total": len(results),
-        "tests_passed": passed_count,
-        **(meta or {}),
+async def _run_batch_once(
+    sources: List[str],
+    test_cases: List[Dict[str, Any]],
+    entry_point: Optional[str],
+    timeout: int,
+    batch_timeout: float,
+    meta: Optional[Dict[str, Any]],
+    fail_fast: bool,
+) -> List[Dict[str, Any]]:
+    """Runs `sources` in one sandbox; the harness stops starting submissions after `batch_timeout`."""
+    payload = {
+        "sources": sources,
+        "entry_point": entry_point,
+        **_test_case_fields(test_cases),
+        "timeout": timeout,
+        "batch_timeout": batch_timeout,
+        "fail_fast": fail_fast,
+        **_OUTPUT_LIMITS,
     }
-    _add_metrics(entry, proc.stdout, proc.stderr, timeout_seconds=timeout)
-    _write_log(entry)
-
-    return results
+    batch_meta = {**(meta or {}), "batch_size": len(sources)}
+    phases: Dict[str, float] = {}
+    output = _HarnessOutput(BATCH_ITEM)
+    # The harness enforces both limits itself; the sandbox timeout only backs it up.
+    proc, started_at = await _run_harness(payload, batch_timeout + 5, batch_meta, phases, output)
+    outcomes = output.items
+    if len(outcomes) != len(sources):
+        _log_run("error", started_at, timeout, batch_meta, container_name=proc.name, proc=proc, error="batch_mismatch")
+        raise ContainerExecutionError("Container returned an incomplete batch", partial_results=outcomes)
+
+    _log_run(
+        "ok",
+        started_at,
+        timeout,
+        batch_meta,
+        container_name=proc.name,
+        proc=proc,
+        warm=proc.warm,
+        cached=False,
+        batch_errors=sum(1 for outcome in outcomes if outcome.get("error")),
+        phases=phases,
+        **({"harness_logs": output.logs} if output.logs else {}),
+    )
+    return outcomes
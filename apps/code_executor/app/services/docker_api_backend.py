@@ -0,0 +1,254 @@
+"""Docker sandbox driven through the Engine HTTP API instead of the `docker` CLI.
+
+Every run is create -> attach -> start -> (stdin, stdout/stderr) -> wait -> remove on
+pooled keep-alive connections to the daemon socket, so no CLI process is forked per run.
+The container config is translated from the `docker run` flags in `docker_sandbox`, so both
+backends always apply the same lock-down.
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from .case_blobs import CASE_BLOBS, SANDBOX_TEST_BLOB_DIR
+from .container_reaper import ContainerReaper
+from .docker_engine import STDERR_STREAM, STDOUT_STREAM, DockerEngineClient, DockerEngineError, read_multiplexed
+from .docker_sandbox import CONTAINER_PREFIX, DOCKER_RUN_FLAGS, IMAGE_AND_COMMAND, next_container_name
+from .harness import HARNESS_SOURCE_VERSION
+from .ipc import FrameCallback, FrameDecoder, FrameError
+from .sandbox import (
+    SandboxBackend,
+    SandboxProtocolError,
+    SandboxRun,
+    SandboxTimeoutError,
+    SandboxUnavailableError,
+)
+from .sandbox_image import HARNESS_LABEL, SANDBOX_IMAGE
+
+
+DOCKER_SOCKET = os.getenv("EXECUTOR_DOCKER_SOCKET", "/var/run/docker.sock")
+DOCKER_API_VERSION = os.getenv("EXECUTOR_DOCKER_API_VERSION", "v1.41")
+DOCKER_MAX_IDLE_CONNECTIONS = int(os.getenv("EXECUTOR_DOCKER_MAX_IDLE_CONNECTIONS", "8"))
+
+_SIZE_UNITS = {"b": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def _parse_size(value: str) -> int:
+    unit = value[-1].lower()
+    if unit in _SIZE_UNITS:
+        return int(float(value[:-1]) * _SIZE_UNITS[unit])
+    return int(value)
+
+
+def _tmpfs(config: Dict[str, Any], host: Dict[str, Any], value: str) -> None:
+    path, _, options = value.partition(":")
+    host.setdefault("Tmpfs", {})[path] = options
+
+
+def _mount(config: Dict[str, Any], host: Dict[str, Any], value: str) -> None:
+    options = dict(option.partition("=")[::2] for option in value.split(","))
+    mount = {"Type": options["type"], "Source": options["source"], "Target": options["target"]}
+    mount["ReadOnly"] = "readonly" in options
+    host.setdefault("Mounts", []).append(mount)
+
+
+def _ulimit(config: Dict[str, Any], host: Dict[str, Any], value: str) -> None:
+    name, _, limits = value.partition("=")
+    soft, _, hard = limits.partition(":")
+    host.setdefault("Ulimits", []).append({"Name": name, "Soft": int(soft), "Hard": int(hard or soft)})
+
+
+def _network(config: Dict[str, Any], host: Dict[str, Any], value: str) -> None:
+    host["NetworkMode"] = value
+    config["NetworkDisabled"] = value == "none"
+
+
+# Flags without a value. `run` and `--rm` need nothing: the backend removes every container
+# itself once it has its exit code.
+_SWITCH_FLAGS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any]], None]] = {
+    "run": lambda config, host: None,
+    "--rm": lambda config, host: None,
+    "-i": lambda config, host: config.update(
+        AttachStdin=True, AttachStdout=True, AttachStderr=True, OpenStdin=True, StdinOnce=True
+    ),
+    "--read-only": lambda config, host: host.update(ReadonlyRootfs=True),
+}
+# Flags followed by a value.
+_VALUE_FLAGS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], str], None]] = {
+    "--user": lambda config, host, value: config.update(User=value),
+    "--network": _network,
+    "--memory": lambda config, host, value: host.update(Memory=_parse_size(value)),
+    "--memory-swap": lambda config, host, value: host.update(MemorySwap=_parse_size(value)),
+    "--cpus": lambda config, host, value: host.update(NanoCpus=int(float(value) * 1e9)),
+    "--pids-limit": lambda config, host, value: host.update(PidsLimit=int(value)),
+    "--tmpfs": _tmpfs,
+    "--ipc": lambda config, host, value: host.update(IpcMode=value),
+    "--cap-drop": lambda config, host, value: host.setdefault("CapDrop", []).append(value),
+    "--security-opt": lambda config, host, value: host.setdefault("SecurityOpt", []).append(value),
+    "--mount": _mount,
+    "--ulimit": _ulimit,
+}
+
+
+def container_config_from_flags(flags: List[str], image_and_command: List[str]) -> Dict[str, Any]:
+    """Translate `docker run` flags into a /containers/create body.
+
+    Raises ValueError for a flag without a translation, so a new CLI flag cannot be
+    silently missing from the API backend.
+    """
+    image, *command = image_and_command
+    config: Dict[str, Any] = {"Image": image, "Cmd": command, "Tty": False}
+    host: Dict[str, Any] = {}
+    args = iter(flags)
+    for flag in args:
+        if flag in _SWITCH_FLAGS:
+            _SWITCH_FLAGS[flag](config, host)
+        elif flag in _VALUE_FLAGS:
+            _VALUE_FLAGS[flag](config, host, next(args))
+        else:
+            raise ValueError(f"No Engine API translation for docker run flag '{flag}'")
+    config["HostConfig"] = host
+    return config
+
+
+_CONTAINER_CONFIG = container_config_from_flags(DOCKER_RUN_FLAGS, IMAGE_AND_COMMAND)
+
+
+class DockerApiBackend(SandboxBackend):
+    """Runs every submission in its own container through the Engine API."""
+
+    name = "docker_api"
+    test_blob_dir = SANDBOX_TEST_BLOB_DIR if CASE_BLOBS.enabled else None
+
+    def __init__(
+        self,
+        socket_path: str = DOCKER_SOCKET,
+        api_version: str = DOCKER_API_VERSION,
+        max_idle_connections: int = DOCKER_MAX_IDLE_CONNECTIONS,
+        container_config: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.client = DockerEngineClient(socket_path, api_version=api_version, max_idle=max_idle_connections)
+        self.container_config = container_config or _CONTAINER_CONFIG
+        self.reaper = ContainerReaper(self._list_containers, self._remove_containers, prefix=CONTAINER_PREFIX)
+
+    async def start(self) -> None:
+        """Checks that the daemon answers and the sandbox image is present (pulling the stock one)."""
+        image = self.container_config["Image"]
+        try:
+            details = await self._inspect_image(image)
+            if details is None and not SANDBOX_IMAGE:
+                repository, _, tag = image.rpartition(":")
+                await self.client.request("POST", "/images/create", {"fromImage": repository, "tag": tag})
+                details = await self._inspect_image(image)
+        except (OSError, DockerEngineError) as exc:
+            raise SandboxUnavailableError(f"Docker Engine API unavailable: {exc}", reason="docker_not_found") from exc
+        if details is None:
+            raise SandboxUnavailableError(
+                f"Sandbox image {image} not found; build it with `python -m app.build_sandbox_image`",
+                reason="sandbox_image_missing",
+            )
+        if SANDBOX_IMAGE:
+            built_from = ((details.get("Config") or {}).get("Labels") or {}).get(HARNESS_LABEL)
+            if built_from != HARNESS_SOURCE_VERSION:
+                raise SandboxUnavailableError(
+                    f"Sandbox image {image} carries harness {built_from or 'unknown'}, "
+                    f"expected {HARNESS_SOURCE_VERSION}",
+                    reason="sandbox_image_mismatch",
+                )
+        await self.reaper.start()
+
+    async def stop(self) -> None:
+        """Drains the reaper and closes pooled daemon connections."""
+        await self.reaper.stop()
+        await self.client.close()
+
+    async def run(self, payload: bytes, timeout: float, on_frame: FrameCallback) -> SandboxRun:
+        """Creates, attaches and starts a container, feeds it the payload and waits for its exit."""
+        name = next_container_name()
+        await self._create(name)
+        decoder = FrameDecoder()
+        stderr: List[bytes] = []
+        try:
+            returncode = await asyncio.wait_for(
+                self._exchange(name, payload, on_frame, decoder, stderr), timeout=timeout
+            )
+        except (FrameError, asyncio.TimeoutError, OSError, DockerEngineError) as exc:
+            raise _run_error(name, exc) from exc
+        finally:
+            # Whether or not the exit code is known, removal does not need to delay the response.
+            self.reaper.schedule(name)
+
+        return SandboxRun(
+            name=name,
+            returncode=returncode,
+            stderr=b"".join(stderr).decode("utf-8", errors="replace"),
+            channel_bytes=decoder.bytes_received,
+            frames=decoder.frames_received,
+            decode_seconds=decoder.decode_seconds,
+        )
+
+    async def _create(self, name: str) -> None:
+        try:
+            await self.client.request("POST", "/containers/create", {"name": name}, body=self.container_config)
+        except FileNotFoundError as exc:
+            raise SandboxUnavailableError(
+                f"Docker socket {self.client.socket_path} not found.", reason="docker_not_found"
+            ) from exc
+        except (OSError, DockerEngineError) as exc:
+            raise SandboxUnavailableError(f"Docker Engine API error: {exc}", reason="docker_api_error") from exc
+
+    async def _exchange(
+        self, name: str, payload: bytes, on_frame: FrameCallback, decoder: FrameDecoder, stderr: List[bytes]
+    ) -> int:
+        """Attaches to and starts the container, streams its output and returns its exit code."""
+        reader, writer = await self.client.attach(name)
+        try:
+            await self.client.request("POST", f"/containers/{name}/start")
+            writer.write(payload)
+            await writer.drain()
+            writer.write_eof()
+            async for stream, data in read_multiplexed(reader):
+                if stream == STDOUT_STREAM:
+                    for kind, record in decoder.feed(data):
+                        on_frame(kind, record)
+                elif stream == STDERR_STREAM:
+                    stderr.append(data)
+        finally:
+            writer.close()
+        status = await self.client.request("POST", f"/containers/{name}/wait")
+        return int((status or {}).get("StatusCode", -1))
+
+    async def _inspect_image(self, image: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.client.request("GET", f"/images/{image}/json")
+        except DockerEngineError as exc:
+            if exc.status == 404:
+                return None
+            raise
+
+    async def _list_containers(self) -> List[str]:
+        containers = await self.client.request(
+            "GET", "/containers/json", {"all": 1, "filters": json.dumps({"name": [CONTAINER_PREFIX]})}
+        )
+        names = [name.lstrip("/") for container in containers or () for name in container.get("Names") or ()]
+        return [name for name in names if name.startswith(CONTAINER_PREFIX)]
+
+    async def _remove_containers(self, names: List[str]) -> None:
+        # The API removes one container per request; send the batch concurrently.
+        await asyncio.gather(*(self._remove(name) for name in names))
+
+    async def _remove(self, name: str) -> None:
+        try:
+            await self.client.request("DELETE", f"/containers/{name}", {"force": 1, "v": 1}, expect=(204, 404))
+        except (OSError, DockerEngineError, asyncio.IncompleteReadError):
+            pass
+
+
+def _run_error(name: str, exc: BaseException) -> Exception:
+    """Maps a failure of a started run to the sandbox error the runner expects."""
+    if isinstance(exc, FrameError):
+        return SandboxProtocolError(str(exc), name)
+    if isinstance(exc, asyncio.TimeoutError):
+        return SandboxTimeoutError(name)
+    return SandboxUnavailableError(f"Docker Engine API error: {exc}", reason="docker_api_error")
@@ -0,0 +1,198 @@
+"""Docker-backed sandbox: one locked-down container per run.
+
+Runs the prebuilt image from `sandbox_image` when EXECUTOR_SANDBOX_IMAGE is set, otherwise
+`python:3.11-slim` with the harness source passed via `python -c`.
+"""
+
+import asyncio
+import os
+from typing import List, Optional
+
+from .case_blobs import CASE_BLOBS, SANDBOX_TEST_BLOB_DIR
+from .container_pool import ContainerPool
+from .container_reaper import ContainerReaper
+from .docker_sandbox import CONTAINER_PREFIX, DOCKER_RUN_FLAGS, IMAGE_AND_COMMAND, next_container_name
+from .ipc import FrameCallback, FrameDecoder, FrameError
+from .sandbox_image import SANDBOX_IMAGE, verify_sandbox_image
+from .sandbox import (
+    CHANNEL_CHUNK_BYTES,
+    SandboxBackend,
+    SandboxProtocolError,
+    SandboxRun,
+    SandboxTimeoutError,
+    SandboxUnavailableError,
+)
+
+
+POOL_SIZE = int(os.getenv("EXECUTOR_POOL_SIZE", "0"))
+POOL_REFILL_PER_SECOND = float(os.getenv("EXECUTOR_POOL_REFILL_PER_SECOND", "2"))
+POOL_MAX_IDLE_SECONDS = float(os.getenv("EXECUTOR_POOL_MAX_IDLE_SECONDS", "300"))
+
+
+async def _force_remove_container(name: Optional[str]) -> None:
+    """Removes a container if it was left behind or hung."""
+    if not name:
+        return
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "docker",
+            "rm",
+            "-f",
+            name,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        await proc.wait()
+    except FileNotFoundError:
+        return
+
+
+async def _list_containers() -> List[str]:
+    """Names of every sandbox container on the host, running or not."""
+    proc = await asyncio.create_subprocess_exec(
+        "docker",
+        "ps",
+        "--all",
+        "--no-trunc",
+        "--filter",
+        f"name={CONTAINER_PREFIX}",
+        "--format",
+        "{{.Names}}",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    stdout, _ = await proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(f"docker ps exited with {proc.returncode}")
+    names = stdout.decode("utf-8", errors="replace").split()
+    return [name for name in names if name.startswith(CONTAINER_PREFIX)]
+
+
+async def _remove_containers(names: List[str]) -> None:
+    """Force-removes a batch of containers with a single `docker rm`."""
+    proc = await asyncio.create_subprocess_exec(
+        "docker",
+        "rm",
+        "-f",
+        *names,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    await proc.wait()
+
+
+async def _spawn_container(name: str) -> asyncio.subprocess.Process:
+    """Starts a locked-down container that waits for the JSON payload on stdin."""
+    return await asyncio.create_subprocess_exec(
+        "docker",
+        *DOCKER_RUN_FLAGS,
+        "--name",
+        name,
+        *IMAGE_AND_COMMAND,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+
+async def _exchange_frames(
+    process: asyncio.subprocess.Process, payload: bytes, decoder: FrameDecoder, on_frame: FrameCallback
+) -> bytes:
+    """Sends the request, decodes stdout frames while the container runs and returns its stderr."""
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+    try:
+        process.stdin.write(payload)
+        await process.stdin.drain()
+        process.stdin.close()
+        while True:
+            chunk = await process.stdout.read(CHANNEL_CHUNK_BYTES)
+            if not chunk:
+                break
+            for kind, record in decoder.feed(chunk):
+                on_frame(kind, record)
+        stderr = await stderr_task
+    finally:
+        stderr_task.cancel()
+    await process.wait()
+    return stderr
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+
+
+class DockerBackend(SandboxBackend):
+    """Runs every submission in its own container, optionally taken from a warm pool."""
+
+    name = "docker"
+    test_blob_dir = SANDBOX_TEST_BLOB_DIR if CASE_BLOBS.enabled else None
+
+    def __init__(self) -> None:
+        self.pool = ContainerPool(
+            size=POOL_SIZE,
+            refill_per_second=POOL_REFILL_PER_SECOND,
+            max_idle_seconds=POOL_MAX_IDLE_SECONDS,
+            spawn=_spawn_container,
+            next_name=next_container_name,
+            discard=_force_remove_container,
+        )
+        self.reaper = ContainerReaper(_list_containers, _remove_containers, prefix=CONTAINER_PREFIX)
+
+    async def start(self) -> None:
+        """Checks the prebuilt image (when configured), sweeps leaked containers and fills the warm pool."""
+        if SANDBOX_IMAGE:
+            await verify_sandbox_image()
+        await self.reaper.start()
+        await self.pool.start()
+
+    async def stop(self) -> None:
+        """Stops the refill task, removes idle pooled containers and drains the reaper."""
+        await self.pool.stop()
+        await self.reaper.stop()
+
+    async def run(self, payload: bytes, timeout: float, on_frame: FrameCallback) -> SandboxRun:
+        """Feeds the payload to a pooled or fresh container and waits for it to exit."""
+        warm = self.pool.acquire()
+        if warm is not None:
+            name = warm.name
+            process = warm.process
+        else:
+            name = next_container_name()
+            try:
+                process = await _spawn_container(name)
+            except FileNotFoundError as exc:
+                raise SandboxUnavailableError(
+                    "Docker not found. Ensure it is installed and on PATH.", reason="docker_not_found"
+                ) from exc
+
+        decoder = FrameDecoder()
+        try:
+            stderr = await asyncio.wait_for(_exchange_frames(process, payload, decoder, on_frame), timeout=timeout)
+        except FrameError as exc:
+            _kill(process)
+            await process.wait()
+            self.reaper.schedule(name)
+            raise SandboxProtocolError(str(exc), name) from exc
+        except asyncio.TimeoutError as exc:
+            # Killing the CLI client leaves the container running; the reaper removes it.
+            _kill(process)
+            await process.wait()
+            self.reaper.schedule(name)
+            raise SandboxTimeoutError(name, warm=warm is not None) from exc
+        except asyncio.CancelledError:
+            _kill(process)
+            self.reaper.schedule(name)
+            raise
+
+        return SandboxRun(
+            name=name,
+            returncode=process.returncode,
+            stderr=stderr.decode("utf-8", errors="replace"),
+            warm=warm is not None,
+            channel_bytes=decoder.bytes_received,
+            frames=decoder.frames_received,
+            decode_seconds=decoder.decode_seconds,
+        )
@@ -0,0 +1,189 @@
+"""Minimal async client for the Docker Engine HTTP API over its unix socket.
+
+Only what the sandbox backend needs: JSON requests on a small pool of keep-alive
+connections, and `attach`, which upgrades a fresh connection to the raw multiplexed
+stdin/stdout/stderr stream of a container.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+STDOUT_STREAM = 1
+STDERR_STREAM = 2
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class DockerEngineError(RuntimeError):
+    """Raised for non-2xx answers from the Engine API."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"Docker Engine API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+class DockerEngineClient:
+    """Talks HTTP/1.1 to the daemon socket, reusing up to `max_idle` idle connections."""
+
+    def __init__(self, socket_path: str, api_version: str = "v1.41", max_idle: int = 8) -> None:
+        self.socket_path = socket_path
+        self.prefix = f"/{api_version}" if api_version else ""
+        self.max_idle = max(0, max_idle)
+        self._idle: List[Connection] = []
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        body: Any = None,
+        expect: Tuple[int, ...] = (200, 201, 204),
+    ) -> Any:
+        """Send one request and return the decoded JSON body (None when empty)."""
+        target = self._target(path, params)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        for attempt in range(2):
+            reused, (reader, writer) = await self._acquire()
+            try:
+                writer.write(_request_head(method, target, len(data), body is not None) + data)
+                await writer.drain()
+                status, headers, payload = await _read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                # A pooled connection the daemon already closed; retry once on a fresh one.
+                if reused and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+            else:
+                self._release((reader, writer))
+            break
+
+        decoded = _decode_body(headers, payload)
+        if status not in expect:
+            message = decoded.get("message") if isinstance(decoded, dict) else payload.decode("utf-8", "replace")
+            raise DockerEngineError(status, message or "")
+        return decoded
+
+    async def attach(self, container_id: str) -> Connection:
+        """Open a hijacked stdin/stdout/stderr stream of a created (not yet started) container."""
+        target = self._target(
+            f"/containers/{container_id}/attach", {"stream": 1, "stdin": 1, "stdout": 1, "stderr": 1}
+        )
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write(
+                f"POST {target} HTTP/1.1\r\nHost: docker\r\nConnection: Upgrade\r\nUpgrade: tcp\r\n"
+                "Content-Length: 0\r\n\r\n".encode("ascii")
+            )
+            await writer.drain()
+            status, headers = await _read_head(reader)
+            if status not in (101, 200):
+                payload = await _read_body(reader, headers, status)
+                raise DockerEngineError(status, payload.decode("utf-8", "replace"))
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def close(self) -> None:
+        """Close every idle pooled connection."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    def _target(self, path: str, params: Optional[Dict[str, Any]]) -> str:
+        query = f"?{urlencode(params)}" if params else ""
+        return f"{self.prefix}{path}{query}"
+
+    async def _acquire(self) -> Tuple[bool, Connection]:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return True, (reader, writer)
+            writer.close()
+        return False, await asyncio.open_unix_connection(self.socket_path)
+
+    def _release(self, connection: Connection) -> None:
+        if len(self._idle) < self.max_idle:
+            self._idle.append(connection)
+        else:
+            connection[1].close()
+
+
+async def read_multiplexed(reader: asyncio.StreamReader) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield `(stream, data)` records of a non-TTY attach stream until the container exits."""
+    while True:
+        try:
+            header = await reader.readexactly(8)
+        except asyncio.IncompleteReadError as exc:
+            if exc.partial:
+                raise
+            return
+        size = int.from_bytes(header[4:8], "big")
+        yield header[0], await reader.readexactly(size)
+
+
+def _request_head(method: str, target: str, length: int, has_json: bool) -> bytes:
+    lines = [f"{method} {target} HTTP/1.1", "Host: docker", f"Content-Length: {length}"]
+    if has_json:
+        lines.append("Content-Type: application/json")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("ascii")
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    status_line = await reader.readuntil(b"\r\n")
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ConnectionError(f"Malformed status line {status_line!r}")
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            return int(parts[1]), headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: Dict[str, str], status: int) -> bytes:
+    if status in (204, 304) or 100 <= status < 200:
+        return b""
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                # Skip optional trailers up to the terminating blank line.
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    headers["connection"] = "close"
+    return await reader.read()
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str], bytes]:
+    status, headers = await _read_head(reader)
+    return status, headers, await _read_body(reader, headers, status)
+
+
+def _decode_body(headers: Dict[str, str], payload: bytes) -> Any:
+    if not payload:
+        return None
+    if "json" in headers.get("content-type", ""):
+        try:
+            return json.loads(payload)
+        except ValueError:
+            return payload
+    return payload
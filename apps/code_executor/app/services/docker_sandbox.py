@@ -0,0 +1,66 @@
+"""Container settings shared by the `docker` (CLI) and `docker_api` (Engine API) backends.
+
+`DOCKER_RUN_FLAGS` is the single definition of the sandbox lock-down: the CLI backend passes
+it to `docker run`, the API backend translates it into a /containers/create body.
+"""
+
+import itertools
+import os
+import time
+
+from .case_blobs import CASE_BLOBS, SANDBOX_TEST_BLOB_DIR
+from .harness import CONTAINER_PYTHON
+from .sandbox_image import HARNESS_ARGV, SANDBOX_IMAGE, image_reference
+
+
+CONTAINER_PREFIX = "code_exec_"
+CONTAINER_IMAGE = "python:3.11-slim"
+if SANDBOX_IMAGE:
+    IMAGE_AND_COMMAND = [image_reference(), *HARNESS_ARGV]
+else:
+    # No prebuilt image configured: ship the harness source with every run.
+    IMAGE_AND_COMMAND = [CONTAINER_IMAGE, "python", "-c", CONTAINER_PYTHON]
+DOCKER_RUN_FLAGS = [
+    "run",
+    "--rm",
+    "-i",
+    "--user",
+    "65534:65534",
+    "--network",
+    "none",
+    "--memory",
+    "256m",
+    "--memory-swap",
+    "256m",
+    "--cpus",
+    "1",
+    "--pids-limit",
+    "128",
+    "--read-only",
+    "--tmpfs",
+    "/tmp:rw,noexec,nosuid,size=64m",
+    "--ipc",
+    "none",
+    "--cap-drop",
+    "ALL",
+    "--security-opt",
+    "no-new-privileges",
+    "--ulimit",
+    "nofile=256:256",
+]
+if CASE_BLOBS.enabled:
+    DOCKER_RUN_FLAGS += [
+        "--mount",
+        f"type=bind,source={CASE_BLOBS.directory},target={SANDBOX_TEST_BLOB_DIR},readonly",
+    ]
+
+_NAME_COUNTER = itertools.count()
+
+
+def next_container_name() -> str:
+    """Generates a unique container name with the required prefix.
+
+    The name ends in its creation time (ns), which the container reaper uses as its age.
+    """
+    unique = f"{os.getpid()}-{next(_NAME_COUNTER)}-{time.time_ns()}"
+    return f"{CONTAINER_PREFIX}{unique}"
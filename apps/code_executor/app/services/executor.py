@@ -1,41 +1,80 @@
 """Execution orchestration for user code within sandboxed containers."""
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import os
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from ..schemas import ExecutionMode
-from ..services.container_runner import ContainerExecutionError, run_code_in_container
+from ..services.case_blobs import CASE_BLOBS
+from ..services.container_runner import (
+    ContainerExecutionError,
+    run_batch_in_container,
+    run_code_in_container,
+    stream_code_in_container,
+    write_log,
+)
+from ..services.metrics import EXECUTION_SECONDS
+from ..services.result_cache import RESULT_CACHE, make_cache_key
 from tests.test_tasks import TaskDefinition
 
 
-def run_user_code(
-    source: str,
-    task: TaskDefinition,
-    entry_point: Optional[str],
-    mode: ExecutionMode,
-    meta: Optional[Dict[str, Any]] = None,
-) -> List[Dict[str, Any]]:
-    """Run user code against task test cases or ad-hoc in runCode mode."""
+ExecutionResult = Dict[str, Any]
+
+BATCH_CHUNK_SIZE = max(1, int(os.getenv("EXECUTOR_BATCH_CHUNK_SIZE", "20")))
+
+
+def _log_cache_hit(results: List[Dict[str, Any]], meta: Optional[Dict[str, Any]], lookup_seconds: float) -> None:
+    """Record a served-from-cache run in executor.jsonl."""
+    now = datetime.now(tz=timezone.utc).isoformat()
+    write_log(
+        {
+            "event": "executor_run",
+            "status": "ok",
+            "cached": True,
+            "started_at": now,
+            "finished_at": now,
+            "duration_ms": 0,
+            "cache_lookup_ms": round(lookup_seconds * 1000, 3),
+            "tests_total": len(results),
+            "tests_passed": sum(1 for item in results if item.get("passed") is True),
+            **(meta or {}),
+        }
+    )
+
 
+# Shared (never mutated) so its digest is memoized like any task's test cases.
+_RUN_CODE_CASES: List[Dict[str, Any]] = [{"data": {}, "expected": None}]
+
+
+def _plan_run(task: TaskDefinition, entry_point: Optional[str], mode: ExecutionMode):
+    """Return the test cases and entry point the harness should use for `mode`."""
     if mode == ExecutionMode.run_code:
-        test_cases: List[Dict[str, Any]] = [{"data": {}, "expected": None}]
-        entry_point_to_use = None
-    else:
-        test_cases = task.get("test_cases", [])
-        entry_point_to_use = entry_point
+        return _RUN_CODE_CASES, None
+    return task.get("test_cases", []), entry_point
 
-    try:
-        results = run_code_in_container(
-            source=source, test_cases=test_cases, entry_point=entry_point_to_use, meta=meta
-        )
-    except (ContainerExecutionError, Exception) as exc:
-        results = [
-            {
-                "expected": None,
-                "actual": f"Execution error: {exc}",
-                "passed": False,
-            }
-        ]
 
+def _error_results(error: Any) -> List[Dict[str, Any]]:
+    return [
+        {
+            "expected": None,
+            "actual": f"Execution error: {error}",
+            "passed": False,
+        }
+    ]
+
+
+def _results_before_failure(exc: Exception) -> List[Dict[str, Any]]:
+    """Results the harness delivered before the run failed (timeout, crash, bad frame)."""
+    if isinstance(exc, ContainerExecutionError):
+        return list(exc.partial_results)
+    return []
+
+
+def _finalize(results: List[Dict[str, Any]], mode: ExecutionMode) -> List[Dict[str, Any]]:
+    """Apply runCode pass/fail semantics to the single ad-hoc result."""
     if mode == ExecutionMode.run_code and results:
         first = results[0]
         if first.get("error"):
@@ -44,5 +83,221 @@ def run_user_code(
             first["passed"] = True
             if first.get("actual") is None:
                 first["actual"] = "Code executed successfully"
-
     return results
+
+
+def _cache_hit_timing(elapsed: float) -> Dict[str, float]:
+    elapsed_ms = round(elapsed * 1000, 3)
+    return {"cache_lookup_ms": elapsed_ms, "total_ms": elapsed_ms}
+
+
+async def _cached_execution(
+    cache_key: Optional[str], mode: ExecutionMode, meta: Optional[Dict[str, Any]], started: float
+) -> Optional[ExecutionResult]:
+    """Return the cached execution for `cache_key`, logged and counted as a hit, or None on a miss."""
+    if cache_key is None:
+        return None
+    cached = await RESULT_CACHE.get(cache_key)
+    if cached is None:
+        return None
+    elapsed = time.perf_counter() - started
+    _log_cache_hit(cached, meta, elapsed)
+    EXECUTION_SECONDS.observe(elapsed, mode=mode.value, cached="true")
+    return {"results": cached, "cached": True, "timing": _cache_hit_timing(elapsed)}
+
+
+def _append_case(results: List[Dict[str, Any]], result: Dict[str, Any], mode: ExecutionMode) -> Dict[str, Any]:
+    """Append a streamed case, giving the first one the runCode semantics `_finalize` applies."""
+    if not results:
+        _finalize([result], mode)
+    results.append(result)
+    return result
+
+
+def _cache_key_for(
+    source: str,
+    task_id: Optional[str],
+    mode: ExecutionMode,
+    entry_point: Optional[str],
+    test_cases: List[Dict[str, Any]],
+    fail_fast: bool = False,
+) -> Optional[str]:
+    if mode == ExecutionMode.run_code or not RESULT_CACHE.enabled:
+        return None
+    test_cases_digest = CASE_BLOBS.digest(test_cases)
+    return make_cache_key(source, task_id, mode.value, entry_point, test_cases_digest, fail_fast=fail_fast)
+
+
+async def run_user_code(
+    source: str,
+    task: TaskDefinition,
+    entry_point: Optional[str],
+    mode: ExecutionMode,
+    meta: Optional[Dict[str, Any]] = None,
+    fail_fast: bool = False,
+) -> ExecutionResult:
+    """Run user code against task test cases or ad-hoc in runCode mode.
+
+    Returns `{"results": [...], "cached": bool, "timing": {...}}`, where `timing` holds
+    per-phase durations in milliseconds. Task-backed runs that finish without
+    a timeout or infrastructure error are cached by content hash; runCode output is
+    never cached because ad-hoc code is free to print time- or random-dependent values.
+    With `fail_fast` the results stop at the first failing case. When the run fails
+    part-way, the cases that finished are kept and the error is appended as one more
+    failed result.
+    """
+
+    started = time.perf_counter()
+    test_cases, entry_point_to_use = _plan_run(task, entry_point, mode)
+
+    cache_key = _cache_key_for(
+        source, (meta or {}).get("task_id"), mode, entry_point_to_use, test_cases, fail_fast=fail_fast
+    )
+    cached = await _cached_execution(cache_key, mode, meta, started)
+    if cached is not None:
+        return cached
+
+    phases: Dict[str, float] = {}
+    try:
+        results = await run_code_in_container(
+            source=source,
+            test_cases=test_cases,
+            entry_point=entry_point_to_use,
+            meta=meta,
+            fail_fast=fail_fast,
+            phases=phases,
+        )
+        if cache_key is not None:
+            await RESULT_CACHE.put(cache_key, results)
+    except (ContainerExecutionError, Exception) as exc:
+        results = _results_before_failure(exc) + _error_results(exc)
+
+    elapsed = time.perf_counter() - started
+    EXECUTION_SECONDS.observe(elapsed, mode=mode.value, cached="false")
+    phases["total_ms"] = round(elapsed * 1000, 3)
+    return {"results": _finalize(results, mode), "cached": False, "timing": phases}
+
+
+async def stream_user_code(
+    source: str,
+    task: TaskDefinition,
+    entry_point: Optional[str],
+    mode: ExecutionMode,
+    meta: Optional[Dict[str, Any]] = None,
+    fail_fast: bool = False,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming variant of `run_user_code`.
+
+    Yields `("case", result)` for every finished case and finally `("done", execution)` with the
+    same shape `run_user_code` returns. When the run fails part-way, the finished cases are kept
+    and the error is appended as one more failed result.
+    """
+
+    started = time.perf_counter()
+    test_cases, entry_point_to_use = _plan_run(task, entry_point, mode)
+
+    cache_key = _cache_key_for(
+        source, (meta or {}).get("task_id"), mode, entry_point_to_use, test_cases, fail_fast=fail_fast
+    )
+    cached = await _cached_execution(cache_key, mode, meta, started)
+    if cached is not None:
+        for result in cached["results"]:
+            yield "case", result
+        yield "done", cached
+        return
+
+    results: List[Dict[str, Any]] = []
+    phases: Dict[str, float] = {}
+    cases = stream_code_in_container(
+        source=source,
+        test_cases=test_cases,
+        entry_point=entry_point_to_use,
+        meta=meta,
+        fail_fast=fail_fast,
+        phases=phases,
+    )
+    # aclosing: a client that disconnects mid-stream must cancel the sandbox run right away.
+    async with aclosing(cases):
+        try:
+            async for _, result in cases:
+                yield "case", _append_case(results, result, mode)
+        except (ContainerExecutionError, Exception) as exc:
+            # Cases that finished after the last one yielded still arrive with the error.
+            for result in _results_before_failure(exc)[len(results):] + _error_results(exc):
+                yield "case", _append_case(results, result, mode)
+        else:
+            if cache_key is not None:
+                await RESULT_CACHE.put(cache_key, results)
+
+    elapsed = time.perf_counter() - started
+    EXECUTION_SECONDS.observe(elapsed, mode=mode.value, cached="false")
+    phases["total_ms"] = round(elapsed * 1000, 3)
+    yield "done", {"results": results, "cached": False, "timing": phases}
+
+
+async def run_user_code_batch(
+    items: List[Dict[str, Any]],
+    meta: Optional[Dict[str, Any]] = None,
+) -> List[ExecutionResult]:
+    """Run many submissions, grouping them by (task, mode) into shared sandbox invocations.
+
+    Each item holds `source`, `task`, `entry_point`, `mode`, `task_id` and `fail_fast`. Cached items
+    are answered without a sandbox; the rest run in chunks of BATCH_CHUNK_SIZE, each
+    submission in its own child process. Results come back in input order.
+    """
+    outcomes: List[Optional[ExecutionResult]] = [None] * len(items)
+    groups: Dict[Tuple[Optional[str], str, bool], List[int]] = {}
+    plans: Dict[Tuple[Optional[str], str, bool], Tuple[List[Dict[str, Any]], Optional[str]]] = {}
+    cache_keys: Dict[int, str] = {}
+
+    for index, item in enumerate(items):
+        mode: ExecutionMode = item["mode"]
+        fail_fast = bool(item.get("fail_fast"))
+        test_cases, entry_point = _plan_run(item["task"], item["entry_point"], mode)
+        cache_key = _cache_key_for(item["source"], item["task_id"], mode, entry_point, test_cases, fail_fast=fail_fast)
+        if cache_key is not None:
+            lookup_started = time.perf_counter()
+            cached = await RESULT_CACHE.get(cache_key)
+            if cached is not None:
+                lookup_seconds = time.perf_counter() - lookup_started
+                _log_cache_hit(cached, {**(meta or {}), "task_id": item["task_id"], "mode": mode.value}, lookup_seconds)
+                outcomes[index] = {"results": cached, "cached": True}
+                continue
+            cache_keys[index] = cache_key
+        group = (item["task_id"] if mode != ExecutionMode.run_code else None, mode.value, fail_fast)
+        groups.setdefault(group, []).append(index)
+        plans[group] = (test_cases, entry_point)
+
+    async def run_chunk(group: Tuple[Optional[str], str, bool], indexes: List[int]) -> None:
+        test_cases, entry_point = plans[group]
+        mode = items[indexes[0]]["mode"]
+        try:
+            batch = await run_batch_in_container(
+                sources=[items[index]["source"] for index in indexes],
+                test_cases=test_cases,
+                entry_point=entry_point,
+                meta={**(meta or {}), "task_id": group[0], "mode": mode.value},
+                fail_fast=group[2],
+            )
+        except (ContainerExecutionError, Exception) as exc:
+            # Submissions that finished before the sandbox failed keep their results.
+            batch = _results_before_failure(exc)[: len(indexes)]
+            batch += [{"error": str(exc)} for _ in indexes[len(batch) :]]
+
+        for index, outcome in zip(indexes, batch):
+            results = outcome.get("results")
+            if isinstance(results, list):
+                if index in cache_keys:
+                    await RESULT_CACHE.put(cache_keys[index], results)
+            else:
+                results = _error_results(outcome.get("error") or "unknown batch error")
+            outcomes[index] = {"results": _finalize(results, mode), "cached": False}
+
+    await asyncio.gather(
+        *(
+            run_chunk(group, indexes[start : start + BATCH_CHUNK_SIZE])
+            for group, indexes in groups.items()
+            for start in range(0, len(indexes), BATCH_CHUNK_SIZE)
+        )
+    )
+    return outcomes
@@ -0,0 +1,314 @@
+"""Host-level forkserver sandbox for trusted workloads and Docker-less CI.
+
+A zygote process loads the harness once and forks one child per submission. The
+child gets its own session, a private temp dir, rlimits (CPU, address space, open
+files, processes, file size) and, when the zygote runs as root, drops to an
+unprivileged uid/gid. There is no network or filesystem namespace isolation, so
+this backend must not be used for untrusted code on shared hosts.
+"""
+
+import asyncio
+import os
+import shutil
+import signal
+import sys
+import tempfile
+from typing import Optional
+
+from .case_blobs import CASE_BLOBS
+from .harness import CONTAINER_PYTHON
+from .ipc import EXIT, FrameCallback, FrameDecoder, FrameError
+from .sandbox import (
+    CHANNEL_CHUNK_BYTES,
+    SandboxBackend,
+    SandboxProtocolError,
+    SandboxRun,
+    SandboxTimeoutError,
+    SandboxUnavailableError,
+)
+
+
+FORKSERVER_PYTHON = r"""
+import io
+import os
+import resource
+import select
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+
+socket_path, cpu_seconds, memory_bytes, nofile, nproc, fsize_bytes, sandbox_uid = sys.argv[1:8]
+cpu_seconds = int(cpu_seconds)
+memory_bytes = int(memory_bytes)
+nofile = int(nofile)
+nproc = int(nproc)
+fsize_bytes = int(fsize_bytes)
+sandbox_uid = int(sandbox_uid)
+
+HARNESS = {"__name__": "snake_harness"}
+harness_source = sys.stdin.read()
+exec(compile(harness_source, "<harness>", "exec"), HARNESS)
+sys.stdin.close()
+# Batch submissions are relaunched from source; the zygote's own command line is not the harness.
+HARNESS["RELAUNCH_ARGV"] = [sys.executable, "-I", "-c", harness_source]
+
+children = {}
+
+
+def run_child(conn, workdir):
+    os.setsid()
+    conn.sendall(f"{os.getpid()}\n".encode("ascii"))
+    os.dup2(conn.fileno(), 0)
+    os.dup2(conn.fileno(), 1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 2)
+
+    os.chdir(workdir)
+    os.environ.clear()
+    os.environ.update({"TMPDIR": workdir, "HOME": workdir, "PYTHONIOENCODING": "utf-8"})
+    tempfile.tempdir = workdir
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (nofile, nofile))
+    resource.setrlimit(resource.RLIMIT_NPROC, (nproc, nproc))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize_bytes, fsize_bytes))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+    if os.geteuid() == 0:
+        os.chown(workdir, sandbox_uid, sandbox_uid)
+        os.setgroups([])
+        os.setgid(sandbox_uid)
+        os.setuid(sandbox_uid)
+
+    sys.stdin = io.TextIOWrapper(io.FileIO(0, "r", closefd=False), encoding="utf-8")
+    sys.stdout = io.TextIOWrapper(io.FileIO(1, "w", closefd=False), encoding="utf-8")
+    sys.stderr = io.TextIOWrapper(io.FileIO(2, "w", closefd=False), encoding="utf-8")
+    HARNESS["main"]()
+    sys.stdout.flush()
+
+
+def reap():
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        conn, workdir = children.pop(pid, (None, None))
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        if conn is not None:
+            try:
+                exit_frame = HARNESS["encode_frame"](b"X", {"exit_code": os.waitstatus_to_exitcode(status)})
+                conn.sendall(exit_frame)
+            except OSError:
+                pass
+            conn.close()
+
+
+def main():
+    wakeup_r, wakeup_w = socket.socketpair()
+    wakeup_r.setblocking(False)
+    wakeup_w.setblocking(False)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+    signal.set_wakeup_fd(wakeup_w.fileno())
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(128)
+    sys.stdout.write("ready\n")
+    sys.stdout.flush()
+
+    while True:
+        readable, _, _ = select.select([listener, wakeup_r], [], [])
+        if wakeup_r in readable:
+            try:
+                while wakeup_r.recv(512):
+                    pass
+            except BlockingIOError:
+                pass
+            reap()
+        if listener not in readable:
+            continue
+
+        conn, _ = listener.accept()
+        workdir = tempfile.mkdtemp(prefix="code_exec_")
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                listener.close()
+                wakeup_r.close()
+                wakeup_w.close()
+                # Sibling connections would otherwise stay open until this child exits.
+                for sibling, _ in children.values():
+                    sibling.close()
+                run_child(conn, workdir)
+                code = 0
+            finally:
+                os._exit(code)
+        children[pid] = (conn, workdir)
+        reap()
+
+
+main()
+"""
+
+FORKSERVER_CPU_SECONDS = int(os.getenv("EXECUTOR_FORKSERVER_CPU_SECONDS", "10"))
+FORKSERVER_MEMORY_BYTES = int(os.getenv("EXECUTOR_FORKSERVER_MEMORY_BYTES", str(256 * 1024 * 1024)))
+FORKSERVER_NOFILE = int(os.getenv("EXECUTOR_FORKSERVER_NOFILE", "256"))
+FORKSERVER_NPROC = int(os.getenv("EXECUTOR_FORKSERVER_NPROC", "128"))
+FORKSERVER_FSIZE_BYTES = int(os.getenv("EXECUTOR_FORKSERVER_FSIZE_BYTES", str(64 * 1024 * 1024)))
+FORKSERVER_UID = int(os.getenv("EXECUTOR_FORKSERVER_UID", "65534"))
+
+
+def _kill_group(pid: Optional[int]) -> None:
+    if not pid:
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class ForkserverBackend(SandboxBackend):
+    """Forks each submission from a warm zygote that already holds the compiled harness."""
+
+    name = "forkserver"
+    # Children run on the host and read blobs straight from the blob directory.
+    test_blob_dir = str(CASE_BLOBS.directory) if CASE_BLOBS.enabled else None
+
+    def __init__(self) -> None:
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._socket_dir: Optional[str] = None
+        self._socket_path: Optional[str] = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Starts the zygote process (no-op when it is already running)."""
+        async with self._start_lock:
+            if self._process is not None and self._process.returncode is None:
+                return
+            await self._cleanup_socket_dir()
+            self._socket_dir = tempfile.mkdtemp(prefix="snake_forkserver_")
+            self._socket_path = os.path.join(self._socket_dir, "forkserver.sock")
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    sys.executable,
+                    "-I",
+                    "-c",
+                    FORKSERVER_PYTHON,
+                    self._socket_path,
+                    str(FORKSERVER_CPU_SECONDS),
+                    str(FORKSERVER_MEMORY_BYTES),
+                    str(FORKSERVER_NOFILE),
+                    str(FORKSERVER_NPROC),
+                    str(FORKSERVER_FSIZE_BYTES),
+                    str(FORKSERVER_UID),
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                )
+                self._process.stdin.write(CONTAINER_PYTHON.encode("utf-8"))
+                await self._process.stdin.drain()
+                self._process.stdin.close()
+                ready = await asyncio.wait_for(self._process.stdout.readline(), timeout=10)
+            except (OSError, asyncio.TimeoutError) as exc:
+                raise SandboxUnavailableError(
+                    f"Forkserver failed to start: {exc}", reason="forkserver_unavailable"
+                ) from exc
+            if ready.strip() != b"ready":
+                raise SandboxUnavailableError("Forkserver failed to start", reason="forkserver_unavailable")
+
+    async def stop(self) -> None:
+        """Terminates the zygote and removes its socket directory."""
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
+            try:
+                await asyncio.wait_for(self._process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self._process.kill()
+        self._process = None
+        await self._cleanup_socket_dir()
+
+    async def _cleanup_socket_dir(self) -> None:
+        if self._socket_dir:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+        self._socket_dir = None
+        self._socket_path = None
+
+    async def run(self, payload: bytes, timeout: float, on_frame: FrameCallback) -> SandboxRun:
+        """Forks a child for the payload and decodes its frames until the zygote reports its exit code."""
+        if self._process is None or self._process.returncode is not None:
+            await self.start()
+
+        exchange = _Exchange(on_frame)
+        try:
+            await asyncio.wait_for(exchange.run(self._socket_path, payload), timeout=timeout)
+        except FrameError as exc:
+            _kill_group(exchange.child_pid)
+            raise SandboxProtocolError(str(exc), _child_name(exchange.child_pid)) from exc
+        except asyncio.TimeoutError as exc:
+            _kill_group(exchange.child_pid)
+            raise SandboxTimeoutError(_child_name(exchange.child_pid)) from exc
+        except asyncio.CancelledError:
+            _kill_group(exchange.child_pid)
+            raise
+        except (OSError, ValueError) as exc:
+            _kill_group(exchange.child_pid)
+            raise SandboxUnavailableError(
+                f"Forkserver connection failed: {exc}", reason="forkserver_unavailable"
+            ) from exc
+        finally:
+            exchange.close()
+
+        return SandboxRun(
+            name=_child_name(exchange.child_pid),
+            returncode=exchange.returncode,
+            stderr="",
+            channel_bytes=exchange.decoder.bytes_received,
+            frames=exchange.decoder.frames_received,
+            decode_seconds=exchange.decoder.decode_seconds,
+        )
+
+
+class _Exchange:
+    """One connection to the zygote: sends the payload and dispatches the child's frames."""
+
+    def __init__(self, on_frame: FrameCallback) -> None:
+        self.on_frame = on_frame
+        self.decoder = FrameDecoder()
+        self.child_pid: Optional[int] = None
+        self.returncode = -1
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def run(self, socket_path: str, payload: bytes) -> None:
+        reader, self._writer = await asyncio.open_unix_connection(socket_path)
+        self.child_pid = int((await reader.readline()).strip())
+        self._writer.write(payload)
+        await self._writer.drain()
+        self._writer.write_eof()
+        while True:
+            chunk = await reader.read(CHANNEL_CHUNK_BYTES)
+            if not chunk:
+                return
+            for kind, record in self.decoder.feed(chunk):
+                if kind == EXIT:
+                    self.returncode = int(record.get("exit_code", -1))
+                else:
+                    self.on_frame(kind, record)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _child_name(pid: Optional[int]) -> Optional[str]:
+    return f"forkserver-{pid}" if pid else None
@@ -0,0 +1,526 @@
+"""Test harness executed inside every sandbox (as `python -c` source)."""
+
+import hashlib
+import os
+
+
+CONTAINER_PYTHON = r"""
+import inspect
+import json
+import os
+import signal
+import struct
+import subprocess
+import sys
+import io
+import contextlib
+import time
+
+
+# Frame layout shared with app/services/ipc.py: kind byte, big-endian payload length, JSON payload.
+FRAME_HEADER = struct.Struct(">cI")
+PR_SET_DUMPABLE = 4
+# Command line that starts another harness process; None means "the same as this one".
+RELAUNCH_ARGV = None
+
+
+_CODE_CACHE = {}
+_CALL_PLANS = {}
+_COMPILE_SECONDS = [0.0]
+# Per-stream capture limits, overridden by the request: kept head+tail bytes and the hard stop (0 = off).
+_OUTPUT_LIMITS = {"budget": 8192, "hard_limit": 0}
+
+
+class OutputLimitExceeded(BaseException):
+    # A BaseException, so a bare `except Exception` in the submission cannot swallow it.
+    pass
+
+
+class BoundedCapture(io.TextIOBase):
+    # Keeps the first and last budget/2 bytes written to it and counts the bytes in between.
+    def __init__(self, budget, hard_limit=0):
+        self.head_budget = budget // 2
+        self.tail_budget = budget - self.head_budget
+        self.hard_limit = hard_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        data = str(text).encode("utf-8", errors="replace")
+        self.total += len(data)
+        if self.hard_limit and self.total > self.hard_limit:
+            raise OutputLimitExceeded(f"output exceeded {self.hard_limit} bytes")
+        room = self.head_budget - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+        if data and self.tail_budget:
+            self.tail += data[-self.tail_budget:]
+            if len(self.tail) > self.tail_budget:
+                del self.tail[: len(self.tail) - self.tail_budget]
+        return len(text)
+
+    @property
+    def dropped(self):
+        return self.total - len(self.head) - len(self.tail)
+
+    def getvalue(self):
+        head = self.head.decode("utf-8", errors="ignore")
+        tail = self.tail.decode("utf-8", errors="ignore")
+        if self.dropped:
+            return f"{head}\n... [truncated {self.dropped} bytes] ...\n{tail}"
+        return head + tail
+
+
+def compile_source(source: str):
+    # Every case runs the same submission: compile it once and re-raise a cached SyntaxError.
+    cached = _CODE_CACHE.get(source)
+    if cached is None:
+        started = time.perf_counter()
+        try:
+            cached = compile(source, "<user_code>", "exec")
+        except SyntaxError as exc:
+            cached = exc
+        _COMPILE_SECONDS[0] += time.perf_counter() - started
+        _CODE_CACHE[source] = cached
+    if isinstance(cached, BaseException):
+        raise cached
+    return cached
+
+
+def build_env(source: str, data=None, run_as_main=False):
+    if data is None:
+        data = {}
+
+    env = {
+        "__builtins__": __builtins__,
+        "__name__": "__main__" if run_as_main else "user_code",
+    }
+    env.update(data)
+
+    exec(compile_source(source), env, env)
+    return env
+
+
+def execute_user_code(
+    source: str,
+    data=None,
+    entry_point=None,
+    entry_args=None,
+    entry_kwargs=None,
+    run_as_main=False,
+    env=None,
+):
+    if env is None:
+        env = build_env(source, data=data, run_as_main=run_as_main)
+
+    if entry_point:
+        func = env.get(entry_point)
+        if not callable(func):
+            return f"Error: function '{entry_point}' not found"
+
+        return func(*(entry_args or []), **(entry_kwargs or {}))
+
+    if "result" in env:
+        return env["result"]
+
+    return None
+
+
+def sanitize_output(text, limit=8192):
+    if text is None:
+        return ""
+    lines = str(text).splitlines()
+    cleaned = "\n".join(line.rstrip() for line in lines).rstrip()
+    if limit is None or len(cleaned) <= limit:
+        return cleaned
+    return cleaned[:limit] + f"... [truncated {len(cleaned) - limit} chars]"
+
+def parse_value(text, annotation):
+    return make_parser(annotation)(text)
+
+def make_parser(annotation):
+    if annotation is inspect._empty or annotation is None or annotation is str:
+        return lambda text: text
+
+    if annotation is int:
+        return lambda text: int(str(text).strip()) if str(text).strip() else 0
+    if annotation is float:
+        return lambda text: float(str(text).strip()) if str(text).strip() else 0.0
+    if annotation is bool:
+        def parse_bool(text):
+            raw = str(text).strip()
+            lowered = raw.lower()
+            if lowered in {"true", "1", "yes", "y", "t"}:
+                return True
+            if lowered in {"false", "0", "no", "n", "f", ""}:
+                return False
+            return bool(int(raw)) if raw else False
+        return parse_bool
+
+    origin = getattr(annotation, "__origin__", None)
+    args = getattr(annotation, "__args__", None) or ()
+    if origin in {list, tuple}:
+        inner = make_parser(args[0] if args else str)
+
+        def parse_sequence(text):
+            raw = str(text).strip()
+            values = [inner(tok) for tok in (raw.split() if raw else [])]
+            return values if origin is list else tuple(values)
+        return parse_sequence
+
+    return lambda text: text
+
+class CallPlan:
+    # Parameter kinds and stdin parsers of an entry point, computed once per function.
+    # Defaults are not kept: each case calls a freshly executed function, so omitted
+    # arguments are left for Python to fill from that function's own defaults.
+    def __init__(self, func):
+        signature = inspect.signature(func)
+        self.func_name = func.__name__
+        self.positional = []
+        self.keyword_only = []
+        for name, param in signature.parameters.items():
+            has_default = param.default is not inspect.Parameter.empty
+            if param.kind in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            ):
+                positional_only = param.kind == inspect.Parameter.POSITIONAL_ONLY
+                self.positional.append((name, positional_only, has_default, make_parser(param.annotation)))
+            elif param.kind == inspect.Parameter.KEYWORD_ONLY:
+                self.keyword_only.append((name, has_default))
+
+    def args_from_env(self, env, func):
+        args_to_use = []
+        kwargs_to_use = {}
+        skipped = 0
+        for index, (name, positional_only, has_default, _) in enumerate(self.positional):
+            if name not in env:
+                if not has_default:
+                    raise ValueError(f"Error: missing argument '{name}' for '{self.func_name}'")
+                skipped += 1
+            elif not skipped:
+                args_to_use.append(env[name])
+            elif not positional_only:
+                kwargs_to_use[name] = env[name]
+            else:
+                # A positional-only argument after an omitted one: fill the gap from the
+                # defaults of this very function object, never from an earlier case.
+                defaults = func.__defaults__
+                offset = len(self.positional) - len(defaults)
+                args_to_use.extend(defaults[index - skipped - offset : index - offset])
+                args_to_use.append(env[name])
+                skipped = 0
+        for name, has_default in self.keyword_only:
+            if name in env:
+                kwargs_to_use[name] = env[name]
+            elif not has_default:
+                raise ValueError(f"Error: missing argument '{name}' for '{self.func_name}'")
+        return args_to_use, kwargs_to_use
+
+    def args_from_stdin(self, stdin_text):
+        if not self.positional:
+            return [], {}
+
+        if len(self.positional) == 1:
+            return [self.positional[0][3](stdin_text)], {}
+
+        tokens = str(stdin_text).split()
+        args = []
+        for idx, (_, _, has_default, parser) in enumerate(self.positional):
+            if idx < len(tokens):
+                args.append(parser(tokens[idx]))
+            elif has_default:
+                # Every later parameter has a default too; let the function apply them.
+                break
+            else:
+                args.append(parser(""))
+        return args, {}
+
+def call_plan_for(func):
+    # Each case re-executes the module, but the function's code object is shared between runs.
+    key = getattr(func, "__code__", func)
+    plan = _CALL_PLANS.get(key)
+    if plan is None:
+        plan = CallPlan(func)
+        _CALL_PLANS[key] = plan
+    return plan
+
+def resolve_call_args(func, env, entry_args, entry_kwargs, stdin_text_for_entry):
+    if not callable(func):
+        raise ValueError("Error: function not found")
+    if entry_args is not None or entry_kwargs is not None:
+        return entry_args or [], entry_kwargs or {}
+
+    plan = call_plan_for(func)
+    if stdin_text_for_entry is not None:
+        return plan.args_from_stdin(stdin_text_for_entry)
+    return plan.args_from_env(env, func)
+
+def run_single_case(source, entry_point, data, expected, stdin_text=None):
+    buf_out = BoundedCapture(_OUTPUT_LIMITS["budget"], _OUTPUT_LIMITS["hard_limit"])
+    buf_err = BoundedCapture(_OUTPUT_LIMITS["budget"], _OUTPUT_LIMITS["hard_limit"])
+
+    original_stdin = sys.stdin
+    started = time.perf_counter()
+
+    with contextlib.redirect_stdout(buf_out), contextlib.redirect_stderr(buf_err):
+        try:
+            use_entry_from_stdin = stdin_text is not None and entry_point is not None
+
+            if stdin_text is not None and entry_point is None:
+                sys.stdin = io.StringIO(str(stdin_text))
+
+            env = build_env(source, data=data, run_as_main=stdin_text is not None and entry_point is None)
+            entry_args = None
+            entry_kwargs = None
+            if entry_point is not None:
+                func = env.get(entry_point)
+                if not callable(func):
+                    raise ValueError(f"Error: function '{entry_point}' not found")
+                entry_args, entry_kwargs = resolve_call_args(
+                    func=func,
+                    env=env,
+                    entry_args=None,
+                    entry_kwargs=None,
+                    stdin_text_for_entry=stdin_text if use_entry_from_stdin else None,
+                )
+            raw_result = execute_user_code(
+                source=source,
+                data=data,
+                entry_point=entry_point,
+                entry_args=entry_args,
+                entry_kwargs=entry_kwargs,
+                run_as_main=stdin_text is not None and entry_point is None,
+                env=env,
+            )
+            error = None
+        except (Exception, OutputLimitExceeded) as exc:
+            raw_result = f"{exc.__class__.__name__}: {exc}"
+            error = f"{exc.__class__.__name__}: {exc}"
+        finally:
+            sys.stdin = original_stdin
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    # The captures are already bounded; sanitizing only normalizes whitespace.
+    actual_output = sanitize_output(buf_out.getvalue(), limit=None)
+    if stdin_text is not None:
+        expected_norm = sanitize_output(expected)
+        output_value = raw_result if entry_point is not None else actual_output
+        actual = sanitize_output(output_value)
+        passed = actual == expected_norm
+    else:
+        actual = json.loads(json.dumps(raw_result, default=str))
+        passed = actual == expected
+
+    return {
+        "expected": expected,
+        "actual": actual,
+        "passed": passed,
+        "stdout": actual_output,
+        "stderr": sanitize_output(buf_err.getvalue(), limit=None),
+        "error": error,
+        "duration_ms": round(duration_ms, 3),
+        "output_dropped_bytes": buf_out.dropped + buf_err.dropped,
+    }
+
+
+def encode_frame(kind, record):
+    data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return FRAME_HEADER.pack(kind, len(data)) + data
+
+
+def read_exact(stream, size):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError("request channel closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_request(stream):
+    kind, length = FRAME_HEADER.unpack(read_exact(stream, FRAME_HEADER.size))
+    if kind != b"Q":
+        raise ValueError(f"expected a request frame, got {kind!r}")
+    return json.loads(read_exact(stream, length))
+
+
+def load_test_cases(payload):
+    # Large test sets arrive as a content-addressed blob in a read-only directory.
+    digest = payload.get("test_cases_blob")
+    if not digest:
+        return payload.get("test_cases") or []
+    with open(os.path.join(payload["test_blob_dir"], digest + ".json"), "rb") as handle:
+        return json.loads(handle.read())
+
+
+def open_channel():
+    # Frames go to a private copy of the original stdout. fd 1 itself is pointed at stderr,
+    # so output that bypasses sys.stdout (os.write, child processes) cannot corrupt a frame.
+    sys.stdout.flush()
+    channel = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    return channel
+
+
+def emit_frame(channel, kind, record):
+    channel.write(encode_frame(kind, record))
+    channel.flush()
+
+
+def run_cases(source, entry_point, test_cases, fail_fast=False, on_result=None):
+    results = []
+    for case in test_cases:
+        data = case.get("data") or {}
+        expected = case.get("expected")
+        stdin_text = case.get("stdin")
+        case_result = run_single_case(source, entry_point, data, expected, stdin_text=stdin_text)
+        results.append(case_result)
+        if on_result is not None:
+            on_result(len(results) - 1, case_result)
+        if fail_fast and not case_result["passed"]:
+            break
+    return results
+
+
+def relaunch_argv():
+    # Batch submissions run in a fresh interpreter started the way this one was; the forkserver,
+    # which loads the harness from stdin, sets RELAUNCH_ARGV itself.
+    return RELAUNCH_ARGV or [sys.executable, *sys.orig_argv[1:]]
+
+
+def disable_ptrace_access():
+    # Keeps same-uid children from reading the other sources through /proc/<pid>/mem.
+    try:
+        import ctypes
+
+        ctypes.CDLL(None).prctl(PR_SET_DUMPABLE, 0, 0, 0, 0)
+    except (ImportError, OSError, AttributeError):
+        pass
+
+
+def decode_frames(data):
+    offset = 0
+    while offset < len(data):
+        kind, length = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        if offset + length > len(data):
+            raise ValueError("truncated frame")
+        yield kind, json.loads(data[offset : offset + length])
+        offset += length
+
+
+def run_isolated(request, timeout):
+    # The child is a new harness process: its memory holds only its own source, it cannot reach the
+    # batch channel, and its process group is killed afterwards with anything it left behind.
+    try:
+        child = subprocess.Popen(
+            relaunch_argv(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            process_group=0,
+        )
+    except OSError as exc:
+        return {"error": f"Submission could not be started: {exc}"}
+    try:
+        output, _ = child.communicate(encode_frame(b"Q", request), timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"Submission exceeded timeout ({timeout}s)."}
+    finally:
+        try:
+            os.killpg(child.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+        child.wait()
+    if child.returncode != 0:
+        return {"error": f"Submission exited with code {child.returncode}"}
+    results = []
+    summary = None
+    try:
+        for kind, record in decode_frames(output):
+            if kind == b"C":
+                results.append(record["result"])
+            elif kind == b"S":
+                summary = record
+    except (ValueError, TypeError, KeyError, struct.error):
+        summary = None
+    if summary is None:
+        return {"error": "Submission produced invalid output"}
+    return {"results": results}
+
+
+def run_batch(channel, payload):
+    disable_ptrace_access()
+    sources = payload["sources"]
+    timeout = float(payload.get("timeout") or 10)
+    deadline = time.monotonic() + float(payload.get("batch_timeout") or timeout * len(sources))
+    request = {key: value for key, value in payload.items() if key not in ("sources", "timeout", "batch_timeout")}
+    failed = 0
+    for index, source in enumerate(sources):
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            outcome = run_isolated({**request, "source": source or ""}, min(timeout, remaining))
+        else:
+            outcome = {"error": "Batch time limit reached before this submission ran."}
+        if outcome.get("error"):
+            failed += 1
+            emit_frame(channel, b"L", {"level": "warning", "message": f"submission {index}: {outcome['error']}"})
+        emit_frame(channel, b"B", {"index": index, "result": outcome})
+    emit_frame(channel, b"S", {"items": len(sources), "errors": failed})
+
+
+def main():
+    channel = open_channel()
+    payload = read_request(sys.stdin.buffer)
+    if "sources" in payload:
+        run_batch(channel, payload)
+        return
+
+    entry_point = payload.get("entry_point")
+    test_cases = load_test_cases(payload)
+    fail_fast = bool(payload.get("fail_fast"))
+    _OUTPUT_LIMITS["budget"] = int(payload.get("output_budget") or _OUTPUT_LIMITS["budget"])
+    _OUTPUT_LIMITS["hard_limit"] = int(payload.get("output_hard_limit") or 0)
+
+    # Wall-clock stamps let the host split its sandbox time into startup, work and teardown.
+    ready_at = time.time()
+    started = time.perf_counter()
+    source = payload.get("source") or ""
+    on_result = lambda index, result: emit_frame(channel, b"C", {"index": index, "result": result})
+    results = run_cases(source, entry_point, test_cases, fail_fast=fail_fast, on_result=on_result)
+    compile_seconds = _COMPILE_SECONDS[0]
+    timing = {
+        "ready_at": ready_at,
+        "finished_at": time.time(),
+        "compile_ms": round(compile_seconds * 1000, 3),
+        "cases_ms": round((time.perf_counter() - started - compile_seconds) * 1000, 3),
+    }
+    if fail_fast and len(results) < len(test_cases):
+        emit_frame(channel, b"L", {"level": "info", "message": f"fail_fast stopped after case {len(results) - 1}"})
+    emit_frame(channel, b"S", {"cases": len(results), "timing": timing})
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+OUTPUT_BUDGET_BYTES = int(os.getenv("EXECUTOR_OUTPUT_BUDGET_BYTES", "8192"))
+OUTPUT_HARD_LIMIT_BYTES = int(os.getenv("EXECUTOR_OUTPUT_HARD_LIMIT_BYTES", "0"))
+
+# Short content hash of the harness source; tags the prebuilt sandbox image.
+HARNESS_SOURCE_VERSION = hashlib.sha256(CONTAINER_PYTHON.encode("utf-8")).hexdigest()[:12]
+
+# Harness source plus its output limits; part of result cache keys so a harness change never serves
+# stale results.
+HARNESS_VERSION = hashlib.sha256(
+    f"{HARNESS_SOURCE_VERSION}\n{OUTPUT_BUDGET_BYTES}:{OUTPUT_HARD_LIMIT_BYTES}".encode("utf-8")
+).hexdigest()[:12]
@@ -0,0 +1,88 @@
+"""Length-prefixed frames exchanged between the host and the sandbox harness.
+
+A frame is a one-byte kind, a 4-byte big-endian payload length and a UTF-8 JSON payload.
+The host sends one `REQUEST` frame on the harness stdin; the harness answers on a private
+copy of its original stdout (user writes to fd 1 end up on stderr) with `CASE` or
+`BATCH_ITEM` frames as results finish, optional `LOG` frames and a final `SUMMARY`.
+The forkserver zygote appends an `EXIT` frame with the child's exit code.
+
+The harness carries its own copy of the encoder (see `harness.py`); keep both in sync.
+"""
+
+import json
+import struct
+import time
+from typing import Any, Callable, List, Tuple
+
+
+FRAME_HEADER = struct.Struct(">cI")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+REQUEST = b"Q"
+CASE = b"C"
+BATCH_ITEM = b"B"
+LOG = b"L"
+SUMMARY = b"S"
+EXIT = b"X"
+
+FRAME_KINDS = frozenset({REQUEST, CASE, BATCH_ITEM, LOG, SUMMARY, EXIT})
+
+Frame = Tuple[bytes, Any]
+FrameCallback = Callable[[bytes, Any], None]
+
+
+class FrameError(ValueError):
+    """Raised when the channel carries bytes that are not a valid frame."""
+
+
+def encode_frame(kind: bytes, record: Any) -> bytes:
+    """Serialize `record` as one frame of `kind`."""
+    data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return FRAME_HEADER.pack(kind, len(data)) + data
+
+
+class FrameDecoder:
+    """Incremental decoder: feed raw channel bytes, get back every frame they complete.
+
+    Only the current incomplete frame is buffered, so memory does not grow with the
+    total output of a run.
+    """
+
+    def __init__(self, max_frame_bytes: int = MAX_FRAME_BYTES) -> None:
+        self.max_frame_bytes = max_frame_bytes
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.decode_seconds = 0.0
+        self._buffer = bytearray()
+
+    @property
+    def pending(self) -> int:
+        """Bytes of an unfinished frame still waiting for the rest of it."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> List[Frame]:
+        started = time.perf_counter()
+        self.bytes_received += len(data)
+        self._buffer += data
+        frames: List[Frame] = []
+        offset = 0
+        while len(self._buffer) - offset >= FRAME_HEADER.size:
+            kind, length = FRAME_HEADER.unpack_from(self._buffer, offset)
+            if kind not in FRAME_KINDS:
+                raise FrameError(f"Unknown frame kind {kind!r}")
+            if length > self.max_frame_bytes:
+                raise FrameError(f"Frame of {length} bytes exceeds the {self.max_frame_bytes} byte limit")
+            end = offset + FRAME_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            try:
+                record = json.loads(bytes(self._buffer[offset + FRAME_HEADER.size : end]))
+            except ValueError as exc:
+                raise FrameError(f"Invalid frame payload: {exc}") from exc
+            frames.append((kind, record))
+            offset = end
+        if offset:
+            del self._buffer[:offset]
+        self.frames_received += len(frames)
+        self.decode_seconds += time.perf_counter() - started
+        return frames
@@ -0,0 +1,145 @@
+"""In-memory asynchronous job queue for code execution requests.
+
+Submissions are accepted into a bounded queue and processed by a fixed number of
+worker tasks. When the queue is full the caller gets `JobQueueFullError` with a
+retry hint instead of piling up behind the sandbox semaphore.
+"""
+
+import asyncio
+import math
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+JOB_QUEUE_SIZE = int(os.getenv("EXECUTOR_JOB_QUEUE_SIZE", "100"))
+JOB_WORKERS = int(os.getenv("EXECUTOR_JOB_WORKERS", "4"))
+JOB_RESULT_TTL_SECONDS = float(os.getenv("EXECUTOR_JOB_RESULT_TTL_SECONDS", "300"))
+
+JobRunner = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the job queue cannot accept another submission."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Job queue is full")
+        self.retry_after = retry_after
+
+
+@dataclass
+class Job:
+    """A queued execution and, once finished, its response body."""
+
+    id: str
+    owner: Optional[str]
+    runner: JobRunner
+    status: str = "queued"
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the public view of the job."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded FIFO of jobs drained by `workers` background tasks."""
+
+    def __init__(self, max_size: int, workers: int, result_ttl_seconds: float) -> None:
+        self.max_size = max(1, max_size)
+        self.workers = max(1, workers)
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: Dict[str, Job] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._avg_run_seconds = 1.0
+
+    async def start(self) -> None:
+        """Start the worker tasks (no-op when already running)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued jobs are marked as failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self._jobs.values():
+            if job.status in ("queued", "running"):
+                self._finish(job, status="failed", error="Executor shutting down")
+
+    def submit(self, owner: Optional[str], runner: JobRunner) -> Job:
+        """Enqueue a job or raise `JobQueueFullError` with a Retry-After estimate."""
+        if self._queue is None:
+            raise RuntimeError("Job queue is not started")
+        self._purge_expired()
+        job = Job(id=uuid.uuid4().hex, owner=owner, runner=runner)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(self._retry_after()) from None
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str, owner: Optional[str]) -> Optional[Job]:
+        """Return the job when it exists and belongs to `owner`."""
+        job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def depth(self) -> int:
+        """Return the number of jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.depth() * self._avg_run_seconds / self.workers))
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _finish(self, job: Job, status: str, result=None, error=None) -> None:
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.done.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            started = time.perf_counter()
+            try:
+                result = await job.runner()
+            except asyncio.CancelledError:
+                self._finish(job, status="failed", error="Executor shutting down")
+                raise
+            except Exception as exc:
+                self._finish(job, status="failed", error=str(exc))
+            else:
+                self._finish(job, status="done", result=result)
+            finally:
+                self._queue.task_done()
+                elapsed = time.perf_counter() - started
+                self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+
+
+JOB_QUEUE = JobQueue(JOB_QUEUE_SIZE, JOB_WORKERS, JOB_RESULT_TTL_SECONDS)
@@ -0,0 +1,160 @@
+"""Background writer for the structured executor log (executor.jsonl).
+
+`write` only enqueues the entry; a daemon thread serializes queued entries and
+appends them in batches, rotating the file by size and age. When the bounded queue
+is full the entry is dropped and counted instead of blocking the caller.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+LOG_QUEUE_SIZE = int(os.getenv("EXECUTOR_LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("EXECUTOR_LOG_BATCH_SIZE", "256"))
+LOG_FLUSH_SECONDS = float(os.getenv("EXECUTOR_LOG_FLUSH_SECONDS", "1"))
+LOG_MAX_BYTES = int(os.getenv("EXECUTOR_LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_ROTATE_SECONDS = float(os.getenv("EXECUTOR_LOG_ROTATE_SECONDS", "86400"))
+LOG_BACKUPS = int(os.getenv("EXECUTOR_LOG_BACKUPS", "5"))
+LOG_MAX_OUTPUT_BYTES = int(os.getenv("EXECUTOR_LOG_MAX_OUTPUT_BYTES", "4096"))
+
+_OUTPUT_FIELDS = ("stdout", "stderr")
+
+
+def cap_output(text: Optional[str], limit: int = LOG_MAX_OUTPUT_BYTES) -> Optional[str]:
+    """Trim `text` to at most `limit` UTF-8 bytes, marking how much was cut."""
+    if text is None or limit < 0:
+        return text
+    raw = text.encode("utf-8")
+    if len(raw) <= limit:
+        return text
+    kept = raw[:limit].decode("utf-8", errors="ignore")
+    return f"{kept}...[truncated {len(raw) - limit} bytes]"
+
+
+class LogSink:
+    """Bounded queue of log entries drained by one writer thread."""
+
+    def __init__(
+        self,
+        path: Path,
+        queue_size: int,
+        batch_size: int,
+        flush_seconds: float,
+        max_bytes: int,
+        rotate_seconds: float,
+        backups: int,
+        max_output_bytes: int,
+    ) -> None:
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = max(0.01, flush_seconds)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = max(0, backups)
+        self.max_output_bytes = max_output_bytes
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._opened_at = time.time()
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Queue one entry for the writer thread; never blocks and never raises."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters and the current queue depth."""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+    def close(self, timeout: float = 5) -> None:
+        """Flush queued entries and stop the writer thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="executor-log-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = []
+            stop = False
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            if batch:
+                self._flush(batch)
+            if stop:
+                return
+
+    def _serialize(self, entry: Dict[str, Any]) -> str:
+        for field in _OUTPUT_FIELDS:
+            if isinstance(entry.get(field), str):
+                entry[field] = cap_output(entry[field], self.max_output_bytes)
+        return json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            data = "".join(self._serialize(entry) for entry in batch)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._maybe_rotate(len(data.encode("utf-8")))
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(data)
+            self.written += len(batch)
+        except Exception:
+            self.errors += 1
+
+    def _maybe_rotate(self, incoming: int) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            self._opened_at = time.time()
+            return
+        too_big = self.max_bytes > 0 and size + incoming > self.max_bytes
+        too_old = self.rotate_seconds > 0 and time.time() - self._opened_at >= self.rotate_seconds
+        if not (too_big or too_old) or size == 0:
+            return
+        if self.backups == 0:
+            self.path.unlink()
+        else:
+            for index in range(self.backups - 1, 0, -1):
+                older = self.path.with_name(f"{self.path.name}.{index}")
+                if older.exists():
+                    older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        self._opened_at = time.time()
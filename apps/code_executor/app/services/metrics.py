@@ -0,0 +1,228 @@
+"""Minimal Prometheus text-format metrics for the executor (no client library needed).
+
+Metrics live in process memory and are rendered by `GET /metrics`. Label values are
+passed as keyword arguments; every metric is safe to update from any thread.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CASE_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._function: Optional[Callable[[], float]] = None
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the (unlabeled) value at scrape time instead of storing it."""
+        self._function = function
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        if self._function is not None:
+            try:
+                lines.append(f"{self.name} {_format_value(self._function())}")
+            except Exception:
+                pass
+            return lines
+        return lines + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        # Unlabeled series are exported as 0 before the first update.
+        self._values: Dict[LabelKey, float] = {} if labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels_text(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Tuple[float, ...], labelnames: Tuple[str, ...] = ()
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelKey, List[float]] = {} if labelnames else {(): [0.0] * (len(self.buckets) + 2)}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts followed by the running sum and count.
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for index, bound in enumerate(self.buckets):
+                cumulative += series[index]
+                bucket_labels = _labels_text(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(cumulative)}")
+            labels = _labels_text(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+EXECUTION_SECONDS = REGISTRY.register(
+    Histogram(
+        "executor_execution_seconds",
+        "End-to-end time of one execution, including cache lookups.",
+        LATENCY_BUCKETS,
+        labelnames=("mode", "cached"),
+    )
+)
+SANDBOX_WAIT_SECONDS = REGISTRY.register(
+    Histogram(
+        "executor_sandbox_wait_seconds",
+        "Time spent waiting for a free concurrency slot.",
+        LATENCY_BUCKETS,
+    )
+)
+SANDBOX_RUN_SECONDS = REGISTRY.register(
+    Histogram(
+        "executor_sandbox_run_seconds",
+        "Wall time of one sandbox run (container or forkserver child).",
+        LATENCY_BUCKETS,
+        labelnames=("backend",),
+    )
+)
+CASES_PER_RUN = REGISTRY.register(
+    Histogram(
+        "executor_cases_per_run",
+        "Number of test case results returned by one sandbox run.",
+        CASE_COUNT_BUCKETS,
+    )
+)
+RUNS_TOTAL = REGISTRY.register(
+    Counter(
+        "executor_runs_total",
+        "Sandbox runs by outcome (ok, timeout, error or the specific error reason) and mode.",
+        labelnames=("status", "mode"),
+    )
+)
+RUNS_IN_FLIGHT = REGISTRY.register(Gauge("executor_runs_in_flight", "Sandbox runs currently executing."))
+CONCURRENCY_FREE_SLOTS = REGISTRY.register(
+    Gauge("executor_concurrency_free_slots", "Free slots of the sandbox concurrency guard.")
+)
+CONCURRENCY_LIMIT_GAUGE = REGISTRY.register(
+    Gauge("executor_concurrency_limit", "Current number of sandbox runs allowed at once.")
+)
+CONCURRENCY_WAITING = REGISTRY.register(
+    Gauge("executor_concurrency_waiting", "Runs waiting for a concurrency slot.")
+)
+JOB_QUEUE_DEPTH = REGISTRY.register(Gauge("executor_job_queue_depth", "Jobs waiting for a worker."))
+RATE_LIMITED_TOTAL = REGISTRY.register(
+    Counter("executor_rate_limited_total", "Submissions rejected by the per-user rate limit.")
+)
+LOG_DROPPED_TOTAL = REGISTRY.register(
+    Counter("executor_log_dropped_total", "Log entries dropped because the log queue was full.")
+)
+CONTAINERS_REAPED_TOTAL = REGISTRY.register(
+    Counter("executor_containers_reaped_total", "Finished sandbox containers removed by the background reaper.")
+)
+CONTAINERS_LEAKED_TOTAL = REGISTRY.register(
+    Counter(
+        "executor_containers_leaked_total",
+        "Sandbox containers found past their deadline by a reaper sweep (left behind by a crashed process).",
+    )
+)
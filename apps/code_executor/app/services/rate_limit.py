@@ -0,0 +1,61 @@
+"""Per-user token-bucket rate limit for submissions."""
+
+import math
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+USER_RATE_PER_MINUTE = float(os.getenv("EXECUTOR_USER_RATE_PER_MINUTE", "0"))
+USER_BURST = float(os.getenv("EXECUTOR_USER_BURST", "10"))
+
+_MAX_BUCKETS = 100000
+
+
+class RateLimitedError(RuntimeError):
+    """Raised when a user has no tokens left; `retry_after` is in whole seconds."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class TokenBucketLimiter:
+    """One bucket of `burst` tokens per user, refilled at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, burst: float) -> None:
+        self.rate_per_second = max(0.0, rate_per_minute) / 60
+        self.burst = max(1.0, burst)
+        self._buckets: Dict[Optional[str], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def consume(self, user: Optional[str], cost: float = 1) -> None:
+        """Take `cost` tokens from the user's bucket or raise RateLimitedError."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(user, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate_per_second)
+            if tokens < cost:
+                self._buckets[user] = (tokens, now)
+                missing = min(cost, self.burst) - tokens
+                raise RateLimitedError(max(1, math.ceil(missing / self.rate_per_second)))
+            self._buckets[user] = (tokens - cost, now)
+            if len(self._buckets) > _MAX_BUCKETS:
+                self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping.
+        full_after = self.burst / self.rate_per_second
+        stale = [user for user, (_, updated) in self._buckets.items() if now - updated >= full_after]
+        for user in stale:
+            del self._buckets[user]
+
+
+RATE_LIMITER = TokenBucketLimiter(USER_RATE_PER_MINUTE, USER_BURST)
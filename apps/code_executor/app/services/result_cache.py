@@ -0,0 +1,185 @@
+"""Content-addressed cache of deterministic execution results.
+
+Entries are keyed by a hash of everything that determines the harness output
+(source, task, mode, entry point, test-case digest and harness version). The in-memory
+tier is a size-bounded LRU with a TTL; an optional SQLite file adds a second tier
+that survives restarts.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .harness import HARNESS_VERSION
+
+
+RESULT_CACHE_SIZE = int(os.getenv("EXECUTOR_RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("EXECUTOR_RESULT_CACHE_TTL_SECONDS", "3600"))
+RESULT_CACHE_PATH = os.getenv("EXECUTOR_RESULT_CACHE_PATH")
+RESULT_CACHE_DISK_SIZE = int(os.getenv("EXECUTOR_RESULT_CACHE_DISK_SIZE", "100000"))
+
+_PRUNE_EVERY = 256
+
+
+def make_cache_key(
+    source: str,
+    task_id: Optional[str],
+    mode: str,
+    entry_point: Optional[str],
+    test_cases_digest: str,
+    fail_fast: bool = False,
+) -> str:
+    """Return the content hash identifying one execution.
+
+    `test_cases_digest` is the memoized `CASE_BLOBS.digest` of the test cases, so large
+    fixtures are not re-serialized for every lookup.
+    """
+    material = json.dumps(
+        {
+            "source": source,
+            "task_id": task_id,
+            "mode": mode,
+            "entry_point": entry_point,
+            "test_cases": test_cases_digest,
+            "fail_fast": fail_fast,
+            "harness": HARNESS_VERSION,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """LRU + TTL cache of serialized result lists with an optional SQLite tier."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, path: Optional[str] = None, max_disk_entries: int = 0):
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # The memory tier and the SQLite connection have separate locks, so a memory hit on the
+        # event loop never waits behind a disk query running in the threadpool.
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._puts = 0
+        if path:
+            self._db = self._open_db(path)
+
+    @property
+    def enabled(self) -> bool:
+        """Return True when at least one tier can hold entries."""
+        return self.max_entries > 0 or self._db is not None
+
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+        return db
+
+    async def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return a fresh copy of the cached results, or None on miss/expiry.
+
+        Memory hits are answered inline; the SQLite tier is read in the threadpool so a
+        slow disk never blocks the event loop.
+        """
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                expires_at, value = hit
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return json.loads(value)
+                del self._memory[key]
+
+        if self._db is None:
+            return None
+        row = await run_in_threadpool(self._read_disk, key, now)
+        if row is None:
+            return None
+        value, expires_at = row
+        with self._lock:
+            self._remember(key, expires_at, value)
+        return json.loads(value)
+
+    async def put(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Store results under `key` in every enabled tier (SQLite writes run in the threadpool).
+
+        Per-case `duration_ms` is dropped: it timed the run that filled the cache, not the
+        request a hit answers.
+        """
+        untimed = [{name: field for name, field in result.items() if name != "duration_ms"} for result in results]
+        value = json.dumps(untimed, ensure_ascii=False, default=str)
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._db is not None:
+            await run_in_threadpool(self._write_disk, key, value, expires_at)
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM results")
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            row = self._db.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] <= now:
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            return row
+
+    def _write_disk(self, key: str, value: str, expires_at: float) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._puts += 1
+            if self._puts % _PRUNE_EVERY == 0:
+                self._prune_disk()
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self) -> None:
+        self._db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+        if self.max_disk_entries > 0:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
+
+
+RESULT_CACHE = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+    path=RESULT_CACHE_PATH,
+    max_disk_entries=RESULT_CACHE_DISK_SIZE,
+)
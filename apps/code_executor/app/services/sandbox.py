@@ -0,0 +1,97 @@
+"""Pluggable sandbox backend interface used by the container runner."""
+
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from .ipc import FrameCallback
+
+
+SANDBOX_BACKEND = os.getenv("EXECUTOR_SANDBOX_BACKEND", "docker")
+
+# Read size for the harness frame channel.
+CHANNEL_CHUNK_BYTES = 64 * 1024
+
+
+class SandboxUnavailableError(RuntimeError):
+    """Raised when a backend cannot start a sandbox at all (e.g. Docker is missing)."""
+
+    def __init__(self, message: str, reason: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+
+
+class SandboxTimeoutError(RuntimeError):
+    """Raised when a sandbox exceeds its wall-clock timeout; the sandbox is already killed."""
+
+    def __init__(self, name: Optional[str], warm: bool = False) -> None:
+        super().__init__(f"Sandbox {name} exceeded its timeout")
+        self.name = name
+        self.warm = warm
+
+
+class SandboxProtocolError(RuntimeError):
+    """Raised when a sandbox writes bytes that are not valid frames; the sandbox is already killed."""
+
+    def __init__(self, message: str, name: Optional[str]) -> None:
+        super().__init__(message)
+        self.name = name
+
+
+@dataclass
+class SandboxRun:
+    """Raw outcome of one harness run inside a sandbox."""
+
+    name: Optional[str]
+    returncode: int
+    stderr: str
+    warm: bool = False
+    # Size of the frame channel, number of frames decoded from it and time spent decoding.
+    channel_bytes: int = 0
+    frames: int = 0
+    decode_seconds: float = 0.0
+    # Host wall-clock stamps around `run`, filled in by the container runner.
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+
+class SandboxBackend:
+    """Interface every sandbox backend implements.
+
+    `run` receives the framed request for the harness, decodes the harness channel
+    incrementally and hands every frame to `on_frame` as soon as it is complete. It must
+    clean up the sandbox itself on timeout, cancellation or a protocol error.
+    """
+
+    name = "base"
+    # Path under which the sandbox sees EXECUTOR_TEST_BLOB_DIR; None sends test cases inline.
+    test_blob_dir: Optional[str] = None
+
+    async def start(self) -> None:
+        """Prepare long-lived backend resources (pools, zygote processes)."""
+        return None
+
+    async def stop(self) -> None:
+        """Release long-lived backend resources."""
+        return None
+
+    async def run(self, payload: bytes, timeout: float, on_frame: FrameCallback) -> SandboxRun:
+        """Run the harness once with `payload` on its stdin."""
+        raise NotImplementedError
+
+
+def create_sandbox_backend(name: str = SANDBOX_BACKEND) -> SandboxBackend:
+    """Build the backend selected by EXECUTOR_SANDBOX_BACKEND (`docker`, `docker_api` or `forkserver`)."""
+    if name == "docker":
+        from .docker_backend import DockerBackend
+
+        return DockerBackend()
+    if name == "docker_api":
+        from .docker_api_backend import DockerApiBackend
+
+        return DockerApiBackend()
+    if name == "forkserver":
+        from .forkserver_backend import ForkserverBackend
+
+        return ForkserverBackend()
+    raise ValueError(f"Unknown sandbox backend '{name}'")
@@ -0,0 +1,114 @@
+"""Prebuilt Docker sandbox image with the harness baked in as precompiled bytecode.
+
+Build (or rebuild after a harness change) from apps/code_executor:
+
+    python -m app.build_sandbox_image            # docker build -t <repository>:<harness version>
+    python -m app.build_sandbox_image --context build/sandbox   # only write the build context
+
+The image is tagged with HARNESS_SOURCE_VERSION and carries it as a label, so the service
+can refuse to start against an image built from a different harness.
+"""
+
+import asyncio
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+from .harness import CONTAINER_PYTHON, HARNESS_SOURCE_VERSION
+from .sandbox import SandboxUnavailableError
+
+
+SANDBOX_IMAGE = os.getenv("EXECUTOR_SANDBOX_IMAGE", "")
+SANDBOX_BASE_IMAGE = os.getenv("EXECUTOR_SANDBOX_BASE_IMAGE", "python:3.11-slim")
+
+HARNESS_LABEL = "org.snakecoder.harness_version"
+HARNESS_PATH = "/opt/snakecoder/harness.pyc"
+# -I: ignore PYTHON* env vars and the cwd on sys.path; -S: skip `site` (no site-packages scan).
+HARNESS_ARGV = ["python", "-I", "-S", HARNESS_PATH]
+
+# Tooling a submission has no use for; the rest of the stdlib stays importable.
+_STRIPPED_STDLIB = ("ensurepip", "idlelib", "lib2to3", "pydoc_data", "tkinter", "turtledemo", "venv", "test")
+
+DOCKERFILE = """\
+ARG BASE_IMAGE
+FROM ${{BASE_IMAGE}}
+ARG HARNESS_VERSION
+LABEL {label}=$HARNESS_VERSION
+RUN pip uninstall -y -q pip setuptools wheel || true \\
+ && cd "$(python -c 'import sysconfig; print(sysconfig.get_paths()["stdlib"])')" \\
+ && rm -rf {stripped} \\
+ && python -I -S -m compileall -q -j 0 .
+COPY harness.py /opt/snakecoder/harness.py
+RUN python -I -S -c "import py_compile; py_compile.compile('/opt/snakecoder/harness.py', \\
+cfile='{harness_path}', doraise=True)" \\
+ && rm /opt/snakecoder/harness.py
+USER 65534:65534
+""".format(label=HARNESS_LABEL, stripped=" ".join(_STRIPPED_STDLIB), harness_path=HARNESS_PATH)
+
+
+def image_reference(repository: str = SANDBOX_IMAGE) -> str:
+    """Return `<repository>:<harness version>`, the image the running service expects."""
+    return f"{repository}:{HARNESS_SOURCE_VERSION}"
+
+
+def write_build_context(directory: Path) -> Path:
+    """Write the Dockerfile and harness source into `directory`."""
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "Dockerfile").write_text(DOCKERFILE, encoding="utf-8")
+    (directory / "harness.py").write_text(CONTAINER_PYTHON, encoding="utf-8")
+    return directory
+
+
+def build_image(repository: str, base_image: str = SANDBOX_BASE_IMAGE) -> str:
+    """Build and tag the sandbox image with the local Docker daemon; returns its reference."""
+    reference = image_reference(repository)
+    with tempfile.TemporaryDirectory(prefix="snake_sandbox_image_") as tmp:
+        context = write_build_context(Path(tmp))
+        subprocess.run(
+            [
+                "docker",
+                "build",
+                "--build-arg",
+                f"BASE_IMAGE={base_image}",
+                "--build-arg",
+                f"HARNESS_VERSION={HARNESS_SOURCE_VERSION}",
+                "--tag",
+                reference,
+                str(context),
+            ],
+            check=True,
+        )
+    return reference
+
+
+async def verify_sandbox_image(repository: str = SANDBOX_IMAGE) -> None:
+    """Fail fast unless the expected image exists and was built from the current harness."""
+    reference = image_reference(repository)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "docker",
+            "image",
+            "inspect",
+            "--format",
+            f'{{{{ index .Config.Labels "{HARNESS_LABEL}" }}}}',
+            reference,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except FileNotFoundError as exc:
+        raise SandboxUnavailableError(
+            "Docker not found. Ensure it is installed and on PATH.", reason="docker_not_found"
+        ) from exc
+    stdout, _ = await proc.communicate()
+    if proc.returncode != 0:
+        raise SandboxUnavailableError(
+            f"Sandbox image {reference} not found; build it with `python -m app.build_sandbox_image`",
+            reason="sandbox_image_missing",
+        )
+    built_from = stdout.decode("utf-8", errors="replace").strip()
+    if built_from != HARNESS_SOURCE_VERSION:
+        raise SandboxUnavailableError(
+            f"Sandbox image {reference} carries harness {built_from or 'unknown'}, expected {HARNESS_SOURCE_VERSION}",
+            reason="sandbox_image_mismatch",
+        )
@@ -0,0 +1,228 @@
+"""Offline task bundle: every DB task, pre-built for the executor, in one memory-mapped file.
+
+Export with `python -m app.export_task_bundle PATH`. With EXECUTOR_TASK_BUNDLE_PATH set,
+`load_task_by_id` reads tasks from the bundle instead of the database.
+
+Layout (big-endian):
+
+    header   magic, format version, slot count, task count, table offset, content digest
+    records  one JSON object per task: {"id": ..., "shapes": {<mode>: <task definition>}}
+    table    open-addressing hash table of (id hash, record offset, record length) slots
+
+Records hold what `task_shapes.build_task_shapes` produces (entry point, normalized stdin,
+visible/full test split), so a lookup is one probe in the mapped table plus one JSON decode.
+A new bundle is written next to the old one and renamed over it; `BundleTaskSource` notices
+the new file and swaps it in without blocking lookups. The source opens the file on its first
+lookup, so a service can start before the bundle has been exported.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+TaskShapes = Dict[str, Dict[str, Any]]
+
+TASK_BUNDLE_PATH = os.getenv("EXECUTOR_TASK_BUNDLE_PATH", "")
+TASK_BUNDLE_CHECK_SECONDS = float(os.getenv("EXECUTOR_TASK_BUNDLE_CHECK_SECONDS", "5"))
+
+BUNDLE_MAGIC = b"SNKTASKS"
+BUNDLE_FORMAT_VERSION = 1
+_HEADER = struct.Struct(">8sIIIQ32s")
+_SLOT = struct.Struct(">QQI")
+
+logger = logging.getLogger(__name__)
+
+
+class TaskBundleError(ValueError):
+    """Raised for a file that is not a readable task bundle."""
+
+
+def _id_hash(task_id: str) -> int:
+    # 0 marks an empty slot, so real hashes are never 0.
+    return int.from_bytes(hashlib.blake2b(task_id.encode("utf-8"), digest_size=8).digest(), "big") or 1
+
+
+def _slot_count(task_count: int) -> int:
+    # Power of two at least twice the task count keeps probe chains short.
+    slots = 2
+    while slots < task_count * 2:
+        slots *= 2
+    return slots
+
+
+def write_task_bundle(path: Path, tasks: Iterable[Tuple[str, TaskShapes]]) -> Dict[str, Any]:
+    """Write `(task_id, shapes)` pairs as a bundle, atomically replacing `path`."""
+    path = Path(path)
+    records = []
+    digest = hashlib.sha256()
+    for task_id, shapes in tasks:
+        record = json.dumps({"id": task_id, "shapes": shapes}, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        digest.update(record)
+        records.append((task_id, record))
+
+    slot_count = _slot_count(len(records))
+    slots = [(0, 0, 0)] * slot_count
+    offset = _HEADER.size
+    for task_id, record in records:
+        id_hash = _id_hash(task_id)
+        index = id_hash & (slot_count - 1)
+        while slots[index][0]:
+            index = (index + 1) & (slot_count - 1)
+        slots[index] = (id_hash, offset, len(record))
+        offset += len(record)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(
+                _HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, slot_count, len(records), offset, digest.digest())
+            )
+            for _, record in records:
+                handle.write(record)
+            for slot in slots:
+                handle.write(_SLOT.pack(*slot))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    return {
+        "path": str(path),
+        "tasks": len(records),
+        "bytes": offset + slot_count * _SLOT.size,
+        "version": digest.hexdigest()[:16],
+    }
+
+
+class TaskBundle:
+    """Read-only view of one bundle file through a shared memory mapping."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            self.identity = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if stat.st_size < _HEADER.size:
+                raise TaskBundleError(f"{self.path} is too small to be a task bundle")
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, self.slot_count, self.task_count, self._table_offset, digest = _HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != BUNDLE_MAGIC:
+            raise TaskBundleError(f"{self.path} is not a task bundle")
+        if format_version != BUNDLE_FORMAT_VERSION:
+            raise TaskBundleError(
+                f"{self.path} has bundle format {format_version}, expected {BUNDLE_FORMAT_VERSION}"
+            )
+        if self._table_offset + self.slot_count * _SLOT.size != len(self._map):
+            raise TaskBundleError(f"{self.path} is truncated")
+        self.version = digest.hex()[:16]
+
+    def get(self, task_id: str) -> Optional[TaskShapes]:
+        """Return the built shapes of `task_id`, or None when the bundle does not have it."""
+        id_hash = _id_hash(task_id)
+        mask = self.slot_count - 1
+        index = id_hash & mask
+        for _ in range(self.slot_count):
+            slot_hash, offset, length = _SLOT.unpack_from(self._map, self._table_offset + index * _SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == id_hash:
+                record = json.loads(self._map[offset : offset + length])
+                if record["id"] == task_id:
+                    return record["shapes"]
+            index = (index + 1) & mask
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the path, content version and task count of the bundle."""
+        return {"path": str(self.path), "version": self.version, "tasks": self.task_count}
+
+
+class BundleTaskSource:
+    """Serves lookups from the current bundle and swaps in a replaced file.
+
+    The file is opened on the first lookup and re-checked at most every `check_seconds`.
+    Lookups keep using the old mapping until the new bundle has been opened and validated;
+    a broken replacement is ignored (and counted) rather than taking the service down.
+    Until a bundle has been loaded `loaded` is False and callers read from the database.
+    """
+
+    def __init__(self, path: Path, check_seconds: float = TASK_BUNDLE_CHECK_SECONDS) -> None:
+        self.path = Path(path)
+        self.check_seconds = max(0.0, check_seconds)
+        self._bundle: Optional[TaskBundle] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._missing_reported = False
+        self.swaps = 0
+        self.swap_errors = 0
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a bundle is mapped; checks for the file first when a check is due."""
+        self.refresh_if_due()
+        return self._bundle is not None
+
+    def get(self, task_id: str) -> Optional[TaskShapes]:
+        """Look `task_id` up in the current bundle, checking for a replacement first when due."""
+        self.refresh_if_due()
+        bundle = self._bundle
+        return bundle.get(task_id) if bundle is not None else None
+
+    def refresh_if_due(self) -> bool:
+        """Run `refresh` when the check interval has passed; returns True after a swap."""
+        return time.monotonic() >= self._next_check and self.refresh()
+
+    def refresh(self) -> bool:
+        """Swap in the file at `path` if it changed; returns True when a new bundle was loaded."""
+        if not self._lock.acquire(blocking=False):
+            # Another thread is already checking; keep serving the current bundle.
+            return False
+        try:
+            self._next_check = time.monotonic() + self.check_seconds
+            try:
+                stat = os.stat(self.path)
+            except OSError as exc:
+                if self._bundle is None and not self._missing_reported:
+                    self._missing_reported = True
+                    logger.warning(
+                        "task bundle %s is not available (%s); loading tasks from the database", self.path, exc
+                    )
+                return False
+            identity = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if self._bundle is not None and identity == self._bundle.identity:
+                return False
+            try:
+                bundle = TaskBundle(self.path)
+            except (OSError, TaskBundleError) as exc:
+                self.swap_errors += 1
+                logger.warning("ignoring unreadable task bundle %s: %s", self.path, exc)
+                return False
+            # The old mapping is unmapped once the last in-flight lookup drops it.
+            if self._bundle is not None:
+                self.swaps += 1
+            self._bundle = bundle
+            self._missing_reported = False
+            return True
+        finally:
+            self._lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current bundle's stats plus swap counters."""
+        bundle = self._bundle
+        current = bundle.stats() if bundle is not None else {"path": str(self.path), "version": None, "tasks": 0}
+        return {**current, "loaded": bundle is not None, "swaps": self.swaps, "swap_errors": self.swap_errors}
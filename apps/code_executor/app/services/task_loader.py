@@ -1,68 +1,121 @@
 """Helpers for loading task definitions from the database."""
 
-import ast
-from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
 
 from ..db import get_db_session
 from ..models import Task
 from ..schemas import ExecutionMode
+from .task_bundle import TASK_BUNDLE_PATH, BundleTaskSource
+from .task_shapes import TaskDefinition, shapes_from_row
+
+TASK_CACHE_SIZE = int(os.getenv("EXECUTOR_TASK_CACHE_SIZE", "512"))
+TASK_CACHE_TTL_SECONDS = float(os.getenv("EXECUTOR_TASK_CACHE_TTL_SECONDS", "300"))
+TASK_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("EXECUTOR_TASK_CACHE_NEGATIVE_TTL_SECONDS", "30"))
+
+
+class _TaskCache:
+    """Thread-safe LRU of built task definitions per task id, including negative entries."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float, negative_ttl_seconds: float) -> None:
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, TaskDefinition]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, task_id: str) -> Tuple[bool, Optional[Dict[str, TaskDefinition]]]:
+        """Return `(found, shapes)`; `shapes` is None for a cached "task does not exist"."""
+        with self._lock:
+            entry = self._entries.get(task_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(task_id)
+                if entry[1] is None:
+                    self.negative_hits += 1
+                else:
+                    self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[task_id]
+            self.misses += 1
+            return False, None
+
+    def put(self, task_id: str, shapes: Optional[Dict[str, TaskDefinition]]) -> None:
+        """Store built shapes (or None for a missing task) with the matching TTL."""
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if shapes is not None else self.negative_ttl_seconds
+        with self._lock:
+            self._entries[task_id] = (time.monotonic() + ttl, shapes)
+            self._entries.move_to_end(task_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, task_id: Optional[str] = None) -> int:
+        """Drop one task (or everything when `task_id` is None); return the number of evicted entries."""
+        with self._lock:
+            self.invalidations += 1
+            if task_id is None:
+                evicted = len(self._entries)
+                self._entries.clear()
+                return evicted
+            return 1 if self._entries.pop(task_id, None) is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
 
 
-TaskDefinition = Dict[str, Any]
-
-
-def _extract_entry_point(starter_code: str) -> Optional[str]:
-    """Extract the first function name from starter code (entry point)."""
-    try:
-        module = ast.parse(starter_code)
-    except SyntaxError:
-        return None
-
-    for node in module.body:
-        if isinstance(node, ast.FunctionDef):
-            return node.name
-    return None
-
-
-def _normalize_stdin(value: Any) -> str:
-    """Normalize test input into a stdin-friendly string."""
-    if value is None:
-        return ""
-    if isinstance(value, list):
-        return " ".join(str(item) for item in value)
-    return str(value)
+_TASK_CACHE = _TaskCache(TASK_CACHE_SIZE, TASK_CACHE_TTL_SECONDS, TASK_CACHE_NEGATIVE_TTL_SECONDS)
+# With a bundle configured the database is only queried while the bundle file is missing or
+# unreadable. The file is opened on the first lookup, not at import.
+_BUNDLE_SOURCE = BundleTaskSource(Path(TASK_BUNDLE_PATH)) if TASK_BUNDLE_PATH else None
 
 
 def load_task_by_id(task_id: str, mode: ExecutionMode) -> Optional[TaskDefinition]:
-    """Load task test cases from the DB and map them to executor format."""
-
-    with get_db_session() as session:
-        task_row = session.get(Task, task_id)
-        entry_point = _extract_entry_point(task_row.starter_code) if task_row else None
-        tests = task_row.tests if task_row else None
-
-    if not tests or not isinstance(tests, list):
+    """Load task test cases (from the task bundle or read-through cached DB) in executor format."""
+
+    if _BUNDLE_SOURCE is not None and _BUNDLE_SOURCE.refresh_if_due():
+        # A new bundle may change any task.
+        _TASK_CACHE.invalidate()
+    found, shapes = _TASK_CACHE.get(task_id)
+    if not found:
+        if _BUNDLE_SOURCE is not None and _BUNDLE_SOURCE.loaded:
+            shapes = _BUNDLE_SOURCE.get(task_id)
+        else:
+            with get_db_session() as session:
+                shapes = shapes_from_row(task_id, session.get(Task, task_id))
+        _TASK_CACHE.put(task_id, shapes)
+
+    if shapes is None:
         return None
+    shape_mode = ExecutionMode.full_test if mode == ExecutionMode.full_test else ExecutionMode.complete_task
+    return shapes.get(shape_mode.value)
 
-    visible_tests = tests[:3] if mode == ExecutionMode.full_test else tests
-    test_cases: List[Dict[str, Any]] = []
-    for test in visible_tests:
-        if not isinstance(test, dict):
-            continue
-        stdin_value = test.get("input")
-        expected = test.get("expectedOutput", test.get("output", test.get("expected")))
-        test_cases.append(
-            {
-                "stdin": _normalize_stdin(stdin_value),
-                "expected": expected,
-            }
-        )
 
-    if not test_cases:
-        return None
+def invalidate_task_cache(task_id: Optional[str] = None) -> int:
+    """Evict a cached task definition (or all of them) after the task changed in the DB."""
+    return _TASK_CACHE.invalidate(task_id)
+
 
-    return {
-        "description": f"DB task: {task_id}",
-        "entry_point": entry_point,
-        "test_cases": test_cases,
-    }
+def task_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters of the task definition cache (and the task bundle, if any)."""
+    stats: Dict[str, Any] = _TASK_CACHE.stats()
+    if _BUNDLE_SOURCE is not None:
+        stats["bundle"] = _BUNDLE_SOURCE.stats()
+    return stats
@@ -0,0 +1,90 @@
+"""Building executor task definitions from DB task rows.
+
+Shared by the read-through loader (`task_loader`) and the bundle export
+(`app.export_task_bundle`); importing it opens neither the database nor a bundle.
+"""
+
+import ast
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from ..db import get_db_session
+from ..models import Task
+from ..schemas import ExecutionMode
+
+
+TaskDefinition = Dict[str, Any]
+
+
+def extract_entry_point(starter_code: str) -> Optional[str]:
+    """Extract the first function name from starter code (entry point)."""
+    try:
+        module = ast.parse(starter_code)
+    except SyntaxError:
+        return None
+
+    for node in module.body:
+        if isinstance(node, ast.FunctionDef):
+            return node.name
+    return None
+
+
+def _normalize_stdin(value: Any) -> str:
+    """Normalize test input into a stdin-friendly string."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+def _map_test_cases(tests: List[Any]) -> List[Dict[str, Any]]:
+    """Map DB test entries to executor test cases, skipping malformed ones."""
+    test_cases: List[Dict[str, Any]] = []
+    for test in tests:
+        if not isinstance(test, dict):
+            continue
+        stdin_value = test.get("input")
+        expected = test.get("expectedOutput", test.get("output", test.get("expected")))
+        test_cases.append(
+            {
+                "stdin": _normalize_stdin(stdin_value),
+                "expected": expected,
+            }
+        )
+    return test_cases
+
+
+def build_task_shapes(task_id: str, entry_point: Optional[str], tests: Any) -> Optional[Dict[str, TaskDefinition]]:
+    """Build the executor definition of a task for every execution mode (keyed by mode value)."""
+    if not tests or not isinstance(tests, list):
+        return None
+
+    shapes: Dict[str, TaskDefinition] = {}
+    for mode, visible_tests in ((ExecutionMode.full_test, tests[:3]), (ExecutionMode.complete_task, tests)):
+        test_cases = _map_test_cases(visible_tests)
+        if test_cases:
+            shapes[mode.value] = {
+                "description": f"DB task: {task_id}",
+                "entry_point": entry_point,
+                "test_cases": test_cases,
+            }
+    return shapes or None
+
+
+def shapes_from_row(task_id: str, task_row: Optional[Task]) -> Optional[Dict[str, TaskDefinition]]:
+    """Build the shapes of one DB row, or None when the task is missing or has no usable tests."""
+    if task_row is None:
+        return None
+    return build_task_shapes(task_id, extract_entry_point(task_row.starter_code), task_row.tests)
+
+
+def iter_db_task_shapes(batch_size: int = 500) -> Iterator[Tuple[str, Dict[str, TaskDefinition]]]:
+    """Yield `(task_id, shapes)` for every DB task that has usable tests, in id order."""
+    with get_db_session() as session:
+        rows = session.scalars(select(Task).order_by(Task.mission_id).execution_options(yield_per=batch_size))
+        for task_row in rows:
+            shapes = shapes_from_row(task_row.mission_id, task_row)
+            if shapes is not None:
+                yield task_row.mission_id, shapes
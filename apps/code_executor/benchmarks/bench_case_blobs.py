@@ -0,0 +1,108 @@
+"""Compare sending a large-fixture task's test cases inline with sending a blob digest.
+
+Run from apps/code_executor:
+
+    python -m benchmarks.bench_case_blobs [--cases 20] [--items 20000] [--rounds 200]
+
+`inline` is the previous path: every run hashes the test cases into the result cache key and
+JSON-encodes them into the request frame, and the harness decodes them from stdin. `blob`
+looks the memoized digest up, sends only the digest, and the harness loads the blob file that
+was written once for the task.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from app.services.case_blobs import CaseBlobStore
+from app.services.harness import CONTAINER_PYTHON, HARNESS_VERSION
+from app.services.ipc import REQUEST, encode_frame
+from app.services.result_cache import make_cache_key
+
+SOURCE = "def total(numbers, weights):\n    return sum(n * w for n, w in zip(numbers, weights))\n"
+
+
+def _test_cases(cases: int, items: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "data": {"numbers": list(range(index, index + items)), "weights": [0.5] * items},
+            "expected": sum(range(index, index + items)) * 0.5,
+        }
+        for index in range(cases)
+    ]
+
+
+def _inline_host(test_cases: List[Dict[str, Any]], _: CaseBlobStore) -> bytes:
+    material = json.dumps(
+        {
+            "source": SOURCE,
+            "task_id": "t",
+            "mode": "fullTest",
+            "entry_point": "total",
+            "test_cases": test_cases,
+            "fail_fast": False,
+            "harness": HARNESS_VERSION,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    hashlib.sha256(material.encode("utf-8")).hexdigest()
+    return encode_frame(REQUEST, {"source": SOURCE, "entry_point": "total", "test_cases": test_cases})
+
+
+def _blob_host(test_cases: List[Dict[str, Any]], store: CaseBlobStore) -> bytes:
+    make_cache_key(SOURCE, "t", "fullTest", "total", store.digest(test_cases))
+    digest = store.blob_for(test_cases)
+    return encode_frame(
+        REQUEST,
+        {"source": SOURCE, "entry_point": "total", "test_cases_blob": digest, "test_blob_dir": str(store.directory)},
+    )
+
+
+def _measure(name: str, func: Callable[[], Any], rounds: int) -> float:
+    func()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    per_call_us = (time.perf_counter() - started) / rounds * 1e6
+    print(f"{name:>14}: {per_call_us:10.1f} us/run")
+    return per_call_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=20)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    harness = {"__name__": "snake_harness"}
+    exec(compile(CONTAINER_PYTHON, "<harness>", "exec"), harness)
+    test_cases = _test_cases(args.cases, args.items)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaseBlobStore(Path(tmp), min_bytes=0)
+        inline_frame = _inline_host(test_cases, store)
+        blob_frame = _blob_host(test_cases, store)
+
+        def harness_side(frame: bytes) -> Callable[[], Any]:
+            return lambda: harness["load_test_cases"](harness["read_request"](io.BytesIO(frame)))
+
+        assert harness_side(inline_frame)() == harness_side(blob_frame)() == test_cases, "paths disagree"
+        print(f"{args.cases} cases x {args.items} items, {args.rounds} rounds")
+        print(f"   frame bytes: inline {len(inline_frame)}, blob {len(blob_frame)}")
+        inline = _measure("inline host", lambda: _inline_host(test_cases, store), args.rounds)
+        blob = _measure("blob host", lambda: _blob_host(test_cases, store), args.rounds)
+        print(f"  host speedup: {inline / blob:10.2f}x")
+        _measure("inline harness", harness_side(inline_frame), args.rounds)
+        _measure("blob harness", harness_side(blob_frame), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the /execute response serialization paths.
+
+Run from apps/code_executor:
+
+    python -m benchmarks.bench_serialization [--cases 3] [--output-bytes 8192] [--rounds 2000]
+
+`legacy` rebuilds every case as a model, dumps it back to a dict and lets FastAPI encode the
+body (jsonable_encoder + JSONResponse). `fast` validates once through CASE_RESULTS_ADAPTER and
+writes bytes with pydantic-core, which is what the API routes do now.
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.routes import _json_response, _shape_response
+from app.schemas import CodeExecutionResponse, ExecutionMode
+
+
+def _results(cases: int, output_bytes: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "expected": [index, index * 2, index * 3],
+            "actual": [index, index * 2, index * 3],
+            "passed": True,
+            "stdout": "o" * output_bytes,
+            "stderr": "e" * (output_bytes // 4),
+            "error": None,
+            "duration_ms": 0.42,
+        }
+        for index in range(cases)
+    ]
+
+
+def _legacy(execution: Dict[str, Any]) -> bytes:
+    mapped_results = [CodeExecutionResponse(**result) for result in execution["results"]]
+    body = {
+        "mode": ExecutionMode.full_test.value,
+        "results": [r.model_dump() for r in mapped_results],
+        "cached": execution["cached"],
+    }
+    return JSONResponse(content=jsonable_encoder(body)).body
+
+
+def _fast(execution: Dict[str, Any]) -> bytes:
+    return _json_response(_shape_response(ExecutionMode.full_test, execution)).body
+
+
+def _measure(name: str, func: Callable[[Dict[str, Any]], bytes], execution: Dict[str, Any], rounds: int) -> float:
+    func(execution)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func(execution)
+    per_call_us = (time.perf_counter() - started) / rounds * 1e6
+    print(f"{name:>8}: {per_call_us:9.1f} us/response")
+    return per_call_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=3)
+    parser.add_argument("--output-bytes", type=int, default=8192)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    execution = {"results": _results(args.cases, args.output_bytes), "cached": False, "timing": None}
+    assert json.loads(_legacy(execution)) == json.loads(_fast(execution)), "paths disagree"
+    print(f"{args.cases} cases, {args.output_bytes} B stdout per case, {args.rounds} rounds")
+    legacy = _measure("legacy", _legacy, execution, args.rounds)
+    fast = _measure("fast", _fast, execution, args.rounds)
+    print(f" speedup: {legacy / fast:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
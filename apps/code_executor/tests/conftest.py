@@ -34,9 +34,13 @@ def _b64url(data: bytes) -> str:
     return base64.urlsafe_b64encode(data).rstrip(b"=").decode("utf-8")
 
 
-def _build_jwt(secret: str, sub: str, ttl_seconds: int) -> str:
+def _build_jwt(
+    secret: str, sub: str, ttl_seconds: int, claims: Optional[Dict[str, Any]] = None, kid: Optional[str] = None
+) -> str:
     header = {"alg": "HS256", "typ": "JWT"}
-    payload = {"sub": sub, "iss": "snakecoder", "exp": int(time.time()) + ttl_seconds}
+    if kid is not None:
+        header["kid"] = kid
+    payload = {"sub": sub, "iss": "snakecoder", "exp": int(time.time()) + ttl_seconds, **(claims or {})}
     header_b64 = _b64url(json.dumps(header, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
     payload_b64 = _b64url(json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
     signing_input = f"{header_b64}.{payload_b64}".encode("utf-8")
@@ -105,6 +109,19 @@ def auth_headers() -> Dict[str, str]:
     return {"Authorization": f"Bearer {token}"}
 
 
+@pytest.fixture(scope="session")
+def admin_headers() -> Dict[str, str]:
+    _load_env_file()
+    token = os.environ.get("ADMIN_AUTH_TOKEN")
+    if not token:
+        secret = os.environ.get("EXECUTOR_JWT_SECRET") or os.environ.get("NEXTAUTH_SECRET")
+        if not secret:
+            pytest.skip("Missing ADMIN_AUTH_TOKEN or EXECUTOR_JWT_SECRET/NEXTAUTH_SECRET for admin endpoints.")
+        scope = os.environ.get("EXECUTOR_ADMIN_SCOPE", "executor:admin")
+        token = _build_jwt(secret, "test-admin", 900, {"scope": scope})
+    return {"Authorization": f"Bearer {token}"}
+
+
 @pytest.fixture(scope="session", autouse=True)
 def ensure_server(base_url: str) -> None:
     try:
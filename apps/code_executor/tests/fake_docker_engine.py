@@ -0,0 +1,205 @@
+"""Fake Docker Engine API on a unix socket, for running the `docker_api` backend without a daemon.
+
+Containers are plain local processes: `python` in the container command is replaced by the
+current interpreter and none of the lock-down is applied. Run standalone with
+
+    python -m tests.fake_docker_engine /tmp/fake-docker.sock
+
+and point the service at it with EXECUTOR_SANDBOX_BACKEND=docker_api EXECUTOR_DOCKER_SOCKET=...
+"""
+
+import asyncio
+import json
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+class _Container:
+    def __init__(self, name: str, config: Dict[str, Any]) -> None:
+        self.name = name
+        self.config = config
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.attached: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self.exited = asyncio.Event()
+        self.pumps: List[asyncio.Task] = []
+
+
+class FakeDockerEngine:
+    """Implements list, create, attach, start, wait and remove plus image inspect/pull."""
+
+    def __init__(self, socket_path: str, labels: Optional[Dict[str, str]] = None) -> None:
+        self.socket_path = socket_path
+        self.labels = labels or {}
+        self.containers: Dict[str, _Container] = {}
+        self.created: Dict[str, Dict[str, Any]] = {}
+        self.requests: List[Tuple[str, str]] = []
+        self.removed: List[str] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path)
+
+    def add_container(self, name: str, config: Optional[Dict[str, Any]] = None) -> None:
+        """Register a created but never started container, e.g. one leaked by an earlier process."""
+        self.containers[name] = _Container(name, config or {})
+
+    async def stop(self) -> None:
+        for container in self.containers.values():
+            if container.process is not None and container.process.returncode is None:
+                container.process.kill()
+                await container.process.wait()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    return
+                method, path, query, body = request
+                self.requests.append((method, path))
+                if await self._handle(method, path, query, body, reader, writer):
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+    async def _handle(self, method, path, query, body, reader, writer) -> bool:
+        """Answer one request; returns True when the connection was hijacked."""
+        match = re.fullmatch(r"/containers/([^/]+)(?:/(\w+))?", path)
+        if match is not None and match.group(1) in self.containers:
+            container = self.containers[match.group(1)]
+            if await self._handle_container(method, path, container, match.group(2), reader, writer):
+                return True
+        else:
+            self._handle_engine(method, path, query, body, writer)
+        await writer.drain()
+        return False
+
+    def _handle_engine(self, method, path, query, body, writer) -> None:
+        """Answer requests that do not address an existing container."""
+        if method == "GET" and path.startswith("/images/") and path.endswith("/json"):
+            self._respond(writer, 200, {"Id": "sha256:fake", "Config": {"Labels": self.labels}})
+        elif method == "POST" and path == "/images/create":
+            self._respond(writer, 200, {"status": "pulled"})
+        elif method == "GET" and path == "/containers/json":
+            self._respond(writer, 200, [{"Id": name, "Names": [f"/{name}"]} for name in self.containers])
+        elif method == "POST" and path == "/containers/create":
+            name = query["name"][0]
+            self.containers[name] = _Container(name, json.loads(body))
+            self.created[name] = self.containers[name].config
+            self._respond(writer, 201, {"Id": name, "Warnings": []})
+        else:
+            self._respond(writer, 404, {"message": f"No such container: {path}"})
+
+    async def _handle_container(self, method, path, container, action, reader, writer) -> bool:
+        """Answer a request for `container`; returns True when the connection was hijacked."""
+        if action == "attach":
+            container.attached = (reader, writer)
+            writer.write(b"HTTP/1.1 101 UPGRADED\r\nConnection: Upgrade\r\nUpgrade: tcp\r\n\r\n")
+            await writer.drain()
+            return True
+        if action == "start":
+            await self._start(container)
+            self._respond(writer, 204)
+        elif action == "wait":
+            await container.exited.wait()
+            self._respond(writer, 200, {"StatusCode": container.process.returncode, "Error": None})
+        elif method == "DELETE" and action is None:
+            del self.containers[container.name]
+            if container.process is not None and container.process.returncode is None:
+                container.process.kill()
+                await container.process.wait()
+            self.removed.append(container.name)
+            self._respond(writer, 204)
+        else:
+            self._respond(writer, 404, {"message": f"Unsupported {method} {path}"})
+        return False
+
+    async def _start(self, container: _Container) -> None:
+        command = list(container.config["Cmd"])
+        if command and command[0] == "python":
+            command[0] = sys.executable
+        container.process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        container.pumps = [asyncio.create_task(self._pump(container))]
+
+    async def _pump(self, container: _Container) -> None:
+        process = container.process
+        reader, writer = container.attached
+        stdin_task = asyncio.create_task(_feed_stdin(reader, process))
+        try:
+            await asyncio.gather(_forward(process.stdout, 1, writer), _forward(process.stderr, 2, writer))
+            await process.wait()
+        except ConnectionError:
+            process.kill()
+            await process.wait()
+        finally:
+            stdin_task.cancel()
+            writer.close()
+            container.exited.set()
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, payload: Any = None) -> None:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        writer.write(head.encode("ascii") + body)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, List[str]], bytes]]:
+    """Read one HTTP request; returns (method, unversioned path, query, body), or None at EOF."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", "0")))
+    url = urlsplit(target)
+    return method, re.sub(r"^/v[0-9.]+", "", url.path), parse_qs(url.query), body
+
+
+async def _feed_stdin(reader: asyncio.StreamReader, process: asyncio.subprocess.Process) -> None:
+    try:
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            process.stdin.write(chunk)
+            await process.stdin.drain()
+    except (ConnectionError, BrokenPipeError):
+        pass
+    finally:
+        process.stdin.close()
+
+
+async def _forward(stream: asyncio.StreamReader, kind: int, writer: asyncio.StreamWriter) -> None:
+    """Copy a process stream to the attach connection in Docker's multiplexed framing."""
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            return
+        writer.write(bytes([kind, 0, 0, 0]) + len(chunk).to_bytes(4, "big") + chunk)
+        await writer.drain()
+
+
+async def _serve_forever(socket_path: str) -> None:
+    engine = FakeDockerEngine(socket_path)
+    await engine.start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(_serve_forever(sys.argv[1]))
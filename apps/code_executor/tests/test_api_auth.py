@@ -0,0 +1,46 @@
+import os
+from typing import Dict, Optional
+
+import pytest
+
+from .conftest import _build_jwt, request_json
+
+
+RUN_CODE = {"source": "print('auth')", "mode": "runCode"}
+
+
+def _token(secret: str, kid: Optional[str] = None) -> str:
+    return _build_jwt(secret, "test-user", 300, kid=kid)
+
+
+def _bearer(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_cached_token_does_not_admit_tampered_signature(base_url: str, auth_headers: Dict[str, str]) -> None:
+    status, _ = request_json("POST", f"{base_url}/api/execute", RUN_CODE, auth_headers)
+    assert status == 200
+    status, _ = request_json("POST", f"{base_url}/api/execute", RUN_CODE, auth_headers)
+    assert status == 200
+
+    token = auth_headers["Authorization"].split(" ", 1)[1]
+    tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+    status, _ = request_json("POST", f"{base_url}/api/execute", RUN_CODE, _bearer(tampered))
+    assert status == 401
+
+
+def test_unknown_kid_is_rejected(base_url: str) -> None:
+    token = _token("not-the-secret", kid="no-such-key")
+    status, _ = request_json("POST", f"{base_url}/api/execute", RUN_CODE, _bearer(token))
+    assert status == 401
+
+
+def test_rotated_secret_selected_by_kid(base_url: str) -> None:
+    pairs = [item.split(":", 1) for item in os.environ.get("EXECUTOR_JWT_SECRETS", "").split(",") if ":" in item]
+    if not pairs:
+        pytest.skip("EXECUTOR_JWT_SECRETS is not configured")
+    kid, secret = pairs[-1]
+    status, _ = request_json("POST", f"{base_url}/api/execute", RUN_CODE, _bearer(_token(secret.strip(), kid.strip())))
+    assert status == 200
+    status, _ = request_json("POST", f"{base_url}/api/execute", RUN_CODE, _bearer(_token("wrong", kid.strip())))
+    assert status == 401
@@ -0,0 +1,48 @@
+from typing import Dict
+
+from .conftest import request_json
+
+
+def test_batch_returns_one_result_per_item_in_order(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "items": [
+            {"source": "def transform(numbers):\n    return [n*2 for n in numbers]", "task_id": "test_task-1"},
+            {"source": "def transform(numbers):\n    return numbers", "task_id": "test_task-1"},
+            {"source": "def join_words(words):\n    return ' '.join(words)", "task_id": "test_task-4"},
+            {"source": "print('batch')", "mode": "runCode"},
+        ]
+    }
+    status, response = request_json("POST", f"{base_url}/api/execute/batch", payload, auth_headers, timeout=60)
+    assert status == 200
+    items = response["items"]
+    assert [item["index"] for item in items] == [0, 1, 2, 3]
+    assert items[0]["isTaskPassed"] is True
+    assert items[1]["isTaskPassed"] is False
+    assert items[2]["isTaskPassed"] is True
+    assert "batch" in items[3]["results"][0]["stdout"]
+
+
+def test_batch_isolates_failing_submission(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "items": [
+            {"source": "import os\ndef transform(numbers):\n    os._exit(1)", "task_id": "test_task-1"},
+            {"source": "def transform(numbers):\n    return [n*2 for n in numbers]", "task_id": "test_task-1"},
+        ]
+    }
+    status, response = request_json("POST", f"{base_url}/api/execute/batch", payload, auth_headers, timeout=60)
+    assert status == 200
+    assert response["items"][0]["isTaskPassed"] is False
+    assert response["items"][1]["isTaskPassed"] is True
+
+
+def test_batch_reports_unknown_task_per_item(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "items": [
+            {"source": "print(1)", "task_id": "test_task-404", "mode": "fullTest"},
+            {"source": "def transform(numbers):\n    return [n*2 for n in numbers]", "task_id": "test_task-1"},
+        ]
+    }
+    status, response = request_json("POST", f"{base_url}/api/execute/batch", payload, auth_headers, timeout=60)
+    assert status == 200
+    assert response["items"][0]["status"] == 404
+    assert response["items"][1]["isTaskPassed"] is True
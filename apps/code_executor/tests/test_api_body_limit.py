@@ -0,0 +1,49 @@
+import http.client
+import json
+from typing import Dict
+from urllib.parse import urlsplit
+
+from .conftest import request_json
+
+
+def _padded_source(size: int) -> str:
+    return "print('ok')\n#" + "x" * size
+
+
+def test_oversized_body_returns_413(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": _padded_source(200 * 1024), "mode": "runCode"}
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 413
+    assert response["detail"] == "Request body too large"
+
+
+def test_oversized_chunked_body_returns_413(base_url: str, auth_headers: Dict[str, str]) -> None:
+    body = json.dumps({"source": _padded_source(200 * 1024), "mode": "runCode"}).encode("utf-8")
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=15)
+    try:
+        conn.putrequest("POST", "/api/execute")
+        conn.putheader("Content-Type", "application/json")
+        conn.putheader("Transfer-Encoding", "chunked")
+        for name, value in auth_headers.items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        try:
+            for offset in range(0, len(body), 16 * 1024):
+                chunk = body[offset:offset + 16 * 1024]
+                conn.send(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            conn.send(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The server may stop reading as soon as the limit is crossed.
+            pass
+        response = conn.getresponse()
+        assert response.status == 413
+    finally:
+        conn.close()
+
+
+def test_batch_route_accepts_larger_body(base_url: str, auth_headers: Dict[str, str]) -> None:
+    items = [{"source": _padded_source(60 * 1024), "mode": "runCode"} for _ in range(3)]
+    status, response = request_json("POST", f"{base_url}/api/execute/batch", {"items": items}, auth_headers)
+    assert status == 200
+    assert [item["status"] for item in response["items"]] == [200, 200, 200]
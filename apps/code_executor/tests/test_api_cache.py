@@ -0,0 +1,43 @@
+import uuid
+from typing import Dict
+
+from .conftest import request_json
+
+
+def test_identical_submission_is_served_from_cache(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "source": f"# {uuid.uuid4().hex}\ndef transform(numbers):\n    return [n*2 for n in numbers]",
+        "task_id": "test_task-1",
+        "mode": "fullTest",
+    }
+    status, first = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert first.get("cached") is False
+
+    status, second = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert second.get("cached") is True
+    # Cached results carry no per-case timing: it belonged to the run that filled the cache.
+    assert all(case.get("duration_ms") is None for case in second["results"])
+    assert second["results"] == [{**case, "duration_ms": None} for case in first["results"]]
+
+
+def test_cache_key_includes_mode(base_url: str, auth_headers: Dict[str, str]) -> None:
+    source = f"# {uuid.uuid4().hex}\ndef transform(numbers):\n    return [n*2 for n in numbers]"
+    payload = {"source": source, "task_id": "test_task-1", "mode": "fullTest"}
+    status, _ = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+
+    payload["mode"] = "completeTask"
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert response.get("cached") is False
+    assert response.get("isTaskPassed") is True
+
+
+def test_run_code_is_never_cached(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": f"# {uuid.uuid4().hex}\nprint('hi')", "mode": "runCode"}
+    request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert response.get("cached") is False
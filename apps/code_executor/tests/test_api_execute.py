@@ -79,3 +79,59 @@ def test_run_code_without_result_yields_message(base_url: str, auth_headers: Dic
     assert response["results"][0]["actual"] == "Code executed successfully"
     assert "ok" in response["results"][0]["stdout"]
     assert response["results"][0]["passed"] is True
+
+
+def test_fail_fast_reports_first_failing_case(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "source": "def transform(numbers):\n    return [n*2 for n in numbers] if len(numbers) != 1 else []",
+        "task_id": "test_task-1",
+        "mode": "completeTask",
+        "fail_fast": True,
+    }
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert response.get("isTaskPassed") is False
+    assert response.get("failedIndex") == 1
+    assert response.get("passedCount") == 1
+
+
+def test_fail_fast_passing_submission(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "source": "def transform(numbers):\n    return [n*2 for n in numbers]",
+        "task_id": "test_task-1",
+        "mode": "completeTask",
+        "fail_fast": True,
+    }
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert response.get("isTaskPassed") is True
+    assert response.get("failedIndex") is None
+    assert response.get("passedCount") == 8
+
+
+def test_include_timing_reports_phases(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": "print('timed')", "mode": "runCode", "include_timing": True}
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    timing = response.get("timing")
+    assert isinstance(timing, dict)
+    for phase in ("queue_wait_ms", "sandbox_ms", "startup_ms", "compile_ms", "cases_ms", "parse_ms", "total_ms"):
+        assert timing[phase] >= 0
+    assert timing["total_ms"] >= timing["sandbox_ms"]
+
+
+def test_timing_is_opt_in(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": "print('untimed')", "mode": "runCode"}
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert "timing" not in response
+
+
+def test_raw_writes_to_stdout_fd_do_not_break_results(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "source": "import os\nos.write(1, b'\\x00not a frame\\n')\nprint('still fine')",
+        "mode": "runCode",
+    }
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert "still fine" in response["results"][0]["stdout"]
@@ -0,0 +1,32 @@
+from typing import Dict
+
+from .conftest import request_json
+
+
+def test_job_returns_id_then_result(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "source": "def transform(numbers):\n    return [n*2 for n in numbers]",
+        "task_id": "test_task-1",
+        "mode": "completeTask",
+    }
+    status, submitted = request_json("POST", f"{base_url}/api/jobs", payload, auth_headers)
+    assert status == 202
+    assert submitted.get("status") in ("queued", "running", "done")
+    job_id = submitted["job_id"]
+
+    status, job = request_json("GET", f"{base_url}/api/jobs/{job_id}?wait=15", headers=auth_headers, timeout=20)
+    assert status == 200
+    assert job["status"] == "done"
+    assert job["result"]["mode"] == "completeTask"
+    assert job["result"]["isTaskPassed"] is True
+
+
+def test_job_for_unknown_task_is_rejected_up_front(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": "print(1)", "task_id": "test_task-404", "mode": "fullTest"}
+    status, _ = request_json("POST", f"{base_url}/api/jobs", payload, auth_headers)
+    assert status == 404
+
+
+def test_unknown_job_returns_404(base_url: str, auth_headers: Dict[str, str]) -> None:
+    status, _ = request_json("GET", f"{base_url}/api/jobs/does-not-exist", headers=auth_headers)
+    assert status == 404
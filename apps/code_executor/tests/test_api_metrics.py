@@ -0,0 +1,50 @@
+from typing import Dict
+from urllib.request import urlopen
+
+from .conftest import request_json
+
+
+def _scrape(base_url: str) -> str:
+    with urlopen(f"{base_url}/metrics", timeout=10) as resp:
+        assert resp.status == 200
+        assert resp.headers.get("Content-Type", "").startswith("text/plain")
+        return resp.read().decode("utf-8")
+
+
+def _sample(text: str, prefix: str) -> float:
+    return sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(prefix))
+
+
+def test_metrics_exposes_executor_series(base_url: str) -> None:
+    text = _scrape(base_url)
+    for name in (
+        "executor_execution_seconds",
+        "executor_sandbox_wait_seconds",
+        "executor_sandbox_run_seconds",
+        "executor_cases_per_run",
+        "executor_runs_total",
+        "executor_runs_in_flight",
+        "executor_concurrency_free_slots",
+        "executor_concurrency_limit",
+    ):
+        assert f"# TYPE {name} " in text
+
+
+def test_metrics_count_runs_by_status_and_mode(base_url: str, auth_headers: Dict[str, str]) -> None:
+    series = 'executor_runs_total{status="ok",mode="runCode"}'
+    before = _sample(_scrape(base_url), series)
+    payload = {"source": "print('metrics')", "mode": "runCode"}
+    status, _ = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    text = _scrape(base_url)
+    assert _sample(text, series) == before + 1
+    assert _sample(text, 'executor_execution_seconds_count{mode="runCode",cached="false"}') >= 1
+
+
+def test_concurrency_endpoint_reports_limit(base_url: str, auth_headers: Dict[str, str]) -> None:
+    status, response = request_json("GET", f"{base_url}/api/concurrency", None, auth_headers)
+    assert status == 200
+    assert response["min_limit"] <= response["limit"] <= response["max_limit"]
+    assert response["in_flight"] >= 0
+    assert isinstance(response["history"], list)
+    assert f"executor_concurrency_limit {response['limit']}" in _scrape(base_url)
@@ -0,0 +1,61 @@
+import json
+import os
+import uuid
+from typing import Dict
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from .conftest import _build_jwt, request_json
+
+
+def _fresh_user_headers() -> Dict[str, str]:
+    secret = os.environ.get("EXECUTOR_JWT_SECRET") or os.environ.get("NEXTAUTH_SECRET")
+    if not secret:
+        pytest.skip("Rate limit test needs EXECUTOR_JWT_SECRET to mint a token for a new user")
+    return {"Authorization": f"Bearer {_build_jwt(secret, f'rate-{uuid.uuid4().hex}', 300)}"}
+
+
+def test_rate_limit_rejects_with_retry_after(base_url: str, auth_headers: Dict[str, str]) -> None:
+    rate = float(os.environ.get("EXECUTOR_USER_RATE_PER_MINUTE", "0"))
+    if rate <= 0:
+        pytest.skip("EXECUTOR_USER_RATE_PER_MINUTE is not enabled")
+    burst = int(float(os.environ.get("EXECUTOR_USER_BURST", "10")))
+    headers = _fresh_user_headers()
+    payload = {"source": "print('rate')", "mode": "runCode"}
+
+    for _ in range(burst):
+        status, _ = request_json("POST", f"{base_url}/api/execute", payload, headers)
+        assert status == 200
+
+    req = Request(
+        f"{base_url}/api/execute",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", **headers},
+        method="POST",
+    )
+    with pytest.raises(HTTPError) as excinfo:
+        urlopen(req, timeout=15)
+    assert excinfo.value.code == 429
+    assert int(excinfo.value.headers["Retry-After"]) >= 1
+
+    other_status, _ = request_json("POST", f"{base_url}/api/execute", payload, _fresh_user_headers())
+    assert other_status == 200
+
+
+def test_batch_is_charged_per_item_and_rejected_above_burst(base_url: str) -> None:
+    rate = float(os.environ.get("EXECUTOR_USER_RATE_PER_MINUTE", "0"))
+    if rate <= 0:
+        pytest.skip("EXECUTOR_USER_RATE_PER_MINUTE is not enabled")
+    burst = int(float(os.environ.get("EXECUTOR_USER_BURST", "10")))
+    headers = _fresh_user_headers()
+    item = {"source": "print('rate')", "mode": "runCode"}
+
+    status, _ = request_json("POST", f"{base_url}/api/execute/batch", {"items": [item] * (burst + 1)}, headers)
+    assert status == 413
+
+    status, _ = request_json("POST", f"{base_url}/api/execute/batch", {"items": [item] * burst}, headers)
+    assert status == 200
+    status, _ = request_json("POST", f"{base_url}/api/execute", item, headers)
+    assert status == 429
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, List
+from urllib.request import Request, urlopen
+
+
+def _stream(base_url: str, payload: Dict[str, Any], headers: Dict[str, str], accept: str) -> List[str]:
+    request_headers = {"Accept": accept, "Content-Type": "application/json", **headers}
+    req = Request(
+        f"{base_url}/api/execute/stream",
+        data=json.dumps(payload).encode("utf-8"),
+        headers=request_headers,
+        method="POST",
+    )
+    with urlopen(req, timeout=30) as resp:
+        assert resp.status == 200
+        assert accept in resp.headers.get("Content-Type", "")
+        return [line.decode("utf-8") for line in resp]
+
+
+def test_stream_ndjson_emits_each_case_then_done(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {
+        "source": "def transform(numbers):\n    return [n*2 for n in numbers]",
+        "task_id": "test_task-1",
+        "mode": "fullTest",
+    }
+    events = [json.loads(line) for line in _stream(base_url, payload, auth_headers, "application/x-ndjson")]
+    cases, done = events[:-1], events[-1]
+    assert cases and all(event["event"] == "case" for event in cases)
+    assert [event["index"] for event in cases] == list(range(len(cases)))
+    assert all(event["result"]["passed"] for event in cases)
+    assert done["event"] == "done"
+    assert len(done["results"]) == len(cases)
+
+
+def test_stream_sse_format(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": "print('streamed')", "mode": "runCode"}
+    lines = _stream(base_url, payload, auth_headers, "text/event-stream")
+    assert lines[0] == "event: case\n"
+    data = [json.loads(line[len("data: "):]) for line in lines if line.startswith("data: ")]
+    assert "streamed" in data[0]["result"]["stdout"]
+    assert data[-1]["event"] == "done"
+
+
+def test_stream_keeps_finished_cases_when_run_times_out(base_url: str, auth_headers: Dict[str, str]) -> None:
+    source = (
+        "import sys\n"
+        "def transform(numbers):\n"
+        "    sys.snake_calls = getattr(sys, 'snake_calls', 0) + 1\n"
+        "    while sys.snake_calls > 1:\n"
+        "        pass\n"
+        "    return [n*2 for n in numbers]"
+    )
+    payload = {"source": source, "task_id": "test_task-1", "mode": "fullTest"}
+    events = [json.loads(line) for line in _stream(base_url, payload, auth_headers, "application/x-ndjson")]
+    assert events[0]["result"]["passed"] is True
+    assert events[-1]["event"] == "done"
+    results = events[-1]["results"]
+    assert results[0]["passed"] is True
+    assert "Execution error" in results[-1]["actual"]
@@ -0,0 +1,36 @@
+from typing import Dict
+
+from .conftest import request_json
+
+
+def test_task_cache_stats_require_auth(base_url: str) -> None:
+    status, _ = request_json("GET", f"{base_url}/api/tasks/cache")
+    assert status == 401
+
+
+def test_task_cache_endpoints_require_admin_scope(base_url: str, auth_headers: Dict[str, str]) -> None:
+    status, _ = request_json("GET", f"{base_url}/api/tasks/cache", headers=auth_headers)
+    assert status == 403
+    status, _ = request_json("POST", f"{base_url}/api/tasks/cache/invalidate", {}, auth_headers)
+    assert status == 403
+
+
+def test_task_cache_stats_expose_counters(base_url: str, admin_headers: Dict[str, str]) -> None:
+    status, stats = request_json("GET", f"{base_url}/api/tasks/cache", headers=admin_headers)
+    assert status == 200
+    for key in ("size", "hits", "negative_hits", "misses", "invalidations"):
+        assert isinstance(stats.get(key), int)
+
+
+def test_invalidate_all_clears_cache(base_url: str, admin_headers: Dict[str, str]) -> None:
+    status, response = request_json("POST", f"{base_url}/api/tasks/cache/invalidate", {}, admin_headers)
+    assert status == 200
+    assert isinstance(response.get("evicted"), int)
+    assert response["stats"]["size"] == 0
+
+
+def test_invalidate_single_task(base_url: str, admin_headers: Dict[str, str]) -> None:
+    payload = {"task_id": "missing-task-id"}
+    status, response = request_json("POST", f"{base_url}/api/tasks/cache/invalidate", payload, admin_headers)
+    assert status == 200
+    assert response.get("evicted") == 0
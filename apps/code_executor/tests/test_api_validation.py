@@ -1,5 +1,8 @@
+import os
 from typing import Any, Dict
 
+import pytest
+
 from .conftest import request_json
 
 
@@ -66,3 +69,23 @@ def test_error_field_contains_exception(base_url: str, auth_headers: Dict[str, s
     assert status == 200
     assert response["results"][0]["passed"] is False
     assert "RuntimeError: boom" in (response["results"][0].get("error") or "")
+
+
+def test_large_stdout_keeps_head_and_tail(base_url: str, auth_headers: Dict[str, str]) -> None:
+    payload = {"source": "for i in range(3000):\n    print(i)", "mode": "runCode"}
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    result = response["results"][0]
+    assert result["stdout"].startswith("0\n1\n2\n")
+    assert result["stdout"].endswith("2998\n2999")
+    assert "truncated" in result["stdout"]
+    assert result["output_dropped_bytes"] > 0
+
+
+def test_output_hard_limit_stops_case(base_url: str, auth_headers: Dict[str, str]) -> None:
+    if not os.environ.get("EXECUTOR_OUTPUT_HARD_LIMIT_BYTES"):
+        pytest.skip("EXECUTOR_OUTPUT_HARD_LIMIT_BYTES is not configured")
+    payload = {"source": "while True:\n    print('spam' * 100)", "mode": "runCode"}
+    status, response = request_json("POST", f"{base_url}/api/execute", payload, auth_headers)
+    assert status == 200
+    assert response["results"][0]["error"].startswith("OutputLimitExceeded")
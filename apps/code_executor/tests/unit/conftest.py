@@ -0,0 +1,124 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from app.api import routes
+from app.main import app
+from app.services import container_runner
+from app.services.harness import CONTAINER_PYTHON
+from app.services.ipc import CASE, SUMMARY, FrameCallback, FrameDecoder
+from app.services.rate_limit import TokenBucketLimiter
+from app.services.sandbox import SandboxBackend, SandboxRun
+
+from ..conftest import _build_jwt
+
+
+@pytest.fixture(scope="session", autouse=True)
+def ensure_server() -> None:
+    # Overrides the live-server check in tests/conftest.py: these tests run in-process.
+    return None
+
+
+class FakeBackend(SandboxBackend):
+    """Sandbox backend that runs the harness's case loop in process instead of in a sandbox.
+
+    Runs wait for `gate` (set by default), so a test can hold them to observe queued work;
+    `returncode` makes every run fail like a crashed sandbox.
+    """
+
+    name = "fake"
+
+    def __init__(self) -> None:
+        self.harness: Dict[str, Any] = {"__name__": "snake_harness"}
+        exec(compile(CONTAINER_PYTHON, "<harness>", "exec"), self.harness)
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.returncode = 0
+        self.runs = 0
+
+    async def run(self, payload: bytes, timeout: float, on_frame: FrameCallback) -> SandboxRun:
+        self.runs += 1
+        ((_, request),) = FrameDecoder().feed(payload)
+        await self.gate.wait()
+        if self.returncode:
+            return SandboxRun(name="fake", returncode=self.returncode, stderr="fake crash")
+        results = self.harness["run_cases"](request["source"], request["entry_point"], request["test_cases"])
+        for result in results:
+            on_frame(CASE, {"result": result})
+        on_frame(SUMMARY, {})
+        return SandboxRun(name="fake", returncode=0, stderr="")
+
+
+class AppClient:
+    """Calls the ASGI app in process with a valid Bearer token (the lifespan does not run)."""
+
+    def __init__(self, token: str) -> None:
+        self.token = token
+
+    async def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, bytes]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        path, _, query = path.partition("?")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode("utf-8"),
+            "query_string": query.encode("utf-8"),
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"authorization", f"Bearer {self.token}".encode("ascii")),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        finished = asyncio.Event()
+        status = 0
+        chunks: List[bytes] = []
+
+        async def receive() -> Dict[str, Any]:
+            if messages:
+                return messages.pop(0)
+            await finished.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        try:
+            await app(scope, receive, send)
+        finally:
+            finished.set()
+        return status, b"".join(chunks)
+
+    async def request_json(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        status, body = await self.request(method, path, payload)
+        return status, json.loads(body)
+
+
+@pytest.fixture
+def fake_backend(monkeypatch: pytest.MonkeyPatch) -> FakeBackend:
+    """Routes sandbox runs to a FakeBackend and keeps run logs out of the log file."""
+    backend = FakeBackend()
+    monkeypatch.setattr(container_runner, "_BACKEND", backend)
+    monkeypatch.setattr(container_runner.LOG_SINK, "write", lambda entry: None)
+    return backend
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch, fake_backend: FakeBackend) -> AppClient:
+    monkeypatch.setenv("EXECUTOR_JWT_SECRET", "unit-test-secret")
+    monkeypatch.setattr(routes, "RATE_LIMITER", TokenBucketLimiter(0, 0))
+    return AppClient(_build_jwt("unit-test-secret", "unit-user", 300))
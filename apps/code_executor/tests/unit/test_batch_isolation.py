@@ -0,0 +1,73 @@
+import asyncio
+import os
+from typing import Any, Dict, List
+
+import pytest
+
+from app.services import container_runner, forkserver_backend
+
+
+TEST_CASES = [{"data": {}, "expected": True}]
+HONEST = 'SECRET = "TOP-SECRET"\ndef solve():\n    return True\n'
+# Looks for the other submission's source in every frame above it and in every live dict or list.
+SNOOPS = (
+    "import gc, sys\n"
+    "def solve():\n"
+    "    needle = '-'.join(['TOP', 'SECRET'])\n"
+    "    seen = []\n"
+    "    frame = sys._getframe().f_back\n"
+    "    while frame is not None:\n"
+    "        seen.append(repr(frame.f_locals))\n"
+    "        frame = frame.f_back\n"
+    "    seen += [repr(obj) for obj in gc.get_objects() if isinstance(obj, (dict, list))]\n"
+    "    return not any(needle in text for text in seen)\n"
+)
+KILLS_PARENT = "import os\ndef solve():\n    os.kill(os.getppid(), 9)\n    return True\n"
+SLEEPS = "import time\ndef solve():\n    time.sleep(30)\n    return True\n"
+
+
+@pytest.fixture
+def run_batch(monkeypatch: pytest.MonkeyPatch):
+    """Runs a batch on a real forkserver with a 1 s per-submission timeout and no log file."""
+    monkeypatch.setattr(container_runner.LOG_SINK, "write", lambda entry: None)
+    # Batch submissions re-exec the interpreter, which the test run's uid can always reach.
+    monkeypatch.setattr(forkserver_backend, "FORKSERVER_UID", os.getuid())
+
+    def run(sources: List[str]) -> List[Dict[str, Any]]:
+        backend = forkserver_backend.ForkserverBackend()
+        monkeypatch.setattr(container_runner, "_BACKEND", backend)
+
+        async def main():
+            await backend.start()
+            try:
+                return await container_runner.run_batch_in_container(sources, TEST_CASES, "solve", timeout=1)
+            finally:
+                await backend.stop()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def test_submission_cannot_see_other_sources(run_batch) -> None:
+    snooper, honest = run_batch([SNOOPS, HONEST])
+    assert snooper["results"][0]["actual"] is True
+    assert honest["results"][0]["passed"] is True
+
+
+def test_killing_the_harness_fails_only_that_submission(run_batch) -> None:
+    killer, honest = run_batch([KILLS_PARENT, HONEST])
+    assert "stopped the sandbox" in killer["error"]
+    assert honest["results"][0]["passed"] is True
+
+
+def test_timeouts_are_per_submission_within_a_fixed_batch_limit(run_batch, monkeypatch: pytest.MonkeyPatch) -> None:
+    slow, honest = run_batch([SLEEPS, HONEST])
+    assert "exceeded timeout" in slow["error"]
+    assert honest["results"][0]["passed"] is True
+
+    monkeypatch.setattr(container_runner, "BATCH_TIMEOUT_SECONDS", 1.5)
+    outcomes = run_batch([SLEEPS, SLEEPS, HONEST])
+    assert "exceeded timeout" in outcomes[0]["error"]
+    assert "exceeded timeout" in outcomes[1]["error"]
+    assert "Batch time limit" in outcomes[2]["error"]
@@ -0,0 +1,46 @@
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from app.services.case_blobs import CaseBlobStore
+from app.services.harness import CONTAINER_PYTHON
+
+
+LARGE_CASES = [{"data": {"numbers": list(range(5000))}, "expected": 12497500}]
+SMALL_CASES = [{"data": {"numbers": [1, 2]}, "expected": 3}]
+
+
+def test_large_test_cases_become_one_read_only_blob() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaseBlobStore(Path(tmp), min_bytes=1024)
+
+        assert store.blob_for(SMALL_CASES) is None
+        digest = store.blob_for(LARGE_CASES)
+        assert digest is not None
+        assert store.blob_for(LARGE_CASES) == store.digest(LARGE_CASES) == digest
+        assert store.stats()["encodes"] == 2
+        assert store.stats()["writes"] == 1
+
+        path = store.path_for(digest)
+        assert json.loads(path.read_bytes()) == LARGE_CASES
+        assert not os.stat(path).st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+
+        # A blob removed behind the store's back is written again from the memoized list.
+        path.unlink()
+        assert store.blob_for(LARGE_CASES) == digest
+        assert path.exists()
+        assert store.stats()["encodes"] == 2
+
+
+def test_harness_reads_test_cases_from_blob() -> None:
+    harness = {"__name__": "snake_harness"}
+    exec(compile(CONTAINER_PYTHON, "<harness>", "exec"), harness)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaseBlobStore(Path(tmp), min_bytes=0)
+        digest = store.blob_for(LARGE_CASES)
+        payload = {"test_cases_blob": digest, "test_blob_dir": tmp}
+
+        assert harness["load_test_cases"](payload) == LARGE_CASES
+        assert harness["load_test_cases"]({"test_cases": SMALL_CASES}) == SMALL_CASES
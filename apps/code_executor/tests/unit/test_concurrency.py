@@ -0,0 +1,115 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from app.services import concurrency
+from app.services.concurrency import ConcurrencyLimiter
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_cancelled_waiter_does_not_leak_its_slot() -> None:
+    async def main():
+        limiter = ConcurrencyLimiter(limit=1)
+        await limiter.acquire("alice")
+        abandoned = asyncio.create_task(limiter.acquire("bob"))
+        await _settle()
+        assert limiter.waiting == 1
+        abandoned.cancel()
+        # Release before the cancelled task had a chance to run its cleanup.
+        limiter.release("alice")
+        await asyncio.gather(abandoned, return_exceptions=True)
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+        assert limiter.stats()["users_waiting"] == 0
+        await asyncio.wait_for(limiter.acquire("carol"), timeout=1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(main())
+
+
+def test_waiting_users_take_turns() -> None:
+    async def main():
+        limiter = ConcurrencyLimiter(limit=1)
+        served: List[str] = []
+        await limiter.acquire("holder")
+
+        async def run(user: str) -> None:
+            async with limiter.slot(user):
+                served.append(user)
+                await asyncio.sleep(0)
+
+        # Alice queues all her runs before Bob queues any of his.
+        tasks = [asyncio.create_task(run("alice")) for _ in range(3)]
+        await _settle()
+        tasks += [asyncio.create_task(run("bob")) for _ in range(3)]
+        await _settle()
+        limiter.release("holder")
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+        return served
+
+    assert asyncio.run(main()) == ["alice", "bob", "alice", "bob", "alice", "bob"]
+
+
+@pytest.fixture
+def host_load(monkeypatch: pytest.MonkeyPatch):
+    """Sets the load per core the adaptive limiter sees (None: not available)."""
+    load: List[Optional[float]] = [None]
+    monkeypatch.setattr(concurrency, "_load_per_core", lambda: load[0])
+    return load
+
+
+def test_adaptive_limit_grows_while_runs_queue_up_to_the_ceiling(host_load) -> None:
+    async def main():
+        limiter = ConcurrencyLimiter(2, adaptive=True, max_limit=3)
+        await limiter.acquire("alice")
+        await limiter.acquire("alice")
+        queued = asyncio.create_task(limiter.acquire("bob"))
+        await _settle()
+        for _ in range(10):
+            limiter.observe(0.01)
+        await _settle()
+        return limiter, queued.done()
+
+    limiter, queued_started = asyncio.run(main())
+    assert limiter.limit == 3
+    assert queued_started and limiter.in_flight == 3
+    assert [(change["from"], change["to"], change["reason"]) for change in limiter.history] == [(2, 3, "increase")]
+
+
+def test_adaptive_limit_does_not_grow_without_queueing(host_load) -> None:
+    limiter = ConcurrencyLimiter(2, adaptive=True, max_limit=8)
+    for _ in range(10):
+        limiter.observe(0.01)
+    assert limiter.limit == 2
+
+
+def test_slow_sandboxes_back_the_limit_off_down_to_the_floor(host_load) -> None:
+    limiter = ConcurrencyLimiter(8, adaptive=True, min_limit=2, cooldown_seconds=0)
+    limiter.observe(0.01)
+    limits = []
+    for _ in range(6):
+        limiter.observe(1.0)
+        limits.append(limiter.limit)
+    assert limits == [6, 4, 3, 2, 2, 2]
+    assert {change["reason"] for change in limiter.history} == {"latency"}
+
+
+def test_host_load_backs_off_once_per_cooldown(host_load) -> None:
+    limiter = ConcurrencyLimiter(8, adaptive=True, cooldown_seconds=60)
+    host_load[0] = 3.0
+    limiter.observe(0.01)
+    limiter.observe(0.01)
+    assert limiter.limit == 6
+    assert [change["reason"] for change in limiter.history] == ["host_load"]
+
+
+def test_fixed_limit_ignores_observations(host_load) -> None:
+    limiter = ConcurrencyLimiter(4)
+    host_load[0] = 3.0
+    limiter.observe(5.0)
+    assert limiter.limit == 4 and not limiter.history
@@ -0,0 +1,84 @@
+import asyncio
+import itertools
+import time
+from typing import List
+
+from app.services.container_pool import ContainerPool
+
+
+def _pool(discarded: List[str], size: int = 2, max_idle_seconds: float = 300) -> ContainerPool:
+    names = (f"warm-{index}" for index in itertools.count())
+
+    async def spawn(name: str) -> asyncio.subprocess.Process:
+        # Stands in for `docker run -i`: a process that blocks until it is used or killed.
+        return await asyncio.create_subprocess_exec("sleep", "60")
+
+    async def discard(name: str) -> None:
+        discarded.append(name)
+
+    return ContainerPool(
+        size=size,
+        refill_per_second=100,
+        max_idle_seconds=max_idle_seconds,
+        spawn=spawn,
+        next_name=lambda: next(names),
+        discard=discard,
+    )
+
+
+async def _until_full(pool: ContainerPool) -> None:
+    deadline = time.monotonic() + 5
+    while pool.idle_count() < pool.size:
+        assert time.monotonic() < deadline, "pool never filled"
+        await asyncio.sleep(0.01)
+
+
+def test_pool_hands_out_each_container_once_and_refills() -> None:
+    discarded: List[str] = []
+
+    async def main():
+        pool = _pool(discarded)
+        await pool.start()
+        await _until_full(pool)
+        first = pool.acquire()
+        second = pool.acquire()
+        await _until_full(pool)
+        idle = [container.name for container in pool._idle]
+        for container in (first, second):
+            container.process.kill()
+            await container.process.wait()
+        await pool.stop()
+        return first, second, idle
+
+    first, second, idle = asyncio.run(main())
+    assert first.name != second.name
+    assert first.name not in idle and second.name not in idle
+    # Containers handed out belong to their run; only idle ones are torn down with the pool.
+    assert sorted(discarded) == sorted(idle)
+
+
+def test_dead_and_expired_containers_are_evicted_not_reused() -> None:
+    discarded: List[str] = []
+
+    async def main():
+        pool = _pool(discarded, size=1, max_idle_seconds=1)
+        await pool.start()
+        await _until_full(pool)
+        dead = pool._idle[0]
+        dead.process.kill()
+        await dead.process.wait()
+        assert pool.acquire() is None
+
+        await _until_full(pool)
+        stale = pool._idle[0]
+        await asyncio.sleep(1.1)
+        handed_out = pool.acquire()
+        if handed_out is not None:
+            handed_out.process.kill()
+            await handed_out.process.wait()
+        await pool.stop()
+        return dead.name, stale.name, handed_out
+
+    dead, stale, handed_out = asyncio.run(main())
+    assert handed_out is None or handed_out.name != stale
+    assert dead in discarded and stale in discarded
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+
+from app.services.container_reaper import ContainerReaper
+from app.services.docker_api_backend import DockerApiBackend
+from app.services.docker_sandbox import next_container_name
+
+from ..fake_docker_engine import FakeDockerEngine
+
+
+def test_reaper_removes_scheduled_containers_in_batches() -> None:
+    batches: List[List[str]] = []
+
+    async def list_containers() -> List[str]:
+        return []
+
+    async def remove_containers(names: List[str]) -> None:
+        batches.append(sorted(names))
+
+    async def main() -> None:
+        reaper = ContainerReaper(list_containers, remove_containers, prefix="code_exec_", batch_size=2)
+        await reaper.start()
+        for index in range(5):
+            reaper.schedule(f"code_exec_1-{index}-0")
+        await reaper.stop()
+
+    asyncio.run(main())
+    assert sorted(name for batch in batches for name in batch) == [f"code_exec_1-{index}-0" for index in range(5)]
+    assert all(len(batch) <= 2 for batch in batches)
+
+
+def test_startup_sweep_removes_only_expired_containers() -> None:
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = FakeDockerEngine(os.path.join(tmp, "docker.sock"))
+            await engine.start()
+            leaked = f"code_exec_1-0-{time.time_ns() - 3600 * 10**9}"
+            fresh = next_container_name()
+            engine.add_container(leaked)
+            engine.add_container(fresh)
+            engine.add_container("unrelated")
+            backend = DockerApiBackend(socket_path=engine.socket_path)
+            try:
+                await backend.start()
+            finally:
+                await backend.stop()
+                await engine.stop()
+            return engine, leaked, fresh
+
+    engine, leaked, fresh = asyncio.run(main())
+    assert engine.removed == [leaked]
+    assert fresh in engine.containers
+    assert "unrelated" in engine.containers
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import tempfile
+from typing import Any, List, Tuple
+
+import pytest
+
+from app.services.docker_api_backend import DockerApiBackend
+from app.services.ipc import CASE, REQUEST, SUMMARY, encode_frame
+from app.services.sandbox import SandboxTimeoutError
+
+from ..fake_docker_engine import FakeDockerEngine
+
+
+def _run_against_fake(scenario):
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = FakeDockerEngine(os.path.join(tmp, "docker.sock"))
+            await engine.start()
+            backend = DockerApiBackend(socket_path=engine.socket_path)
+            try:
+                return await scenario(engine, backend)
+            finally:
+                await backend.stop()
+                await engine.stop()
+
+    return asyncio.run(main())
+
+
+def _request(source: str) -> bytes:
+    return encode_frame(
+        REQUEST,
+        {
+            "source": source,
+            "entry_point": "double",
+            "test_cases": [{"data": {"n": 2}, "expected": 4}, {"data": {"n": 5}, "expected": 10}],
+        },
+    )
+
+
+def test_engine_api_run_applies_cli_lockdown() -> None:
+    frames: List[Tuple[bytes, Any]] = []
+
+    async def scenario(engine, backend):
+        await backend.start()
+
+        def on_frame(kind: bytes, record: Any) -> None:
+            frames.append((kind, record))
+
+        run = await backend.run(_request("def double(n):\n    return n * 2"), 10, on_frame)
+        await backend.stop()
+        return run, engine
+
+    run, engine = _run_against_fake(scenario)
+    assert run.returncode == 0
+    assert [kind for kind, _ in frames] == [CASE, CASE, SUMMARY]
+    assert all(record["result"]["passed"] for kind, record in frames if kind == CASE)
+    assert engine.removed == [run.name]
+
+    config = engine.created[run.name]
+    assert config["User"] == "65534:65534"
+    assert config["NetworkDisabled"] is True
+    host = config["HostConfig"]
+    assert host["NetworkMode"] == "none"
+    assert host["ReadonlyRootfs"] is True
+    assert host["Memory"] == host["MemorySwap"] == 256 * 1024 * 1024
+    assert host["NanoCpus"] == 1_000_000_000
+    assert host["PidsLimit"] == 128
+    assert host["CapDrop"] == ["ALL"]
+    assert host["SecurityOpt"] == ["no-new-privileges"]
+    assert host["IpcMode"] == "none"
+    assert host["Tmpfs"] == {"/tmp": "rw,noexec,nosuid,size=64m"}
+    assert host["Ulimits"] == [{"Name": "nofile", "Soft": 256, "Hard": 256}]
+
+
+def test_engine_api_timeout_force_removes_container() -> None:
+    async def scenario(engine, backend):
+        with pytest.raises(SandboxTimeoutError) as excinfo:
+            await backend.run(_request("while True:\n    pass"), 1, lambda kind, record: None)
+        return excinfo.value.name, engine
+
+    name, engine = _run_against_fake(scenario)
+    assert ("DELETE", f"/containers/{name}") in engine.requests
+    assert name in engine.removed
+
+
+def test_engine_api_reuses_connections() -> None:
+    async def scenario(engine, backend):
+        for _ in range(3):
+            await backend.run(_request("def double(n):\n    return n * 2"), 10, lambda kind, record: None)
+        return len(backend.client._idle)
+
+    assert _run_against_fake(scenario) >= 1
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from app.schemas import ExecutionMode
+from app.services import executor
+from app.services.result_cache import ResultCache
+
+
+SOURCE = "def solve(n): return n"
+TASK = {"entry_point": "solve", "test_cases": [{"data": {"n": 1}, "expected": 1}]}
+RESULTS = [{"expected": 1, "actual": 1, "passed": True}]
+META = {"request_id": "r1", "task_id": "task-1", "mode": "fullTest"}
+
+
+def test_execute_and_stream_log_cache_hits_alike(monkeypatch: pytest.MonkeyPatch) -> None:
+    logged: List[Dict[str, Any]] = []
+    monkeypatch.setattr(executor, "RESULT_CACHE", ResultCache(16, 60))
+    monkeypatch.setattr(executor, "write_log", logged.append)
+
+    async def no_sandbox(**kwargs):
+        raise AssertionError("a cache hit must not start a sandbox")
+
+    monkeypatch.setattr(executor, "run_code_in_container", no_sandbox)
+    monkeypatch.setattr(executor, "stream_code_in_container", no_sandbox)
+
+    async def main():
+        key = executor._cache_key_for(SOURCE, "task-1", ExecutionMode.full_test, "solve", TASK["test_cases"])
+        await executor.RESULT_CACHE.put(key, RESULTS)
+        execution = await executor.run_user_code(SOURCE, TASK, "solve", ExecutionMode.full_test, META)
+        stream = executor.stream_user_code(SOURCE, TASK, "solve", ExecutionMode.full_test, META)
+        return execution, [event async for event in stream]
+
+    execution, events = asyncio.run(main())
+
+    assert execution["cached"] is True and execution["results"] == RESULTS
+    assert events == [("case", RESULTS[0]), ("done", {**events[-1][1], "cached": True, "results": RESULTS})]
+    executed, streamed = logged
+    assert executed.keys() == streamed.keys()
+    assert {key: executed[key] for key in ("cached", "tests_total", "tests_passed", "task_id")} == {
+        "cached": True,
+        "tests_total": 1,
+        "tests_passed": 1,
+        "task_id": "task-1",
+    }
+    assert streamed["cache_lookup_ms"] >= 0
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.services.forkserver_backend import FORKSERVER_MEMORY_BYTES, FORKSERVER_NOFILE, ForkserverBackend
+from app.services.ipc import CASE, REQUEST, SUMMARY, encode_frame
+from app.services.sandbox import SandboxTimeoutError
+
+
+def _request(source: str, entry_point: str = "solve") -> bytes:
+    return encode_frame(
+        REQUEST, {"source": source, "entry_point": entry_point, "test_cases": [{"data": {}, "expected": None}]}
+    )
+
+
+def _run(*runs: Tuple[bytes, float]) -> List[Any]:
+    """Runs each payload on one forkserver; returns `(run, frames)` pairs or the raised error."""
+
+    async def main():
+        backend = ForkserverBackend()
+        await backend.start()
+        outcomes = []
+        try:
+            for payload, timeout in runs:
+                frames: List[Tuple[bytes, Dict[str, Any]]] = []
+                try:
+                    run = await backend.run(payload, timeout, lambda kind, record: frames.append((kind, record)))
+                    outcomes.append((run, frames))
+                except SandboxTimeoutError as exc:
+                    outcomes.append(exc)
+        finally:
+            await backend.stop()
+        return outcomes
+
+    return asyncio.run(main())
+
+
+def test_exit_frame_reports_child_exit_code() -> None:
+    ok, crashed = _run(
+        (_request("def solve():\n    return 42"), 10),
+        (_request("import os\ndef solve():\n    os._exit(3)"), 10),
+    )
+
+    run, frames = ok
+    assert run.returncode == 0
+    assert [kind for kind, _ in frames] == [CASE, SUMMARY]
+    assert frames[0][1]["result"]["actual"] == 42
+
+    run, frames = crashed
+    assert run.returncode == 3
+    assert frames == []
+
+
+def test_children_run_under_rlimits() -> None:
+    source = (
+        "import os\n"
+        "import resource\n"
+        "def solve():\n"
+        "    limits = [resource.RLIMIT_NOFILE, resource.RLIMIT_AS, resource.RLIMIT_CORE]\n"
+        "    return [resource.getrlimit(limit)[0] for limit in limits] + [os.getuid() != 0]\n"
+    )
+    hog = "def solve():\n    return len(bytearray(%d))" % (FORKSERVER_MEMORY_BYTES * 2)
+    (_, limits), (_, hogged) = _run((_request(source), 10), (_request(hog), 10))
+
+    assert limits[0][1]["result"]["actual"] == [FORKSERVER_NOFILE, FORKSERVER_MEMORY_BYTES, 0, True]
+    assert hogged[0][1]["result"]["error"].startswith("MemoryError")
+
+
+def test_timeout_kills_the_child_process_group() -> None:
+    (timed_out,) = _run((_request("def solve():\n    while True:\n        pass"), 1))
+
+    assert isinstance(timed_out, SandboxTimeoutError)
+    pid = int(timed_out.name.rsplit("-", 1)[1])
+    deadline = time.monotonic() + 5
+    while os.path.exists(f"/proc/{pid}"):
+        assert time.monotonic() < deadline, "timed-out child is still running"
+        time.sleep(0.05)
@@ -0,0 +1,55 @@
+from typing import Any, Dict
+
+from app.services.harness import CONTAINER_PYTHON
+
+
+def _harness() -> Dict[str, Any]:
+    harness = {"__name__": "snake_harness"}
+    exec(compile(CONTAINER_PYTHON, "<harness>", "exec"), harness)
+    return harness
+
+
+MUTABLE_DEFAULT = "def solve(x, acc=[]):\n    acc.append(x)\n    return len(acc)\n"
+
+
+def test_mutable_defaults_do_not_leak_between_cases() -> None:
+    harness = _harness()
+    data_cases = [{"data": {"x": n}, "expected": 1} for n in range(3)]
+    stdin_cases = [{"stdin": str(n), "expected": "1"} for n in range(3)]
+
+    data_results = harness["run_cases"](MUTABLE_DEFAULT, "solve", data_cases)
+    stdin_results = harness["run_cases"](MUTABLE_DEFAULT, "solve", stdin_cases)
+
+    assert [result["actual"] for result in data_results] == [1, 1, 1]
+    assert [result["actual"] for result in stdin_results] == ["1", "1", "1"]
+
+
+def test_omitted_arguments_use_the_function_defaults() -> None:
+    harness = _harness()
+    source = "def solve(a, /, b=10, c=20, *, d=[]):\n    d.append(a)\n    return [a, b, c, len(d)]\n"
+    cases = [
+        {"data": {"a": 1}, "expected": [1, 10, 20, 1]},
+        {"data": {"a": 2, "c": 3}, "expected": [2, 10, 3, 1]},
+        {"stdin": "4 5", "expected": "['4', '5', 20, 1]"},
+    ]
+
+    results = harness["run_cases"](source, "solve", cases)
+    assert [result["passed"] for result in results] == [True, True, True]
+
+    gap = "def solve(a, b=[], c=0, /):\n    b.append(c)\n    return [a, b, c]\n"
+    results = harness["run_cases"](gap, "solve", [{"data": {"a": 1, "c": 2}, "expected": [1, [2], 2]}] * 2)
+    assert [result["passed"] for result in results] == [True, True]
+
+
+def test_submission_is_compiled_and_planned_once_per_run() -> None:
+    harness = _harness()
+    source = "def double(n):\n    return n * 2\n"
+    cases = [{"data": {"n": n}, "expected": n * 2} for n in range(5)]
+
+    results = harness["run_cases"](source, "double", cases)
+
+    assert all(result["passed"] for result in results)
+    assert list(harness["_CODE_CACHE"]) == [source]
+    assert len(harness["_CALL_PLANS"]) == 1
+    assert harness["run_cases"]("def broken(:\n", "broken", cases[:2])[1]["error"].startswith("SyntaxError")
+    assert len(harness["_CODE_CACHE"]) == 2
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.api import routes
+from app.services.jobs import JobQueue
+
+
+RUN_CODE = {"source": "print('job')", "mode": "runCode"}
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def job_queue(monkeypatch: pytest.MonkeyPatch):
+    """Serves /api/jobs from a fresh single-worker queue with room for two jobs."""
+    queue = JobQueue(max_size=2, workers=1, result_ttl_seconds=300)
+    monkeypatch.setattr(routes, "JOB_QUEUE", queue)
+    return queue
+
+
+def test_jobs_move_from_queued_to_running_to_done(client, fake_backend, job_queue) -> None:
+    async def main():
+        await job_queue.start()
+        try:
+            fake_backend.gate.clear()
+            submitted = [(await client.request_json("POST", "/api/jobs", RUN_CODE)) for _ in range(2)]
+            assert [status for status, _ in submitted] == [202, 202]
+            assert [job["status"] for _, job in submitted] == ["queued", "queued"]
+            first, second = (job["job_id"] for _, job in submitted)
+
+            await _settle()
+            held = [(await client.request_json("GET", f"/api/jobs/{job_id}"))[1] for job_id in (first, second)]
+            assert [job["status"] for job in held] == ["running", "queued"]
+            assert held[0]["result"] is None
+            assert job_queue.depth() == 1
+
+            fake_backend.gate.set()
+            return [(await client.request_json("GET", f"/api/jobs/{job_id}?wait=5"))[1] for job_id in (first, second)]
+        finally:
+            await job_queue.stop()
+
+    finished = asyncio.run(main())
+    assert [job["status"] for job in finished] == ["done", "done"]
+    assert all(job["result"]["results"][0]["stdout"] == "job" for job in finished)
+
+
+def test_full_queue_rejects_submissions(client, fake_backend, job_queue) -> None:
+    async def main():
+        await job_queue.start()
+        try:
+            fake_backend.gate.clear()
+            await client.request("POST", "/api/jobs", RUN_CODE)
+            await _settle()
+            statuses = [(await client.request("POST", "/api/jobs", RUN_CODE))[0] for _ in range(3)]
+            fake_backend.gate.set()
+            return statuses
+        finally:
+            await job_queue.stop()
+
+    assert asyncio.run(main()) == [202, 202, 429]
+
+
+def test_failing_and_abandoned_jobs_are_marked_failed(job_queue) -> None:
+    async def broken():
+        raise RuntimeError("worker blew up")
+
+    async def never_finishes():
+        await asyncio.Event().wait()
+
+    async def main():
+        await job_queue.start()
+        failed = job_queue.submit("alice", broken)
+        await asyncio.wait_for(failed.done.wait(), timeout=1)
+        running = job_queue.submit("alice", never_finishes)
+        queued = job_queue.submit("alice", never_finishes)
+        await _settle()
+        assert (running.status, queued.status) == ("running", "queued")
+        await job_queue.stop()
+        return failed, running, queued
+
+    failed, running, queued = asyncio.run(main())
+    assert (failed.status, failed.error) == ("failed", "worker blew up")
+    assert [(job.status, job.error) for job in (running, queued)] == [("failed", "Executor shutting down")] * 2
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app import security
+
+from ..conftest import _build_jwt
+
+
+@pytest.fixture(autouse=True)
+def secrets(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("EXECUTOR_JWT_SECRET", "current")
+    monkeypatch.setenv("EXECUTOR_JWT_SECRETS", "old:retiring")
+    monkeypatch.setattr(security, "_VERIFIED_TOKENS", type(security._VERIFIED_TOKENS)())
+
+
+def _verified_only_from_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    def no_verification(*args):
+        raise AssertionError("token was verified again instead of served from the cache")
+
+    monkeypatch.setattr(security, "_verify_signature", no_verification)
+
+
+def test_verified_token_is_served_from_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    token = _build_jwt("current", "alice", 300)
+    assert security.verify_bearer_jwt(token)["sub"] == "alice"
+
+    _verified_only_from_cache(monkeypatch)
+    assert security.verify_bearer_jwt(token)["sub"] == "alice"
+
+
+def test_cached_token_expires_with_its_exp_claim() -> None:
+    token = _build_jwt("current", "alice", 1)
+    security.verify_bearer_jwt(token)
+    time.sleep(1.1)
+
+    with pytest.raises(HTTPException) as excinfo:
+        security.verify_bearer_jwt(token)
+    assert excinfo.value.detail == "Token expired"
+    assert not security._VERIFIED_TOKENS
+
+
+def test_rotating_a_secret_out_invalidates_cached_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    retiring = _build_jwt("retiring", "alice", 300, kid="old")
+    current = _build_jwt("current", "bob", 300)
+    security.verify_bearer_jwt(retiring)
+    security.verify_bearer_jwt(current)
+
+    monkeypatch.setenv("EXECUTOR_JWT_SECRETS", "")
+    with pytest.raises(HTTPException) as excinfo:
+        security.verify_bearer_jwt(retiring)
+    assert excinfo.value.status_code == 401
+
+    _verified_only_from_cache(monkeypatch)
+    assert security.verify_bearer_jwt(current)["sub"] == "bob"
+
+
+def test_cache_keeps_the_most_recently_used_tokens(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(security, "TOKEN_CACHE_SIZE", 2)
+    first, second, third = (_build_jwt("current", f"user-{index}", 300) for index in range(3))
+    for token in (first, second, first, third):
+        security.verify_bearer_jwt(token)
+
+    _verified_only_from_cache(monkeypatch)
+    assert security.verify_bearer_jwt(first)["sub"] == "user-0"
+    assert security.verify_bearer_jwt(third)["sub"] == "user-2"
+    with pytest.raises(AssertionError):
+        security.verify_bearer_jwt(second)
@@ -0,0 +1,56 @@
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+from app.services.log_sink import LogSink
+
+
+def _sink(path: Path, **overrides: Any) -> LogSink:
+    options: Dict[str, Any] = {
+        "queue_size": 100,
+        "batch_size": 1,
+        "flush_seconds": 0.01,
+        "max_bytes": 0,
+        "rotate_seconds": 0,
+        "backups": 2,
+        "max_output_bytes": 4096,
+    }
+    options.update(overrides)
+    return LogSink(path=path, **options)
+
+
+def test_full_queue_drops_entries_instead_of_blocking() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "executor.jsonl"
+        sink = _sink(path, queue_size=2, batch_size=10)
+        # Hold the writer back so the queue fills up.
+        sink._ensure_started = lambda: None
+        for index in range(5):
+            sink.write({"index": index})
+        assert sink.stats()["queued"] == 2
+        assert sink.dropped == 3
+
+        del sink._ensure_started
+        sink._ensure_started()
+        sink.close()
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["index"] for line in lines] == [0, 1]
+        assert sink.written == 2
+
+
+def test_size_rotation_keeps_a_bounded_number_of_backups() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "executor.jsonl"
+        sink = _sink(path, max_bytes=300, max_output_bytes=64)
+        for index in range(12):
+            sink.write({"index": index, "stdout": "x" * 1000})
+        sink.close()
+
+        files = sorted(item.name for item in Path(tmp).iterdir())
+        assert files == ["executor.jsonl", "executor.jsonl.1", "executor.jsonl.2"]
+        assert all(item.stat().st_size <= 300 for item in Path(tmp).iterdir())
+        newest = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert newest[-1]["index"] == 11
+        assert newest[-1]["stdout"].endswith("...[truncated 936 bytes]")
+        assert sink.written == 12
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from app.api import routes
+from app.services.rate_limit import TokenBucketLimiter
+
+
+RUN_CODE = {"source": "print('metrics')", "mode": "runCode"}
+
+
+def _value(text: str, series: str) -> float:
+    """Value of one exported series; 0 when it was not exported yet."""
+    for line in text.splitlines():
+        if line.startswith(f"{series} "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+async def _scrape(client) -> str:
+    status, body = await client.request("GET", "/metrics")
+    assert status == 200
+    return body.decode("utf-8")
+
+
+def test_successful_run_updates_run_counters_and_histograms(client) -> None:
+    series = (
+        'executor_runs_total{status="ok",mode="runCode"}',
+        'executor_execution_seconds_count{mode="runCode",cached="false"}',
+        'executor_sandbox_run_seconds_count{backend="fake"}',
+        "executor_sandbox_wait_seconds_count",
+        "executor_cases_per_run_count",
+    )
+
+    async def main():
+        before = await _scrape(client)
+        status, response = await client.request_json("POST", "/api/execute", RUN_CODE)
+        assert status == 200 and response["results"][0]["stdout"] == "metrics"
+        return before, await _scrape(client)
+
+    before, after = asyncio.run(main())
+    assert [_value(after, name) - _value(before, name) for name in series] == [1, 1, 1, 1, 1]
+    assert _value(after, "executor_runs_in_flight") == 0
+
+
+def test_crashed_sandbox_is_counted_as_an_error(client, fake_backend) -> None:
+    fake_backend.returncode = 1
+    ok, error = 'executor_runs_total{status="ok",mode="runCode"}', 'executor_runs_total{status="error",mode="runCode"}'
+
+    async def main():
+        before = await _scrape(client)
+        status, _ = await client.request_json("POST", "/api/execute", RUN_CODE)
+        assert status == 200
+        return before, await _scrape(client)
+
+    before, after = asyncio.run(main())
+    assert _value(after, error) - _value(before, error) == 1
+    assert _value(after, ok) == _value(before, ok)
+
+
+def test_rate_limited_submissions_are_counted(client, fake_backend, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(routes, "RATE_LIMITER", TokenBucketLimiter(1, 1))
+
+    async def main():
+        before = await _scrape(client)
+        statuses = [(await client.request("POST", "/api/execute", RUN_CODE))[0] for _ in range(3)]
+        return before, statuses, await _scrape(client)
+
+    before, statuses, after = asyncio.run(main())
+    assert statuses == [200, 429, 429]
+    assert fake_backend.runs == 1
+    assert _value(after, "executor_rate_limited_total") - _value(before, "executor_rate_limited_total") == 2
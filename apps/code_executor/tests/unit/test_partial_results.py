@@ -0,0 +1,92 @@
+import asyncio
+import functools
+from typing import Any, Dict, List
+
+import pytest
+
+from app.schemas import ExecutionMode
+from app.services import container_runner, executor
+from app.services.forkserver_backend import ForkserverBackend
+from app.services.ipc import BATCH_ITEM
+from app.services.sandbox import SandboxBackend, SandboxTimeoutError
+
+
+# Returns right away for n == 1 and loops forever for anything else.
+LOOPS_AFTER_FIRST_CASE = "def solve(n):\n    while n != 1:\n        pass\n    return n\n"
+TASK = {"entry_point": "solve", "test_cases": [{"data": {"n": 1}, "expected": 1}, {"data": {"n": 2}, "expected": 2}]}
+
+
+@pytest.fixture
+def sandbox(monkeypatch: pytest.MonkeyPatch):
+    """Runs the executor against a real forkserver with a 1 s timeout and no log file."""
+    monkeypatch.setattr(container_runner.LOG_SINK, "write", lambda entry: None)
+    monkeypatch.setattr(
+        executor, "run_code_in_container", functools.partial(container_runner.run_code_in_container, timeout=1)
+    )
+    monkeypatch.setattr(
+        executor, "stream_code_in_container", functools.partial(container_runner.stream_code_in_container, timeout=1)
+    )
+
+    def run(scenario):
+        backend = ForkserverBackend()
+        monkeypatch.setattr(container_runner, "_BACKEND", backend)
+
+        async def main():
+            await backend.start()
+            try:
+                return await scenario()
+            finally:
+                await backend.stop()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def _assert_first_case_kept(results: List[Dict[str, Any]]) -> None:
+    assert len(results) == 2
+    assert results[0]["passed"] is True
+    assert results[0]["actual"] == 1
+    assert results[1]["passed"] is False
+    assert "exceeded timeout" in results[1]["actual"]
+
+
+def test_timed_out_run_keeps_finished_cases(sandbox) -> None:
+    execution = sandbox(lambda: executor.run_user_code(LOOPS_AFTER_FIRST_CASE, TASK, "solve", ExecutionMode.full_test))
+    _assert_first_case_kept(execution["results"])
+    assert execution["cached"] is False
+
+
+def test_timed_out_stream_keeps_finished_cases(sandbox) -> None:
+    async def scenario():
+        events = []
+        async for event in executor.stream_user_code(LOOPS_AFTER_FIRST_CASE, TASK, "solve", ExecutionMode.full_test):
+            events.append(event)
+        return events
+
+    events = sandbox(scenario)
+    assert [kind for kind, _ in events] == ["case", "case", "done"]
+    _assert_first_case_kept(events[-1][1]["results"])
+
+
+class _StallsAfterFirstItem(SandboxBackend):
+    name = "stalls"
+
+    async def run(self, payload, timeout, on_frame):
+        on_frame(BATCH_ITEM, {"index": 0, "result": {"results": [{"expected": 1, "actual": 1, "passed": True}]}})
+        raise SandboxTimeoutError("stalls-1")
+
+
+def test_timed_out_batch_keeps_finished_submissions(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(container_runner.LOG_SINK, "write", lambda entry: None)
+    monkeypatch.setattr(container_runner, "_BACKEND", _StallsAfterFirstItem())
+    items = [
+        {"source": source, "task": TASK, "entry_point": "solve", "mode": ExecutionMode.full_test, "task_id": None}
+        for source in ("def solve(n):\n    return n\n", LOOPS_AFTER_FIRST_CASE)
+    ]
+
+    outcomes = asyncio.run(executor.run_user_code_batch(items))
+
+    assert outcomes[0]["results"] == [{"expected": 1, "actual": 1, "passed": True}]
+    assert outcomes[1]["results"][0]["passed"] is False
+    assert "exceeded timeout" in outcomes[1]["results"][0]["actual"]
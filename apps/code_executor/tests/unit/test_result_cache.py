@@ -0,0 +1,34 @@
+import asyncio
+import os
+import tempfile
+
+from app.services.result_cache import ResultCache
+
+
+RESULTS = [{"expected": 2, "actual": 2, "passed": True, "duration_ms": 12.5}]
+
+
+def test_sqlite_tier_survives_restart_without_timing() -> None:
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.sqlite")
+            await ResultCache(16, 60, path=path).put("key", RESULTS)
+
+            # A fresh instance has an empty memory tier, so the hit comes from SQLite.
+            reopened = ResultCache(16, 60, path=path)
+            return await reopened.get("key"), await reopened.get("missing")
+
+    hit, miss = asyncio.run(main())
+    assert hit == [{"expected": 2, "actual": 2, "passed": True}]
+    assert miss is None
+    assert RESULTS[0]["duration_ms"] == 12.5
+
+
+def test_expired_entries_are_misses() -> None:
+    async def main():
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(16, -1, path=os.path.join(tmp, "results.sqlite"))
+            await cache.put("key", RESULTS)
+            return await cache.get("key")
+
+    assert asyncio.run(main()) is None
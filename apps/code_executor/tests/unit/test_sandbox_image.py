@@ -0,0 +1,67 @@
+import asyncio
+import os
+import py_compile
+import stat
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app.services.harness import HARNESS_SOURCE_VERSION
+from app.services.ipc import CASE, REQUEST, SUMMARY, FrameDecoder, encode_frame
+from app.services.sandbox import SandboxUnavailableError
+from app.services.sandbox_image import HARNESS_LABEL, image_reference, verify_sandbox_image, write_build_context
+
+
+# Answers `docker image inspect` with $FAKE_HARNESS_LABEL, or fails like a missing image.
+FAKE_DOCKER = '#!/bin/sh\n[ -n "$FAKE_HARNESS_LABEL" ] || exit 1\necho "$FAKE_HARNESS_LABEL"\n'
+
+
+def test_image_check_requires_the_current_harness_version(monkeypatch: pytest.MonkeyPatch) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        docker = Path(tmp) / "docker"
+        docker.write_text(FAKE_DOCKER, encoding="utf-8")
+        docker.chmod(docker.stat().st_mode | stat.S_IXUSR)
+        monkeypatch.setenv("PATH", f"{tmp}{os.pathsep}{os.environ.get('PATH', '')}")
+
+        monkeypatch.setenv("FAKE_HARNESS_LABEL", HARNESS_SOURCE_VERSION)
+        asyncio.run(verify_sandbox_image("snakecoder/sandbox"))
+
+        monkeypatch.setenv("FAKE_HARNESS_LABEL", "0123456789ab")
+        with pytest.raises(SandboxUnavailableError) as mismatch:
+            asyncio.run(verify_sandbox_image("snakecoder/sandbox"))
+        assert mismatch.value.reason == "sandbox_image_mismatch"
+
+        monkeypatch.delenv("FAKE_HARNESS_LABEL")
+        with pytest.raises(SandboxUnavailableError) as missing:
+            asyncio.run(verify_sandbox_image("snakecoder/sandbox"))
+        assert missing.value.reason == "sandbox_image_missing"
+
+
+def test_build_context_harness_runs_as_bytecode() -> None:
+    assert image_reference("snakecoder/sandbox") == f"snakecoder/sandbox:{HARNESS_SOURCE_VERSION}"
+    with tempfile.TemporaryDirectory() as tmp:
+        context = write_build_context(Path(tmp))
+        assert f"LABEL {HARNESS_LABEL}=$HARNESS_VERSION" in (context / "Dockerfile").read_text(encoding="utf-8")
+
+        # Same steps as the image: precompile the harness, then run only the bytecode.
+        harness = context / "harness.pyc"
+        py_compile.compile(str(context / "harness.py"), cfile=str(harness), doraise=True)
+        request = {
+            "source": "def double(n):\n    return n * 2",
+            "entry_point": "double",
+            "test_cases": [{"data": {"n": 21}, "expected": 42}],
+        }
+        completed = subprocess.run(
+            [sys.executable, "-I", "-S", str(harness)],
+            input=encode_frame(REQUEST, request),
+            capture_output=True,
+            timeout=30,
+            check=True,
+        )
+
+    frames = FrameDecoder().feed(completed.stdout)
+    assert [kind for kind, _ in frames] == [CASE, SUMMARY]
+    assert frames[0][1]["result"]["passed"] is True
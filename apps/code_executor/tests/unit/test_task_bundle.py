@@ -0,0 +1,67 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from app.schemas import ExecutionMode
+from app.services.task_bundle import BundleTaskSource, TaskBundle, TaskBundleError, write_task_bundle
+from app.services.task_shapes import build_task_shapes
+
+
+DB_TESTS = [{"input": [1, 2], "expectedOutput": "3"}, {"input": "5 5", "output": "10"}, {"input": None}, {}, "bad"]
+
+
+def test_bundle_serves_prebuilt_shapes() -> None:
+    shapes = build_task_shapes("task-a", "solve", DB_TESTS)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.bundle"
+        stats = write_task_bundle(path, [("task-a", shapes), *((f"task-{n}", shapes) for n in range(200))])
+        bundle = TaskBundle(path)
+
+        assert stats["tasks"] == bundle.task_count == 201
+        assert stats["version"] == bundle.version
+        assert bundle.get("task-a") == shapes
+        assert bundle.get("task-199") == shapes
+        assert bundle.get("missing") is None
+        full = bundle.get("task-a")[ExecutionMode.full_test.value]
+        assert full["entry_point"] == "solve"
+        assert [case["stdin"] for case in full["test_cases"]] == ["1 2", "5 5", ""]
+        assert len(bundle.get("task-a")[ExecutionMode.complete_task.value]["test_cases"]) == 4
+
+
+def test_bundle_source_hot_swaps_replaced_file() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "tasks.bundle"
+        write_task_bundle(path, [("old", {"fullTest": {"test_cases": []}})])
+        source = BundleTaskSource(path, check_seconds=0)
+        assert source.get("old") is not None
+
+        write_task_bundle(path, [("new", {"fullTest": {"test_cases": []}})])
+        assert source.get("new") is not None
+        assert source.get("old") is None
+        assert source.stats()["swaps"] == 1
+
+        # A broken replacement is ignored; the last good bundle keeps serving.
+        broken = Path(tmp) / "broken"
+        broken.write_bytes(b"not a bundle at all, just some bytes")
+        os.replace(broken, path)
+        assert source.get("new") is not None
+        assert source.stats()["swap_errors"] == 1
+        with pytest.raises(TaskBundleError):
+            TaskBundle(path)
+
+
+def test_bundle_source_opens_lazily_and_waits_for_missing_file() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "not-exported-yet.bundle"
+        source = BundleTaskSource(path, check_seconds=0)
+
+        assert source.loaded is False
+        assert source.get("task") is None
+        assert source.stats()["loaded"] is False
+
+        write_task_bundle(path, [("task", {"fullTest": {"test_cases": []}})])
+        assert source.loaded is True
+        assert source.get("task") is not None
+        assert source.stats()["swaps"] == 0